@@ -1,5 +1,6 @@
 import streamlit as st
-from utils import load_all_data # Import from our new utils file
+from utils import load_data # Import from our new utils file
+from warmup import show_warmup_status
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -7,11 +8,12 @@ st.set_page_config(
     page_icon="🌊",
     layout="wide"
 )
+show_warmup_status()
 
 st.title("🌊 Crypto Macro Indicators")
 st.header("📈 Market Dashboard")
 
-data = load_all_data()
+data = load_data()
 
 if data is None:
     st.warning("Could not load data. Please ensure `crypto_data.db` exists and is populated.")
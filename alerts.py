@@ -0,0 +1,326 @@
+import json
+import time
+import urllib.request
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from config import ALERT_BASKETS, ALERT_RULES, ALERT_FILE_SINK, ALERT_WEBHOOK_URL
+from panel import align_on_calendar
+from index_builder import read_basket
+from derived_store import connect_derived, save_frame, load_frame
+from replay import OfficialASIReplay, TrafficLightReplay, MarketFlowReplay, AssetsAboveMAReplay
+
+# --- Configuration ---
+ALERT_STATE_FRAME = 'alerts:state'
+ALERT_EVENTS_TABLE = 'alert_events'
+WEBHOOK_TIMEOUT = 10  # seconds
+STATE_VERSION = 4  # Bump when a tracker computes its series differently, so stored states are rebuilt
+MAX_HOLD_DAYS = 3  # A day waits for inputs at most this far behind the newest bar; older ones are stale
+BASKET_SERIES = {'asi', 'assets_above_ma'}
+MACRO_SERIES_INPUTS = {
+    'mfg_total': ('TOTAL', 'USDT_D', 'USDC_D'),
+    'mfg_stable_inv': ('TOTAL', 'USDT_D', 'USDC_D'),
+    'traffic_light': ('TOTAL',),
+}
+CONDITIONS = ('cross_above', 'cross_below', 'change')
+
+
+def expand_rules(rules=None, baskets=None):
+    """
+    Expands the declarative rules (defaults: config.ALERT_RULES and
+    ALERT_BASKETS) into one rule per series: basket rules with baskets="*"
+    become one rule per basket.
+
+    Returns:
+        list: Dicts with 'name', 'series_key', 'series', 'basket', 'length', 'condition' and 'threshold'.
+    """
+    rules = ALERT_RULES if rules is None else rules
+    baskets = ALERT_BASKETS if baskets is None else baskets
+    expanded = []
+    for rule in rules:
+        if rule['condition'] not in CONDITIONS:
+            raise ValueError(f"Unknown alert condition '{rule['condition']}'. Expected one of {CONDITIONS}.")
+        series = rule['series']
+        length = rule.get('length')
+        if series in BASKET_SERIES:
+            basket_names = list(baskets) if rule.get('baskets', '*') == '*' else rule['baskets']
+        elif series in MACRO_SERIES_INPUTS:
+            basket_names = [None]
+        else:
+            raise ValueError(f"Unknown alert series '{series}'.")
+
+        for basket in basket_names:
+            series_name = f"{series}_{length}" if length else series
+            expanded.append({
+                'name': f"{rule['name']} [{basket}]" if basket else rule['name'],
+                'series_key': f"{series_name}:{basket}" if basket else series_name,
+                'series': series, 'basket': basket, 'length': length,
+                'condition': rule['condition'], 'threshold': rule.get('threshold'),
+            })
+    return expanded
+
+
+class AlertState:
+    """
+    The incremental indicator state behind every alert series, plus the last
+    value of each series, the last processed date and the last bar stepped for
+    each symbol. It is pickled into the derived DB between runs, so each run
+    only steps through the new bars.
+    """
+
+    def __init__(self, rules, baskets=None):
+        baskets = ALERT_BASKETS if baskets is None else baskets
+        self.signature = self.signature_for(rules, baskets)
+        self.last_date = None
+        self.last_values = {}
+        self.last_bars = {}
+
+        symbols = {}
+        for rule in rules:
+            inputs = MACRO_SERIES_INPUTS.get(rule['series'], ())
+            if rule['series'] == 'asi':
+                inputs = ('BTCUSD', 'BTC_D')
+            symbols.update(dict.fromkeys(inputs))
+            if rule['basket']:
+                symbols.update(dict.fromkeys(baskets[rule['basket']].values()))
+        self.symbols = list(symbols)
+        position = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._benchmarks = [position.get('BTCUSD'), position.get('BTC_D')]
+
+        # --- One tracker per distinct series ---
+        self.trackers = {}
+        for rule in rules:
+            key = rule['series_key']
+            if key in self.trackers or rule['series'] in ('mfg_total', 'mfg_stable_inv'):
+                continue
+            if rule['series'] == 'asi':
+                members = [position[symbol] for symbol in baskets[rule['basket']].values() if 'BTC' not in symbol]
+                self.trackers[key] = ('asi', members, OfficialASIReplay(len(members)))
+            elif rule['series'] == 'assets_above_ma':
+                members = [position[symbol] for symbol in baskets[rule['basket']].values()]
+                self.trackers[key] = ('assets_above_ma', members, AssetsAboveMAReplay(len(members), rule['length']))
+            elif rule['series'] == 'traffic_light':
+                self.trackers[key] = ('traffic_light', [position['TOTAL']], TrafficLightReplay())
+        if any(rule['series'] in ('mfg_total', 'mfg_stable_inv') for rule in rules):
+            inputs = [position[symbol] for symbol in MACRO_SERIES_INPUTS['mfg_total']]
+            self.trackers['mfg'] = ('mfg', inputs, MarketFlowReplay())
+
+    @staticmethod
+    def signature_for(rules, baskets):
+        """Identifies the rule set and basket contents; a changed signature rebuilds the state."""
+        return (
+            STATE_VERSION,
+            tuple(sorted(rule['series_key'] for rule in rules)),
+            tuple(sorted((name, tuple(sorted(basket.values()))) for name, basket in baskets.items())),
+        )
+
+    def step(self, closes, volumes):
+        """Advances every tracker by one day and returns the day's value of each series."""
+        values = {}
+        for key, (kind, members, tracker) in self.trackers.items():
+            if kind == 'asi':
+                btcusd, btc_d = closes[self._benchmarks[0]], closes[self._benchmarks[1]]
+                values[key] = tracker.step(closes[members], volumes[members], btcusd, btc_d)
+            elif kind == 'assets_above_ma':
+                values[key] = tracker.step(closes[members])
+            elif kind == 'traffic_light':
+                values[key] = tracker.step(closes[members[0]])
+            elif kind == 'mfg':
+                values['mfg_total'], values['mfg_stable_inv'] = tracker.step(*closes[members])
+        return values
+
+
+def _fires(rule, previous, value):
+    """Whether a rule fires on a move of its series from previous to value."""
+    if previous is None or not np.isfinite(value):
+        return False
+    if rule['condition'] == 'cross_above':
+        return previous <= rule['threshold'] < value
+    if rule['condition'] == 'cross_below':
+        return previous >= rule['threshold'] > value
+    return value != previous
+
+
+def _evaluate_day(state, rules_by_series, date, values):
+    """Checks every rule against one day's series values and updates the last values."""
+    events = []
+    for key, value in values.items():
+        if value is None or not np.isfinite(value):
+            continue
+        previous = state.last_values.get(key)
+        for rule in rules_by_series.get(key, ()):
+            if _fires(rule, previous, value):
+                events.append({
+                    'date': date.strftime('%Y-%m-%d'), 'rule': rule['name'], 'series': key,
+                    'condition': rule['condition'], 'threshold': rule['threshold'],
+                    'value': float(value), 'previous': float(previous),
+                })
+        state.last_values[key] = float(value)
+    return events
+
+
+def _ensure_events_table(derived_conn):
+    derived_conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {ALERT_EVENTS_TABLE} (
+            date TEXT NOT NULL, rule TEXT NOT NULL, series TEXT NOT NULL, condition TEXT NOT NULL,
+            threshold REAL, value REAL, previous REAL, fired_at TEXT NOT NULL,
+            UNIQUE (date, rule)
+        )
+    """)
+
+
+def _write_events(derived_conn, events):
+    """Stores fired events in the events table (a repeated date/rule is ignored)."""
+    fired_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    with derived_conn:
+        derived_conn.executemany(
+            f"INSERT OR IGNORE INTO {ALERT_EVENTS_TABLE} (date, rule, series, condition, threshold, value, previous, fired_at) "
+            "VALUES (:date, :rule, :series, :condition, :threshold, :value, :previous, :fired_at)",
+            [{**event, 'fired_at': fired_at} for event in events]
+        )
+
+
+def _send_to_sinks(events):
+    """Appends the events to the file sink and posts them to the webhook, if configured."""
+    if ALERT_FILE_SINK:
+        with open(ALERT_FILE_SINK, 'a') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+    if ALERT_WEBHOOK_URL:
+        text = '\n'.join(f"{e['date']} {e['rule']}: {e['value']:.2f} (was {e['previous']:.2f})" for e in events)
+        request = urllib.request.Request(
+            ALERT_WEBHOOK_URL, data=json.dumps({'text': text, 'events': events}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT).close()
+        except Exception as e:
+            print(f"Could not post alerts to the webhook: {e}")
+
+
+def load_alert_events(limit=100):
+    """Returns the most recent fired alert events, newest first."""
+    derived_conn = connect_derived()
+    try:
+        _ensure_events_table(derived_conn)
+        return pd.read_sql(
+            f"SELECT * FROM {ALERT_EVENTS_TABLE} ORDER BY date DESC, rule LIMIT ?", derived_conn, params=(limit,)
+        )
+    finally:
+        derived_conn.close()
+
+
+def _stored_last_bars(conn, symbols):
+    """The day of the last stored bar of every existing symbol table."""
+    existing_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    last_bars = {}
+    for symbol in symbols:
+        if symbol in existing_tables:
+            last = conn.execute(f'SELECT MAX(datetime) FROM "{symbol}"').fetchone()[0]
+            if last is not None:
+                last_bars[symbol] = pd.Timestamp(last).normalize()
+    return last_bars
+
+
+def _late_symbols(state, stored_last_bars):
+    """Symbols with stored bars on days the state has already stepped through without them."""
+    return [
+        symbol for symbol, last in stored_last_bars.items()
+        if last > state.last_bars.get(symbol, pd.Timestamp.min) and state.last_bars.get(symbol, pd.Timestamp.min) < state.last_date
+    ]
+
+
+def _ready_through(stored_last_bars):
+    """
+    The last day every input has reported for. Inputs more than MAX_HOLD_DAYS
+    behind the newest bar are treated as stale (e.g. delisted) and do not hold it.
+    """
+    newest = max(stored_last_bars.values())
+    return min(last for last in stored_last_bars.values() if last >= newest - pd.Timedelta(days=MAX_HOLD_DAYS))
+
+
+def evaluate_alerts(conn, changed_tables=None):
+    """
+    Post-ingest task: evaluates every alert rule on the bars appended since the
+    last run.
+
+    The indicator state from the previous run is restored from the derived DB,
+    only rows after its last processed date are read and stepped through, and
+    each rule compares its series' previous and new values. A day is held until
+    every input has a bar for it (see _ready_through), so groups that report at
+    different times are stepped together. On the first run (or after the rules
+    or baskets change) the state is rebuilt from the full history without firing
+    anything. If a bar arrives for a day that was stepped without it, the state
+    is rebuilt from history and only the days after the old state fire.
+    Skipped when none of the alert inputs changed.
+    """
+    started = time.perf_counter()
+    rules = expand_rules()
+    rules_by_series = {}
+    for rule in rules:
+        rules_by_series.setdefault(rule['series_key'], []).append(rule)
+
+    derived_conn = connect_derived()
+    try:
+        _ensure_events_table(derived_conn)
+        state = load_frame(derived_conn, ALERT_STATE_FRAME)
+        if changed_tables is not None and state is not None and not changed_tables & set(state.symbols):
+            print("No alert inputs changed; skipping alerts.")
+            return
+        if state is None or state.signature != AlertState.signature_for(rules, ALERT_BASKETS):
+            state, quiet_through = AlertState(rules), pd.Timestamp.max  # Warm-up: fire nothing
+        else:
+            quiet_through = None
+        stored_last_bars = _stored_last_bars(conn, state.symbols)
+        late = _late_symbols(state, stored_last_bars) if state.last_date is not None else []
+        if late:
+            print(f"Late bars for {', '.join(late[:10])}{' ...' if len(late) > 10 else ''}; rebuilding the alert state from history.")
+            state, quiet_through = AlertState(rules), state.last_date
+        warm_up = quiet_through == pd.Timestamp.max
+
+        if not stored_last_bars:
+            print("No new bars to evaluate alerts on.")
+            return
+        ready_through = _ready_through(stored_last_bars)
+        if state.last_date is not None and ready_through <= state.last_date:
+            if max(stored_last_bars.values()) > state.last_date:
+                print("No new day has bars for every alert input yet; holding the alerts.")
+            else:
+                print("No new bars to evaluate alerts on.")
+            return
+        data = read_basket(conn, state.symbols, since=None if state.last_date is None else state.last_date + pd.Timedelta(days=1))
+        if not data:
+            print("No new bars to evaluate alerts on.")
+            return
+
+        closes = align_on_calendar({symbol: df['close'] for symbol, df in data.items()})
+        volumes = align_on_calendar({symbol: df['volume'] for symbol, df in data.items()})
+        closes = closes.reindex(columns=state.symbols)
+        volumes = volumes.reindex(index=closes.index, columns=state.symbols)
+        ready = closes.index <= ready_through
+        if state.last_date is not None:
+            ready &= closes.index > state.last_date
+        closes, volumes = closes[ready], volumes[ready]
+
+        close_values, volume_values = closes.to_numpy(dtype=np.float64), volumes.to_numpy(dtype=np.float64)
+        events = []
+        for t, date in enumerate(closes.index):
+            values = state.step(close_values[t], volume_values[t])
+            day_events = _evaluate_day(state, rules_by_series, date, values)
+            if quiet_through is None or date > quiet_through:
+                events += day_events
+        if len(closes):
+            state.last_date = closes.index[-1]
+            state.last_bars.update(closes.apply(pd.Series.last_valid_index).dropna().to_dict())
+
+        if events:
+            _write_events(derived_conn, events)
+            _send_to_sinks(events)
+        save_frame(derived_conn, ALERT_STATE_FRAME, state)
+
+        action = "Initialized alert state over" if warm_up else "Evaluated"
+        print(f"{action} {len(closes)} day(s) x {len(rules)} rules in {time.perf_counter() - started:.2f}s; {len(events)} alert(s) fired.")
+        for event in events:
+            print(f"  ALERT {event['date']} {event['rule']}: {event['value']:.2f} (was {event['previous']:.2f})")
+    finally:
+        derived_conn.close()
@@ -0,0 +1,90 @@
+import numpy as np
+from config import BASKETS
+
+# --- Basket Registry ---
+# Every basket is a bitmap over the universe (the union of all baskets, in
+# config order). The universe is split into disjoint partitions: the groups of
+# symbols that belong to exactly the same baskets. Every registered basket,
+# and any union of baskets, is then an exact union of partitions, so a breadth
+# metric that is a sum over assets (advancers, assets above their MA, band
+# counts, outperformers and their volume) is computed and memoized once per
+# partition and summed for any basket that contains it, instead of rescanning
+# every asset of every basket.
+
+
+class BasketRegistry:
+    """
+    Symbol-index bitmaps and disjoint partitions of a set of named baskets.
+
+    Args:
+        baskets (dict): Basket name -> {exchange symbol: table name}.
+    """
+
+    def __init__(self, baskets):
+        self.baskets = baskets
+        self.universe = list(dict.fromkeys(table for basket in baskets.values() for table in basket.values()))
+        self.index = {table: i for i, table in enumerate(self.universe)}
+        self.bitmaps = {}
+        for name, basket in baskets.items():
+            bitmap = np.zeros(len(self.universe), dtype=bool)
+            bitmap[[self.index[table] for table in basket.values()]] = True
+            self.bitmaps[name] = bitmap
+
+        # Symbols with the same membership column (one bit per basket) form one partition
+        membership = np.packbits(np.array(list(self.bitmaps.values())), axis=0).T
+        signatures = {}
+        self.partition_of = np.array([signatures.setdefault(row.tobytes(), len(signatures)) for row in membership])
+        self.partitions = [
+            [self.universe[i] for i in np.flatnonzero(self.partition_of == p)] for p in range(len(signatures))
+        ]
+
+    def symbols(self, *names):
+        """
+        Returns the table names of one basket, or of the union of several, in
+        basket order (the first basket's symbols first).
+
+        Raises:
+            KeyError: If a basket name is not registered.
+        """
+        return list(dict.fromkeys(table for name in names for table in self.baskets[name].values()))
+
+    def partitions_of(self, *names):
+        """Returns the indices of the partitions that make up one basket or a union of baskets."""
+        bitmap = np.zeros(len(self.universe), dtype=bool)
+        for name in names:
+            bitmap |= self.bitmaps[name]
+        return sorted(set(self.partition_of[bitmap].tolist()))
+
+    def split(self, data_dict):
+        """
+        Splits a dictionary of asset data keyed by table name into one dictionary
+        per partition, so per-partition results can be memoized and summed. Symbols
+        outside the registry are grouped together; an empty input gives one empty group.
+
+        Returns:
+            list: Dictionaries in partition order (unregistered symbols last).
+        """
+        groups = {}
+        for symbol, df in data_dict.items():
+            position = self.index.get(symbol)
+            partition = len(self.partitions) if position is None else int(self.partition_of[position])
+            groups.setdefault(partition, {})[symbol] = df
+        return [groups[p] for p in sorted(groups)] or [{}]
+
+
+REGISTRY = BasketRegistry(BASKETS)
+
+
+def basket_symbols(*names):
+    """Returns the table names of a registered basket, or of the union of several."""
+    return REGISTRY.symbols(*names)
+
+
+def all_basket_symbols():
+    """Returns the table names of every registered basket, in config order."""
+    return list(REGISTRY.universe)
+
+
+def split_by_partition(data_dict):
+    """Splits a dictionary of asset data along the partitions of the registry (see BasketRegistry.split)."""
+    return REGISTRY.split(data_dict)
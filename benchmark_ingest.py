@@ -0,0 +1,115 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import pandas as pd
+from config import ALL_SYMBOLS_TO_FETCH, DATAFEED_RECORDINGS_DIR
+from datafeed import SyntheticFeed, ReplayFeed
+from master_data_updater import fetch_and_save_all
+from master_daily_updater import fetch_and_update
+from store import connect_writer, bump_version
+
+# --- Configuration ---
+DEFAULT_HISTORY_BARS = 3000
+DEFAULT_UPDATE_DAYS = 3
+
+
+def _drop_last_days(db_file, tables, days):
+    """Deletes each table's bars of the last `days` days, so the daily update has something to append."""
+    with connect_writer(db_file) as conn:
+        for table_name in tables:
+            last = conn.execute(f'SELECT MAX(datetime) FROM "{table_name}"').fetchone()[0]
+            if last is None:
+                continue
+            cutoff = (pd.Timestamp(last) - pd.Timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+            conn.execute(f'DELETE FROM "{table_name}" WHERE datetime > ?', (cutoff,))
+            bump_version(conn, table_name)
+
+
+def _run_phase(name, feed, run, verbose):
+    """Runs one ingestion phase with fresh feed counters and returns its report row."""
+    feed.stats.clear()
+    started = time.perf_counter()
+    if verbose:
+        failed = run()
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            failed = run()
+    elapsed = time.perf_counter() - started
+    return {
+        'phase': name,
+        'seconds': round(elapsed, 2),
+        'requests': feed.stats['requests'],
+        'throttled': feed.stats['throttled'],
+        'errors': feed.stats['errors'],
+        'bars_fetched': feed.stats['bars'],
+        'bars_per_second': round(feed.stats['bars'] / elapsed) if elapsed else None,
+        'failed_symbols': len(failed),
+    }
+
+
+def benchmark_ingest(feed, symbols, db_file, n_bars=DEFAULT_HISTORY_BARS, update_days=DEFAULT_UPDATE_DAYS, verbose=False):
+    """
+    Runs both updaters end to end against an offline datafeed and a scratch DB:
+    a full history load, then a daily update after the last `update_days` bars
+    of every table have been removed. Post-ingest tasks are not run, so only
+    fetching, normalization and DB writes are measured.
+
+    Returns:
+        pd.DataFrame: One row per phase with timings and datafeed counters.
+    """
+    rows = [_run_phase(
+        'full load', feed,
+        lambda: fetch_and_save_all(feed, db_file=db_file, symbols=symbols, n_bars=n_bars, post_ingest=False),
+        verbose
+    )]
+
+    _drop_last_days(db_file, symbols.values(), update_days)
+    rows.append(_run_phase(
+        'daily update', feed,
+        lambda: fetch_and_update(feed, db_file=db_file, symbols=symbols, post_ingest=False)[1],
+        verbose
+    ))
+
+    with connect_writer(db_file) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # Fold the WAL into the DB file before measuring its size
+        stored = sum(conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in set(symbols.values()))
+    report = pd.DataFrame(rows).set_index('phase')
+    report.attrs['stored_bars'] = stored
+    report.attrs['db_bytes'] = os.path.getsize(db_file)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the data updaters.")
+    parser.add_argument('--feed', choices=('synthetic', 'replay'), default='synthetic')
+    parser.add_argument('--recordings', default=DATAFEED_RECORDINGS_DIR, help="Recordings directory for --feed replay.")
+    parser.add_argument('--symbols', type=int, default=None, help="Only use the first N symbols of the config.")
+    parser.add_argument('--bars', type=int, default=DEFAULT_HISTORY_BARS, help="History bars per symbol on the full load.")
+    parser.add_argument('--update-days', type=int, default=DEFAULT_UPDATE_DAYS)
+    parser.add_argument('--latency', type=float, default=0.0, help="Mean seconds per request.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability that a request raises.")
+    parser.add_argument('--rate-limit', type=float, default=None, help="Requests per second before throttling.")
+    parser.add_argument('--retry-delay', type=float, default=0.0, help="Base delay in seconds before each retry round.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', default=None, help="DB file to write (default: a temporary file).")
+    parser.add_argument('--verbose', action='store_true', help="Show the updaters' own output.")
+    args = parser.parse_args()
+
+    faults = {'latency': args.latency, 'error_rate': args.error_rate, 'rate_limit': args.rate_limit, 'seed': args.seed}
+    if args.feed == 'replay':
+        feed = ReplayFeed(args.recordings, **faults)
+    else:
+        feed = SyntheticFeed(history_days=args.bars + 30, **faults)
+    feed.retry_delay = args.retry_delay
+
+    symbols = dict(list(ALL_SYMBOLS_TO_FETCH.items())[:args.symbols])
+    with tempfile.TemporaryDirectory() as scratch:
+        db_file = args.db or os.path.join(scratch, 'benchmark_market_data.db')
+        report = benchmark_ingest(feed, symbols, db_file, args.bars, args.update_days, args.verbose)
+
+    print(f"--- Ingestion benchmark: {len(symbols)} symbols, {args.feed} feed ---")
+    print(report.to_string())
+    print(f"\nStored bars: {report.attrs['stored_bars']:,}  DB size: {report.attrs['db_bytes'] / 1e6:.1f} MB")
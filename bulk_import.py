@@ -0,0 +1,253 @@
+import argparse
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+from config import ALL_SYMBOLS_TO_FETCH, DB_FILE, FORWARD_FILL_SYMBOLS
+from panel import legacy_stamps_to_utc, normalize_daily_bars, to_day_numbers
+from post_ingest import run_post_ingest_tasks
+from store import connect_writer, write_bars
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None  # Parquet files are skipped without pyarrow
+
+# --- Configuration ---
+CHUNK_SIZE = 500_000
+CSV_SUFFIXES = ('.csv', '.csv.gz', '.csv.zip', '.zip')
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+TIME_COLUMNS = ('datetime', 'date', 'time', 'timestamp', 'open_time', 'open time')
+# Binance kline exports have no header row
+BINANCE_KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+    'quote_volume', 'count', 'taker_buy_volume', 'taker_buy_quote_volume', 'ignore'
+]
+
+
+def build_table_lookup(symbols=ALL_SYMBOLS_TO_FETCH):
+    """
+    Maps every name a dump file may use for a symbol to its DB table: the table
+    name, the exchange symbol and "EXCHANGE_SYMBOL" (all upper case).
+    """
+    lookup = {}
+    for symbol_exchange, table_name in symbols.items():
+        exchange, symbol = symbol_exchange.split(':')
+        lookup.setdefault(symbol.upper(), table_name)
+        lookup[f"{exchange}_{symbol}".upper()] = table_name
+    lookup.update({table_name.upper(): table_name for table_name in symbols.values()})
+    return lookup
+
+
+def table_for_file(path, lookup):
+    """
+    Finds the table of a dump file from its name: the whole stem first, then its
+    leading tokens (so "SOLUSDT-1d-2024-01.csv" maps to SOLUSDT). Returns None
+    when nothing matches.
+    """
+    stem = os.path.basename(path).upper()
+    for suffix in CSV_SUFFIXES + PARQUET_SUFFIXES:
+        if stem.endswith(suffix.upper()):
+            stem = stem[:-len(suffix)]
+            break
+    tokens = re.split(r'[-. ]', stem)
+    for n in range(len(tokens), 0, -1):
+        candidate = '-'.join(tokens[:n])
+        if candidate in lookup:
+            return lookup[candidate]
+    return None
+
+
+def _has_header(path):
+    """Whether a CSV's first line is a header (i.e. does not start with a number)."""
+    first_line = pd.read_csv(path, nrows=1, header=None).iloc[0, 0]
+    try:
+        float(first_line)
+        return False
+    except (TypeError, ValueError):
+        return True
+
+
+def iter_file_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yields a dump file in raw DataFrame chunks of up to chunk_size rows."""
+    if path.lower().endswith(PARQUET_SUFFIXES):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif _has_header(path):
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, header=None, names=BINANCE_KLINE_COLUMNS, usecols=range(6))
+
+
+def _to_utc_datetimes(values):
+    """Parses a time column (epoch seconds, milliseconds or microseconds, or date strings) to naive UTC."""
+    if pd.api.types.is_numeric_dtype(values):
+        magnitude = np.nanmax(np.abs(values.to_numpy(dtype=np.float64)))
+        unit = 'us' if magnitude > 1e14 else 'ms' if magnitude > 1e11 else 's'
+        return pd.DatetimeIndex(pd.to_datetime(values, unit=unit))
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).tz_localize(None)
+
+
+def standardize_chunk(raw):
+    """
+    Turns a raw chunk into an OHLCV DataFrame indexed by naive UTC datetime.
+    A missing volume column is filled with zeros.
+    """
+    raw = raw.rename(columns=lambda col: str(col).strip().lower())
+    time_column = next((col for col in TIME_COLUMNS if col in raw.columns), None)
+    if time_column is None:
+        raise ValueError(f"No time column found (expected one of {TIME_COLUMNS}); columns are {list(raw.columns)}.")
+    missing = [col for col in OHLCV_COLUMNS[:4] if col not in raw.columns]
+    if missing:
+        raise ValueError(f"Missing price columns: {missing}.")
+
+    df = raw.reindex(columns=OHLCV_COLUMNS).astype(np.float64)
+    df['volume'] = df['volume'].fillna(0.0)
+    df.index = _to_utc_datetimes(raw[time_column])
+    df.index.name = 'datetime'
+    return df.dropna(subset=['close'])
+
+
+def _stored_days(conn, table_name):
+    """The day numbers already stored in a table (none if it does not exist yet)."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone():
+        return set()
+    stored = pd.read_sql(f'SELECT datetime FROM "{table_name}"', conn)['datetime']
+    return set(to_day_numbers(legacy_stamps_to_utc(pd.to_datetime(stored))).tolist()) if len(stored) else set()
+
+
+def _insert_bars(conn, table_name, df, stored_days):
+    """
+    Inserts the bars of a normalized chunk whose days are not stored yet, in a
+    single transaction (which also bumps the table's version), and adds them
+    to stored_days.
+
+    Returns:
+        tuple: (rows inserted, whether any of them lie before the last stored day).
+    """
+    days = to_day_numbers(df.index)
+    new = ~np.isin(days, np.fromiter(stored_days, dtype=np.int64, count=len(stored_days)))
+    if not new.any():
+        return 0, False
+    df, days = df[new], days[new]
+
+    backfill = bool(stored_days) and int(days.min()) < max(stored_days)
+    write_bars(conn, table_name, df[OHLCV_COLUMNS])
+    stored_days.update(days.tolist())
+    return len(df), backfill
+
+
+def import_file(conn, path, table_name, stored_days, chunk_size=CHUNK_SIZE):
+    """
+    Streams one dump file into a table. Chunks are normalized onto the daily
+    calendar like fetched bars; the rows of each chunk's last day are held back
+    and merged with the next chunk, so intraday exports split mid-day still
+    become one bar. Files are expected in time order, as exchange exports are.
+
+    Returns:
+        tuple: (rows read, bars inserted, whether bars were inserted before existing history).
+    """
+    forward_fill = table_name in FORWARD_FILL_SYMBOLS
+    rows_read, inserted, backfilled = 0, 0, False
+    carry = None
+    for raw in iter_file_chunks(path, chunk_size):
+        rows_read += len(raw)
+        df = standardize_chunk(raw)
+        if carry is not None:
+            df = pd.concat([carry, df])
+        if df.empty:
+            continue
+        last_day = df.index.max().normalize()
+        carry = df[df.index >= last_day]
+        n, backfill = _insert_bars(conn, table_name, normalize_daily_bars(df[df.index < last_day], forward_fill), stored_days)
+        inserted, backfilled = inserted + n, backfilled or backfill
+
+    if carry is not None and not carry.empty:
+        n, backfill = _insert_bars(conn, table_name, normalize_daily_bars(carry, forward_fill), stored_days)
+        inserted, backfilled = inserted + n, backfilled or backfill
+    return rows_read, inserted, backfilled
+
+
+def find_dump_files(directory):
+    """Lists the CSV and Parquet files under a directory (recursively), sorted by path."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths += [os.path.join(root, f) for f in files if f.lower().endswith(CSV_SUFFIXES + PARQUET_SUFFIXES)]
+    return sorted(paths)
+
+
+def bulk_import(directory, db_file=DB_FILE, table=None, chunk_size=CHUNK_SIZE, post_ingest=True):
+    """
+    Imports a directory of CSV/Parquet OHLCV dumps into the market data DB.
+
+    Each file is mapped to a config table by its name (or all go to `table`),
+    streamed in chunks, normalized onto the daily calendar and deduplicated
+    against the days already stored; only new days are inserted, one batched
+    transaction per chunk.
+
+    Args:
+        directory (str): Directory (or single file) to import.
+        db_file (str): The market data DB.
+        table (str, optional): Import every file into this table instead of mapping by name.
+        chunk_size (int): Rows read per chunk.
+        post_ingest (bool): Whether to run the post-ingest tasks for the changed tables (as
+            full rebuilds when history was added before existing bars).
+
+    Returns:
+        dict: Table name -> bars inserted, for the tables that changed.
+    """
+    paths = [directory] if os.path.isfile(directory) else find_dump_files(directory)
+    lookup = build_table_lookup()
+    changed, backfilled = {}, set()
+    stored = {}
+    started = time.perf_counter()
+    total_rows = 0
+
+    with connect_writer(db_file) as conn:
+        for path in paths:
+            table_name = table or table_for_file(path, lookup)
+            if table_name is None:
+                print(f"Skipping {path}: no config symbol matches its name.")
+                continue
+            if path.lower().endswith(PARQUET_SUFFIXES) and pq is None:
+                print(f"Skipping {path}: reading Parquet files requires pyarrow.")
+                continue
+            if table_name not in stored:
+                stored[table_name] = _stored_days(conn, table_name)
+
+            try:
+                rows_read, inserted, backfill = import_file(conn, path, table_name, stored[table_name], chunk_size)
+            except Exception as e:
+                print(f"Could not import {path}: {e}")
+                continue
+            total_rows += rows_read
+            print(f"{os.path.basename(path)} -> {table_name}: {rows_read:,} rows read, {inserted:,} new bars.")
+            if inserted:
+                changed[table_name] = changed.get(table_name, 0) + inserted
+            if backfill:
+                backfilled.add(table_name)
+
+        elapsed = time.perf_counter() - started
+        print(f"\n--- Imported {sum(changed.values()):,} bars into {len(changed)} tables "
+              f"from {total_rows:,} rows in {elapsed:.1f}s. ---")
+        if backfilled:
+            # The incremental post-ingest tasks only extend their results forward in time
+            print(f"History was added before existing bars of: {', '.join(sorted(backfilled))}. "
+                  + ("Derived results are rebuilt from the full history." if post_ingest
+                     else "Derived results cover it once the post-ingest tasks run with rebuild=True."))
+        if post_ingest:
+            run_post_ingest_tasks(conn, set(changed), rebuild=bool(backfilled))
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Imports a directory of CSV/Parquet OHLCV dumps into the DB.")
+    parser.add_argument('path', help="Directory (searched recursively) or single file to import.")
+    parser.add_argument('--table', default=None, help="Import every file into this table.")
+    parser.add_argument('--db', default=DB_FILE)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--no-post-ingest', action='store_true', help="Do not run the post-ingest tasks.")
+    args = parser.parse_args()
+    bulk_import(args.path, db_file=args.db, table=args.table, chunk_size=args.chunk_size, post_ingest=not args.no_post_ingest)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import indicators
+from utils import load_data
+from panel import panel_memory_bytes, day_numbers_to_datetime
+from config import MACRO_SYMBOLS, BASKETS, EVERYTHING_BASKET_NAME
+
+# --- Configuration ---
+EVERYTHING_BASKET = BASKETS[EVERYTHING_BASKET_NAME]
+COMPACT_COLUMNS = ('close', 'volume')
+
+
+def run_all_indicators(macro, assets):
+    """Runs every indicators.py function with the same arguments the pages use."""
+    return {
+        'calculate_stablecoin_vs_total_roc': indicators.calculate_stablecoin_vs_total_roc(macro['TOTAL'], macro['USDT_D'], macro['USDC_D']),
+        'calculate_altcoin_season_index_v1': indicators.calculate_altcoin_season_index_v1(macro['TOTAL3'], macro['BTC_D']),
+        'calculate_traffic_light': indicators.calculate_traffic_light(macro['TOTAL']).drop(columns=['regime_color']),
+        'calculate_ad_line': indicators.calculate_ad_line(assets),
+        'calculate_assets_above_ma': indicators.calculate_assets_above_ma(assets, ma_length=200),
+        'calculate_distance_from_ma': indicators.calculate_distance_from_ma(assets, ma_length=200),
+        'calculate_market_character': indicators.calculate_market_character(assets),
+        'calculate_regime_scatter_data': indicators.calculate_regime_scatter_data(assets, macro['TOTAL']),
+        'calculate_eth_breadth_wave': indicators.calculate_eth_breadth_wave(assets, macro['ETHUSD']),
+        'calculate_official_altcoin_season_index': indicators.calculate_official_altcoin_season_index(assets, macro['BTCUSD'], macro['BTC_D']),
+    }
+
+
+def compare_results(reference, compact):
+    """
+    Aligns a compact-path result with its float64 reference and returns the
+    maximum absolute and relative differences over the shared cells.
+    """
+    if isinstance(compact.index, pd.DatetimeIndex) or compact.index.dtype == object:
+        compact_aligned = compact
+        reference_aligned = reference
+    else:
+        compact_aligned = compact.copy()
+        compact_aligned.index = day_numbers_to_datetime(compact.index)
+        reference_aligned = reference.copy()
+        reference_aligned.index = reference.index.normalize()
+        reference_aligned = reference_aligned[~reference_aligned.index.duplicated(keep='last')]
+
+    reference_aligned, compact_aligned = reference_aligned.align(compact_aligned, join='inner')
+    ref = np.asarray(reference_aligned, dtype=np.float64)
+    cmp = np.asarray(compact_aligned, dtype=np.float64)
+    abs_diff = np.abs(ref - cmp)
+    rel_diff = abs_diff / np.maximum(np.abs(ref), np.finfo(np.float32).tiny)
+    return {
+        'rows_compared': len(reference_aligned),
+        'max_abs_diff': np.nanmax(abs_diff) if abs_diff.size else np.nan,
+        'max_rel_diff': np.nanmax(rel_diff) if rel_diff.size else np.nan,
+    }
+
+
+def check_compact_precision():
+    """
+    Loads the "Everything" basket on both the default float64 path and the compact
+    float32 path, prints the memory of each, and reports the precision impact of
+    the compact path on every indicators.py function.
+    """
+    macro_full = load_data(asset_list=list(MACRO_SYMBOLS.values()))
+    assets_full = load_data(asset_list=list(EVERYTHING_BASKET.values()))
+    macro_compact = load_data(asset_list=list(MACRO_SYMBOLS.values()), compact=True, columns=COMPACT_COLUMNS)
+    assets_compact = load_data(asset_list=list(EVERYTHING_BASKET.values()), compact=True, columns=COMPACT_COLUMNS)
+
+    if not all([macro_full, assets_full, macro_compact, assets_compact]):
+        print("Could not load the required data. Please run the data updater scripts.")
+        return
+
+    full_bytes = panel_memory_bytes(assets_full)
+    compact_bytes = panel_memory_bytes(assets_compact)
+    print("--- Memory of the 'Everything' basket ---")
+    print(f"float64 path: {full_bytes / 1e6:.2f} MB")
+    print(f"compact path: {compact_bytes / 1e6:.2f} MB ({compact_bytes / full_bytes:.1%} of float64)")
+
+    reference_results = run_all_indicators(macro_full, assets_full)
+    compact_results = run_all_indicators(macro_compact, assets_compact)
+
+    print("\n--- Precision impact of the compact path ---")
+    report = pd.DataFrame({
+        name: compare_results(pd.DataFrame(reference_results[name]), pd.DataFrame(compact_results[name]))
+        for name in reference_results
+    }).T
+    print(report.to_string())
+
+
+if __name__ == "__main__":
+    check_compact_precision()
@@ -1,5 +1,14 @@
 # --- Database Configuration ---
 DB_FILE = "market_data.db"
+# Precomputed indicator results (written after every ingest, read by the pages)
+DERIVED_DB_FILE = "derived_data.db"
+
+# --- Calendar Configuration ---
+# Every bar is stored on the canonical UTC day calendar (one row per UTC day,
+# stamped at midnight). Series listed here do not trade 24/7, so their closed
+# days (weekends, holidays) are forward-filled on ingestion: the previous close
+# is repeated with zero volume. All other series are stored exactly as reported.
+FORWARD_FILL_SYMBOLS = {"NDX"}
 
 # --- Symbol Categories ---
 
@@ -127,3 +136,101 @@ ALL_SYMBOLS_TO_FETCH = {
     **MAJORS_MICRO_CAP,
     **MEME_COIN_BASKET
 }
+
+# --- Baskets ---
+# The baskets offered by the basket pages, keyed by display name, default
+# (first) basket first. baskets.py builds the basket registry on them.
+EVERYTHING_BASKET_NAME = "Everything (All Baskets)"
+BASKETS = {
+    EVERYTHING_BASKET_NAME: {**MAJORS_LARGE_CAP, **MAJORS_MID_CAP, **MAJORS_SMALL_CAP, **MAJORS_MICRO_CAP, **MEME_COIN_BASKET},
+    "Large Caps (>$1B)": MAJORS_LARGE_CAP,
+    "Mid Caps (>$500M)": MAJORS_MID_CAP,
+    "Small Caps (>$100M)": MAJORS_SMALL_CAP,
+    "Micro Caps (>$50M)": MAJORS_MICRO_CAP,
+    "Meme Coins": MEME_COIN_BASKET
+}
+
+# --- Synthetic Indices ---
+# Custom indices built from the baskets above. They are stored in the DB as
+# normal OHLCV tables (updated incrementally after every ingest), so any
+# indicator can load them like a regular asset.
+# weighting: "equal", "volume" (trailing USD volume) or "price"
+# rebalance: pandas period alias - "D" (daily), "W", "M" or "Q"
+MEME_INDEX_SYMBOL = "MEME_INDEX"
+SYNTHETIC_INDICES = {
+    MEME_INDEX_SYMBOL: {"basket": MEME_COIN_BASKET, "weighting": "equal", "rebalance": "D"},
+}
+
+# --- Relative Strength Ranking ---
+# Every asset in the baskets is ranked each day on its returns over these
+# horizons (days). BTCUSD and ETHUSD are placed within the same cross-section.
+RS_HORIZONS = (7, 30, 90)
+RS_BENCHMARKS = ("BTCUSD", "ETHUSD")
+
+# --- Alerting ---
+# Rules evaluated after every ingest on the newly appended bars (see alerts.py).
+# series: "asi" and "assets_above_ma" (per basket), "mfg_total", "mfg_stable_inv"
+#         and "traffic_light" (market-wide)
+# condition: "cross_above" / "cross_below" a threshold, or "change" (any new value)
+# baskets: "*" for every basket in ALERT_BASKETS, or a list of basket names
+# Alerts name the baskets without their size note ("Large Caps (>$1B)" -> "Large Caps")
+ALERT_BASKETS = {name.split(" (")[0]: basket for name, basket in BASKETS.items()}
+ALERT_RULES = [
+    {"name": "Altcoin Season", "series": "asi", "baskets": "*", "condition": "cross_above", "threshold": 75},
+    {"name": "Bitcoin Season", "series": "asi", "baskets": "*", "condition": "cross_below", "threshold": 25},
+    {"name": "TOTAL Momentum Above +20", "series": "mfg_total", "condition": "cross_above", "threshold": 20},
+    {"name": "TOTAL Momentum Below -20", "series": "mfg_total", "condition": "cross_below", "threshold": -20},
+    {"name": "Stablecoin Flow Above +20", "series": "mfg_stable_inv", "condition": "cross_above", "threshold": 20},
+    {"name": "Stablecoin Flow Below -20", "series": "mfg_stable_inv", "condition": "cross_below", "threshold": -20},
+    {"name": "Traffic Light Flip", "series": "traffic_light", "condition": "change"},
+    {"name": "Breadth Above 50%", "series": "assets_above_ma", "length": 200, "baskets": "*", "condition": "cross_above", "threshold": 50},
+    {"name": "Breadth Below 50%", "series": "assets_above_ma", "length": 200, "baskets": "*", "condition": "cross_below", "threshold": 50},
+]
+ALERT_FILE_SINK = None    # e.g. "alerts.jsonl" to append every fired event as a JSON line
+ALERT_WEBHOOK_URL = None  # e.g. a Slack/Discord-compatible webhook that accepts a JSON POST
+
+# --- Scheduler ---
+# The scheduler daemon (scheduler.py) wakes once per daily bar close of each
+# exchange group, offset_minutes after the close, and updates that group's symbols.
+# close_day_offset: 1 when the bar stamped day D closes at `close` on day D+1
+# (24/7 crypto bars close at midnight UTC), 0 when it closes on day D itself.
+# weekdays: days of the week (0 = Monday) on which the group closes.
+SCHEDULE_GROUPS = {
+    "crypto": {
+        "exchanges": ["BINANCE", "BITSTAMP", "BYBIT", "COINBASE", "CRYPTO", "CRYPTOCAP", "OKX"],
+        "timezone": "UTC", "close": "00:00", "close_day_offset": 1, "offset_minutes": 5,
+        "weekdays": [0, 1, 2, 3, 4, 5, 6],
+    },
+    "us_equities": {
+        "exchanges": ["NASDAQ"],
+        "timezone": "America/New_York", "close": "16:00", "close_day_offset": 0, "offset_minutes": 20,
+        "weekdays": [0, 1, 2, 3, 4],
+    },
+}
+DEFAULT_SCHEDULE_GROUP = "crypto"  # Used for exchanges not listed in any group
+SCHEDULER_HEALTH_PORT = 8765       # Port of the /health JSON endpoint (None disables it)
+
+# --- Datafeed ---
+# Where the updaters and the scheduler fetch bars from (see datafeed.py):
+# "tradingview", "record" (TradingView, saving every response to
+# DATAFEED_RECORDINGS_DIR), "replay" (the saved responses) or "synthetic".
+DATAFEED = "tradingview"
+DATAFEED_RECORDINGS_DIR = "datafeed_recordings"
+
+# --- Persistent Memoization ---
+# Indicator results are memoized on disk (see memo.py), keyed on the function,
+# its parameters and the data versions of its input symbols, and shared by every
+# process. Least recently used results are evicted beyond MEMO_MAX_BYTES.
+MEMO_ENABLED = True
+MEMO_DB_FILE = "memo_cache.db"
+MEMO_MAX_BYTES = 512 * 1024 * 1024
+
+# --- Cache Warm-up ---
+# A background thread of the dashboard server computes every page's default
+# view when the server starts, again once an ingest has changed the data
+# (checked every WARMUP_POLL_SECONDS) and again when the load cache expires.
+# With WARMUP_ALL_BASKETS the basket pages are then warmed for every basket.
+WARMUP_ENABLED = True
+WARMUP_ALL_BASKETS = True
+WARMUP_POLL_SECONDS = 30
+WARMUP_STEP_PAUSE_SECONDS = 0.05  # Yield between steps so page requests get the CPU
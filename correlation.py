@@ -0,0 +1,180 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from panel import align_on_calendar
+from intermediates import get_intermediate, basket_version
+
+# --- Configuration ---
+CORRELATION_BLOCK_SIZE = 128  # Dates processed per vectorized block
+MAX_CACHED_RESULTS = 16
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key, compute):
+    """Returns the cached result for key, computing and storing it on a miss (LRU)."""
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    result = compute()
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > MAX_CACHED_RESULTS:
+            _cache.popitem(last=False)
+    return result
+
+
+def _returns_panel(data_dict):
+    """Aligns the daily returns of every asset on the shared day calendar (dates x symbols)."""
+    return align_on_calendar({symbol: get_intermediate(df, 'returns') for symbol, df in data_dict.items()})
+
+
+def _standardized_windows(windows):
+    """
+    Centers every (date, asset) window and scales it to unit norm, so that the
+    dot product of two standardized windows is their Pearson correlation.
+    Assets without `window` valid returns, or with zero variance, are inactive
+    and come back as zeros.
+
+    Args:
+        windows (np.ndarray): Shape (dates, assets, window).
+
+    Returns:
+        tuple: (standardized windows, active mask of shape (dates, assets)).
+    """
+    centered = windows - windows.mean(axis=2, keepdims=True)
+    norms = np.sqrt((centered ** 2).sum(axis=2))
+    active = np.isfinite(norms) & (norms > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(active, 1 / norms, 0.0)
+    return np.where(active[..., None], centered * scale[..., None], 0.0), active
+
+
+def calculate_rolling_correlation(data_dict, benchmarks, window=30):
+    """
+    Calculates rolling correlation statistics of a basket without building a
+    correlation matrix per date.
+
+    The sum of every pairwise correlation among the active assets equals the
+    squared norm of the sum of their standardized return windows, so each date
+    costs O(assets x window) instead of O(assets^2 x window). Dates are processed
+    in blocks of sliding windows with vectorized numpy operations.
+
+    Args:
+        data_dict (dict): Asset DataFrames of the basket.
+        benchmarks (dict): Benchmark name -> DataFrame, e.g. BTCUSD and ETHUSD.
+        window (int): Rolling window of daily returns.
+
+    Returns:
+        pd.DataFrame: Indexed by date with 'average_correlation', 'active_assets'
+            and one 'corr_to_<benchmark>' column (mean correlation of the active
+            assets to that benchmark).
+    """
+    key = ('rolling', basket_version(data_dict), basket_version(benchmarks), window)
+    return _cached(key, lambda: _rolling_correlation(data_dict, benchmarks, window))
+
+
+def _rolling_correlation(data_dict, benchmarks, window):
+    returns = _returns_panel({**data_dict, **{f'__{name}__': df for name, df in benchmarks.items()}})
+    benchmark_columns = [f'__{name}__' for name in benchmarks]
+    asset_values = returns.drop(columns=benchmark_columns).to_numpy(dtype=np.float64)
+    benchmark_values = returns[benchmark_columns].to_numpy(dtype=np.float64)
+
+    n_dates = len(returns) - window + 1
+    if n_dates <= 0:
+        return pd.DataFrame()
+    asset_windows = sliding_window_view(asset_values, window, axis=0)
+    benchmark_windows = sliding_window_view(benchmark_values, window, axis=0)
+
+    average, active_counts = np.full(n_dates, np.nan), np.zeros(n_dates, dtype=np.int64)
+    to_benchmark = np.full((n_dates, len(benchmarks)), np.nan)
+    for start in range(0, n_dates, CORRELATION_BLOCK_SIZE):
+        block = slice(start, start + CORRELATION_BLOCK_SIZE)
+        z, active = _standardized_windows(asset_windows[block])
+        zb, benchmark_active = _standardized_windows(benchmark_windows[block])
+        n_active = active.sum(axis=1)
+
+        # --- Average pairwise correlation: (||sum_i z_i||^2 - n) / (n (n - 1)) ---
+        pair_sum = (z.sum(axis=1) ** 2).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average[block] = np.where(n_active > 1, (pair_sum - n_active) / (n_active * (n_active - 1)), np.nan)
+            # --- Mean correlation of the active assets to each benchmark ---
+            benchmark_corr = np.einsum('daw,dbw->db', z, zb) / n_active[:, None]
+        to_benchmark[block] = np.where(benchmark_active & (n_active[:, None] > 0), benchmark_corr, np.nan)
+        active_counts[block] = n_active
+
+    result = pd.DataFrame({'average_correlation': average, 'active_assets': active_counts}, index=returns.index[window - 1:])
+    for position, name in enumerate(benchmarks):
+        result[f'corr_to_{name}'] = to_benchmark[:, position]
+    return result.dropna(subset=['average_correlation'])
+
+
+def calculate_correlation_matrix(data_dict, window=30, as_of=None):
+    """
+    Calculates the correlation matrix of daily returns over the `window` days
+    ending at `as_of` (the latest date by default). Only assets with a full
+    window of returns are included.
+
+    Returns:
+        pd.DataFrame: Symmetric correlation matrix (symbols x symbols).
+    """
+    key = ('matrix', basket_version(data_dict), window, as_of)
+    return _cached(key, lambda: _correlation_matrix(data_dict, window, as_of))
+
+
+def _correlation_matrix(data_dict, window, as_of):
+    returns = _returns_panel(data_dict)
+    if as_of is not None:
+        returns = returns[returns.index <= as_of]
+    if len(returns) < window:
+        return pd.DataFrame()
+    z, active = _standardized_windows(returns.iloc[-window:].to_numpy(dtype=np.float64).T[None])
+    z, symbols = z[0][active[0]], returns.columns[active[0]]
+    return pd.DataFrame(np.clip(z @ z.T, -1.0, 1.0), index=symbols, columns=symbols)
+
+
+def cluster_correlation_matrix(corr_matrix, max_distance=0.5):
+    """
+    Average-linkage hierarchical clustering of a correlation matrix on the
+    distance 1 - correlation, cut where clusters would merge beyond max_distance.
+
+    Returns:
+        tuple: (pd.Series of cluster labels indexed by symbol, list of symbols in
+            dendrogram leaf order, useful for ordering the matrix heatmap).
+    """
+    symbols = list(corr_matrix.index)
+    if not symbols:
+        return pd.Series(dtype=np.int64), []
+
+    distances = 1 - corr_matrix.to_numpy(dtype=np.float64)
+    np.fill_diagonal(distances, np.inf)
+    clusters = {i: [i] for i in range(len(symbols))}
+    labels_cut = None
+
+    while len(clusters) > 1:
+        alive = list(clusters)
+        sub = distances[np.ix_(alive, alive)]
+        flat = np.argmin(sub)
+        a, b = alive[flat // len(alive)], alive[flat % len(alive)]
+        if labels_cut is None and sub.flat[flat] > max_distance:
+            labels_cut = {member: label for label, members in enumerate(clusters.values()) for member in members}
+
+        # --- Lance-Williams update for average linkage; cluster b is merged into a ---
+        size_a, size_b = len(clusters[a]), len(clusters[b])
+        merged = (size_a * distances[a] + size_b * distances[b]) / (size_a + size_b)
+        distances[a], distances[:, a] = merged, merged
+        distances[a, a] = np.inf
+        distances[b], distances[:, b] = np.inf, np.inf
+        clusters[a] = clusters[a] + clusters.pop(b)
+
+    order = [symbols[i] for i in next(iter(clusters.values()))]
+    if labels_cut is None:
+        labels_cut = {i: 0 for i in range(len(symbols))}
+    # --- Number the clusters in leaf order ---
+    leaf_labels = pd.Series([labels_cut[i] for i in next(iter(clusters.values()))], index=order, name='cluster')
+    renumbered = {label: number for number, label in enumerate(pd.unique(leaf_labels))}
+    return leaf_labels.map(renumbered), order
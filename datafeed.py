@@ -0,0 +1,236 @@
+import os
+import random
+import time
+import zlib
+from collections import Counter, deque
+import numpy as np
+import pandas as pd
+from config import (
+    DATAFEED, DATAFEED_RECORDINGS_DIR, SCHEDULE_GROUPS, DEFAULT_SCHEDULE_GROUP
+)
+from panel import local_to_utc
+
+# --- Datafeeds ---
+# The updaters and the scheduler only talk to a datafeed through
+# get_daily_bars(symbol, exchange, n_bars), which returns the latest n_bars
+# daily OHLCV bars (naive UTC DatetimeIndex) or None when the
+# feed has nothing to return. Besides TradingView there are offline
+# implementations for tests and benchmarks:
+#   - RecordingFeed wraps another feed and saves every response to disk,
+#   - ReplayFeed serves those recordings back,
+#   - SyntheticFeed generates deterministic random-walk bars for any symbol,
+# and the last two can inject latency, errors and rate limiting.
+DATAFEED_KINDS = ('tradingview', 'record', 'replay', 'synthetic')
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class Datafeed:
+    """
+    Base class of the datafeeds. Subclasses implement _fetch; the base class
+    counts requests, empty responses and bars served in `stats`.
+
+    request_pause is how long the updaters wait after each successful fetch,
+    retry_delay the base delay (multiplied by the attempt number) before a
+    round of retries.
+    """
+    request_pause = 0.0
+    retry_delay = 0.0
+
+    def __init__(self):
+        self.stats = Counter()
+
+    def get_daily_bars(self, symbol, exchange, n_bars):
+        """Returns the latest n_bars daily OHLCV bars of a symbol, or None."""
+        self.stats['requests'] += 1
+        df = self._fetch(symbol, exchange, n_bars)
+        if df is None or df.empty:
+            self.stats['empty'] += 1
+            return None
+        self.stats['bars'] += len(df)
+        return df
+
+    def _fetch(self, symbol, exchange, n_bars):
+        raise NotImplementedError
+
+
+class TradingViewFeed(Datafeed):
+    """
+    The live TradingView feed (tvDatafeed), paced like the original updaters.
+    tvDatafeed stamps bars in this machine's local time; they are converted to UTC.
+    """
+    request_pause = 1.0
+    retry_delay = 5.0
+
+    def __init__(self):
+        super().__init__()
+        from tvDatafeed import TvDatafeed, Interval
+        self._tv = TvDatafeed()
+        self._interval = Interval.in_daily
+
+    def _fetch(self, symbol, exchange, n_bars):
+        df = self._tv.get_hist(symbol=symbol, exchange=exchange, interval=self._interval, n_bars=n_bars)
+        if df is not None and not df.empty:
+            df.index = local_to_utc(df.index)
+        return df
+
+
+def _recording_path(directory, symbol, exchange):
+    return os.path.join(directory, f"{exchange}_{symbol}.pkl")
+
+
+class RecordingFeed(Datafeed):
+    """
+    Wraps another feed and saves every non-empty response to
+    <directory>/<EXCHANGE>_<SYMBOL>.pkl, merged with what was recorded before,
+    so the recordings keep the longest history seen.
+    """
+
+    def __init__(self, inner, directory=DATAFEED_RECORDINGS_DIR):
+        super().__init__()
+        self.inner = inner
+        self.directory = directory
+        self.request_pause = inner.request_pause
+        self.retry_delay = inner.retry_delay
+        os.makedirs(directory, exist_ok=True)
+
+    def _fetch(self, symbol, exchange, n_bars):
+        df = self.inner.get_daily_bars(symbol, exchange, n_bars)
+        if df is not None and not df.empty:
+            path = _recording_path(self.directory, symbol, exchange)
+            recorded = df
+            if os.path.exists(path):
+                previous = pd.read_pickle(path)
+                recorded = pd.concat([previous[~previous.index.isin(df.index)], df]).sort_index()
+            recorded.to_pickle(path)
+        return df
+
+
+class SimulatedFeed(Datafeed):
+    """
+    Base class of the offline feeds, adding fault injection in front of _fetch.
+
+    Args:
+        latency (float): Mean seconds per request (each request sleeps 0.5x-1.5x this).
+        error_rate (float): Probability that a request raises ConnectionError.
+        rate_limit (float, optional): Requests per second; requests over the limit
+            return None, which is how TradingView responds when throttling.
+        seed (int): Seed of the fault injection (and of the synthetic bars).
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, rate_limit=None, seed=0):
+        super().__init__()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._recent_requests = deque()
+
+    def get_daily_bars(self, symbol, exchange, n_bars):
+        if self.latency:
+            time.sleep(self.latency * self._random.uniform(0.5, 1.5))
+
+        if self.rate_limit:
+            now = time.monotonic()
+            while self._recent_requests and now - self._recent_requests[0] >= 1.0:
+                self._recent_requests.popleft()
+            if len(self._recent_requests) >= self.rate_limit:
+                self.stats['requests'] += 1
+                self.stats['throttled'] += 1
+                return None
+            self._recent_requests.append(now)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.stats['requests'] += 1
+            self.stats['errors'] += 1
+            raise ConnectionError(f"Simulated datafeed error for {exchange}:{symbol}")
+        return super().get_daily_bars(symbol, exchange, n_bars)
+
+
+class ReplayFeed(SimulatedFeed):
+    """Serves the responses saved by RecordingFeed; symbols without a recording return None."""
+
+    def __init__(self, directory=DATAFEED_RECORDINGS_DIR, **faults):
+        super().__init__(**faults)
+        self.directory = directory
+        self._recordings = {}
+
+    def _fetch(self, symbol, exchange, n_bars):
+        key = (exchange, symbol)
+        if key not in self._recordings:
+            path = _recording_path(self.directory, symbol, exchange)
+            self._recordings[key] = pd.read_pickle(path) if os.path.exists(path) else None
+        recorded = self._recordings[key]
+        return None if recorded is None else recorded.tail(n_bars).copy()
+
+
+class SyntheticFeed(SimulatedFeed):
+    """
+    Generates daily bars for any symbol: a geometric random walk seeded from the
+    symbol name, so every run (and every process) sees the same history. Bars
+    end on `end` (today by default) and follow the trading days of the symbol's
+    schedule group.
+
+    Args:
+        history_days (int): Calendar days of history available per symbol.
+        end (str or pd.Timestamp, optional): Day of the last bar.
+        **faults: latency, error_rate, rate_limit and seed (see SimulatedFeed).
+    """
+
+    def __init__(self, history_days=3000, end=None, **faults):
+        super().__init__(**faults)
+        self.history_days = history_days
+        self.end = pd.Timestamp(end).normalize() if end is not None else pd.Timestamp.now().normalize()
+        self._group_of_exchange = {
+            exchange: spec for spec in SCHEDULE_GROUPS.values() for exchange in spec['exchanges']
+        }
+        self._history = {}
+
+    def _generate(self, symbol, exchange):
+        spec = self._group_of_exchange.get(exchange, SCHEDULE_GROUPS[DEFAULT_SCHEDULE_GROUP])
+        dates = pd.date_range(end=self.end, periods=self.history_days, freq='D')
+        dates = dates[dates.weekday.isin(spec['weekdays'])]
+
+        rng = np.random.default_rng(zlib.crc32(f"{exchange}:{symbol}".encode()) ^ self.seed)
+        n = len(dates)
+        log_returns = rng.normal(0.0, rng.uniform(0.01, 0.06), n)
+        close = rng.uniform(0.01, 1000.0) * np.exp(np.cumsum(log_returns))
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        wick = np.abs(rng.normal(0.0, 0.01, (2, n)))
+        df = pd.DataFrame({
+            'open': open_,
+            'high': np.maximum(open_, close) * (1 + wick[0]),
+            'low': np.minimum(open_, close) * (1 - wick[1]),
+            'close': close,
+            'volume': rng.lognormal(15.0, 1.0, n),
+        }, index=pd.DatetimeIndex(dates, name='datetime'))
+        df.insert(0, 'symbol', f"{exchange}:{symbol}")
+        return df
+
+    def _fetch(self, symbol, exchange, n_bars):
+        key = (exchange, symbol)
+        if key not in self._history:
+            self._history[key] = self._generate(symbol, exchange)
+        return self._history[key].tail(n_bars).copy()
+
+
+def make_datafeed(kind=DATAFEED, **options):
+    """
+    Creates a datafeed by name ('tradingview', 'record', 'replay' or 'synthetic').
+    Extra options go to the feed's constructor ('record' passes them to RecordingFeed).
+    """
+    if kind == 'tradingview':
+        return TradingViewFeed()
+    if kind == 'record':
+        return RecordingFeed(TradingViewFeed(), **options)
+    if kind == 'replay':
+        return ReplayFeed(**options)
+    if kind == 'synthetic':
+        return SyntheticFeed(**options)
+    raise ValueError(f"Unknown datafeed '{kind}'. Expected one of {DATAFEED_KINDS}.")
+
+
+def add_datafeed_argument(parser):
+    """Adds the --feed option shared by the updater scripts."""
+    parser.add_argument('--feed', choices=DATAFEED_KINDS, default=DATAFEED,
+                        help=f"Datafeed to fetch from (default: {DATAFEED}).")
@@ -0,0 +1,75 @@
+import pickle
+import secrets
+import sqlite3
+from datetime import datetime, timezone
+from config import DERIVED_DB_FILE
+from store import BUSY_TIMEOUT_SECONDS
+
+# --- Derived Results Store ---
+# Indicator results precomputed after ingestion are kept in their own DB, so
+# load_data (which can load every table of the market data DB) never sees them.
+# Each result is a pickled object (usually a DataFrame) stored under a name,
+# with a random version token replaced on every write (like the symbol
+# versions in store.py), so readers can key caches on exactly the write they
+# read, however close together two writes are.
+
+
+def connect_derived(db_file=DERIVED_DB_FILE):
+    """
+    Opens the derived results DB, creating the frames table if needed. The DB is
+    kept in WAL mode, so pages reading results never wait for a post-ingest task
+    writing them.
+    """
+    conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS derived_frames "
+        "(name TEXT PRIMARY KEY, updated_at TEXT NOT NULL, payload BLOB NOT NULL, version TEXT NOT NULL DEFAULT '')"
+    )
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(derived_frames)")}
+    if 'version' not in columns:
+        # DBs written before versions were added: give every stored result a first version
+        with conn:
+            conn.execute("ALTER TABLE derived_frames ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+            conn.execute("UPDATE derived_frames SET version = lower(hex(randomblob(8)))")
+    return conn
+
+
+def save_frame(conn, name, frame):
+    """Stores (or replaces) a derived result under the given name."""
+    payload = pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+    updated_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO derived_frames (name, updated_at, payload, version) VALUES (?, ?, ?, ?)",
+            (name, updated_at, sqlite3.Binary(payload), secrets.token_hex(8))
+        )
+
+
+def load_frame(conn, name):
+    """Returns the derived result stored under the given name, or None if it has not been computed."""
+    row = conn.execute("SELECT payload FROM derived_frames WHERE name = ?", (name,)).fetchone()
+    return pickle.loads(row[0]) if row else None
+
+
+def delete_frames(conn, names):
+    """Deletes the derived results stored under the given names (names not stored are ignored)."""
+    with conn:
+        conn.executemany("DELETE FROM derived_frames WHERE name = ?", [(name,) for name in names])
+
+
+def frame_updated_at(conn, name):
+    """Returns when a derived result was last written (UTC string), or None."""
+    row = conn.execute("SELECT updated_at FROM derived_frames WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def frame_version(conn, name):
+    """Returns the version token of a derived result's last write, or None if it has not been computed."""
+    row = conn.execute("SELECT version FROM derived_frames WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def read_frame_versions(conn):
+    """Returns {name: version} of every stored derived result."""
+    return dict(conn.execute("SELECT name, version FROM derived_frames").fetchall())
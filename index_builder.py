@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+from config import SYNTHETIC_INDICES, FORWARD_FILL_SYMBOLS
+from panel import align_on_calendar, day_numbers_to_datetime, legacy_stamps_to_utc, normalize_daily_bars
+from store import write_bars
+from derived_store import connect_derived, save_frame, load_frame
+
+# --- Configuration ---
+INDEX_BASE_LEVEL = 100.0
+VOLUME_WEIGHT_WINDOW = 30  # Days of USD volume averaged for volume weighting
+WEIGHTINGS = ('equal', 'volume', 'price')
+STORED_ROWS_TO_SCAN = 400  # Enough rows to find the previous rebalance for every supported frequency
+SOURCES_FRAME = 'synthetic_index:sources'  # Per index: {symbol: history fingerprint} of the rows it was built from
+
+
+def _period_labels(index, rebalance):
+    """Returns the rebalancing period each row of a datetime or day-number index falls in."""
+    dates = index if isinstance(index, pd.DatetimeIndex) else day_numbers_to_datetime(index)
+    return dates.to_period(rebalance)
+
+
+def build_index(data_dict, weighting='equal', rebalance='D', base_level=INDEX_BASE_LEVEL, start=None):
+    """
+    Builds a custom index from a basket of assets.
+
+    Weights are set on the first row and on the last row of every rebalancing
+    period, then drift with prices until the next rebalance. Only assets with a
+    close on the rebalance row are included in the following period. With equal
+    weighting and daily rebalancing this is the average daily return of the basket.
+
+    Args:
+        data_dict (dict): A dictionary of asset DataFrames with a 'close' column
+            (and 'volume' for volume weighting).
+        weighting (str): 'equal', 'volume' (trailing USD volume) or 'price'.
+        rebalance (str): Pandas period alias for the rebalancing frequency ('D', 'W', 'M', 'Q').
+        base_level (float): The index level on the first row.
+        start (optional): Index label of the first row. Earlier rows are only used as
+            history for the volume weights.
+
+    Returns:
+        pd.DataFrame: An OHLCV-shaped DataFrame (open/high/low equal close) whose
+            'volume' is the basket's total USD volume.
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Unknown weighting '{weighting}'. Expected one of {WEIGHTINGS}.")
+    if not data_dict:
+        return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+
+    closes = align_on_calendar({symbol: df['close'] for symbol, df in data_dict.items()})
+    has_volume = all('volume' in df.columns for df in data_dict.values())
+    if has_volume:
+        volumes = align_on_calendar({symbol: df['volume'] for symbol, df in data_dict.items()}).reindex(closes.index)
+        usd_volume = closes * volumes
+    elif weighting == 'volume':
+        raise ValueError("Volume weighting requires a 'volume' column for every asset.")
+
+    if weighting == 'volume':
+        raw_weights = usd_volume.rolling(window=VOLUME_WEIGHT_WINDOW, min_periods=1).mean()
+    elif weighting == 'price':
+        raw_weights = closes
+    else:
+        raw_weights = closes.notna().astype(float)
+
+    if start is not None:
+        keep = closes.index >= start
+        closes, raw_weights = closes[keep], raw_weights[keep]
+        if has_volume:
+            usd_volume = usd_volume[keep]
+
+    # Assets keep their last close after their final bar, like pct_change's default padding
+    filled = closes.ffill().to_numpy(dtype=np.float64)
+    weights = raw_weights.to_numpy(dtype=np.float64)
+    periods = _period_labels(closes.index, rebalance)
+    rebalance_rows = np.flatnonzero(np.append(periods[1:] != periods[:-1], True))
+    rebalance_rows = np.unique(np.append(0, rebalance_rows))
+
+    levels = np.full(len(closes), np.nan)
+    levels[0] = base_level
+    for k, row in enumerate(rebalance_rows):
+        stop = rebalance_rows[k + 1] + 1 if k + 1 < len(rebalance_rows) else len(closes)
+        if stop <= row + 1:
+            continue
+        base = filled[row]
+        valid = np.isfinite(base) & (base > 0) & np.isfinite(weights[row]) & (weights[row] > 0)
+        if valid.any():
+            w = weights[row, valid] / weights[row, valid].sum()
+            growth = filled[row + 1:stop][:, valid] / base[valid]
+            levels[row + 1:stop] = levels[row] * (growth @ w)
+        else:
+            levels[row + 1:stop] = levels[row]
+
+    index_df = pd.DataFrame({'open': levels, 'high': levels, 'low': levels, 'close': levels}, index=closes.index)
+    index_df['volume'] = usd_volume.sum(axis=1) if has_volume else np.nan
+    return index_df
+
+
+def read_basket(conn, table_names, since=None):
+    """Reads the close and volume of every existing basket table, optionally only from a given date."""
+    existing_tables = set(pd.read_sql("SELECT name FROM sqlite_master WHERE type='table';", conn)['name'])
+    data = {}
+    for table_name in table_names:
+        if table_name not in existing_tables:
+            continue
+        query = f'SELECT datetime, close, volume FROM "{table_name}"'
+        params = None
+        if since is not None:
+            query += ' WHERE datetime >= ?'
+            params = (since.strftime('%Y-%m-%d %H:%M:%S'),)
+        df = pd.read_sql(query, conn, index_col='datetime', params=params)
+        df.index = legacy_stamps_to_utc(pd.to_datetime(df.index))
+        df = normalize_daily_bars(df, forward_fill=table_name in FORWARD_FILL_SYMBOLS)
+        if not df.empty:
+            data[table_name] = df
+    return data
+
+
+def tail_start(conn, table_names, since):
+    """
+    The day a set of tables' tail from `since` is re-read from: the last bar
+    before `since` of every symbol with bars from `since` on, however far back
+    it is, so the first recomputed change of each symbol has its previous close.
+    """
+    since_text = since.strftime('%Y-%m-%d %H:%M:%S')
+    existing_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    start = since
+    for symbol in table_names:
+        if symbol not in existing_tables:
+            continue
+        previous = conn.execute(
+            f'SELECT MAX(datetime) FROM "{symbol}" WHERE datetime < ? AND EXISTS (SELECT 1 FROM "{symbol}" WHERE datetime >= ?)',
+            (since_text, since_text)
+        ).fetchone()[0]
+        if previous is not None:
+            start = min(start, pd.Timestamp(previous).normalize())
+    return start
+
+
+def _history_fingerprints(conn, basket, through):
+    """
+    Fingerprints every constituent's stored rows up to `through` (the index's
+    last row): first day, row count and close/volume totals. Appending bars after
+    it leaves the fingerprint as is, while replacing, correcting or backfilling
+    any earlier row changes it.
+    """
+    existing_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    through_text = pd.Timestamp(through).strftime('%Y-%m-%d %H:%M:%S')
+    fingerprints = {}
+    for symbol in basket:
+        if symbol not in existing_tables:
+            continue
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{symbol}")')}
+        volume = 'TOTAL(volume)' if 'volume' in columns else '0'
+        fingerprints[symbol] = conn.execute(
+            f'SELECT MIN(datetime), COUNT(*), TOTAL(close), {volume} FROM "{symbol}" WHERE datetime <= ?', (through_text,)
+        ).fetchone()
+    return fingerprints
+
+
+def update_synthetic_index(conn, name, spec):
+    """
+    Brings one synthetic index table up to date.
+
+    If the table already exists and the constituents' history up to its last
+    row is unchanged (see _history_fingerprints), the index is recomputed only
+    from the last rebalance before its final stored row (starting from the
+    stored level there) and the new rows are appended. Otherwise, e.g. after a
+    constituent's full history was replaced or a bar arrived for a day the index
+    already covers, the full history is rebuilt.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the market data DB.
+        name (str): The table name of the synthetic index.
+        spec (dict): The index definition from config.SYNTHETIC_INDICES.
+    """
+    basket = list(spec['basket'].values())
+    weighting, rebalance = spec.get('weighting', 'equal'), spec.get('rebalance', 'D')
+
+    derived_conn = connect_derived()
+    try:
+        sources = load_frame(derived_conn, SOURCES_FRAME) or {}
+        stored = None
+        table_exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+        if table_exists:
+            last_stored_date = pd.to_datetime(conn.execute(f'SELECT MAX(datetime) FROM "{name}"').fetchone()[0])
+            if sources.get(name) == _history_fingerprints(conn, basket, last_stored_date):
+                stored = pd.read_sql(
+                    f'SELECT datetime, close FROM "{name}" ORDER BY datetime DESC LIMIT {STORED_ROWS_TO_SCAN}',
+                    conn, index_col='datetime'
+                ).iloc[::-1]
+                stored.index = pd.to_datetime(stored.index)
+                periods = _period_labels(stored.index, rebalance)
+                stored = stored[periods < periods[-1]] if len(stored) else stored
+            else:
+                print(f"The constituents of synthetic index '{name}' changed before its last row; rebuilding it.")
+
+        if stored is None or stored.empty:
+            index_df = build_index(read_basket(conn, basket), weighting, rebalance)
+            index_df.index.name = 'datetime'
+            write_bars(conn, name, index_df, replace=True)
+            print(f"Built synthetic index '{name}' with {len(index_df)} records.")
+        else:
+            resume_date, resume_level = stored.index[-1], stored['close'].iloc[-1]
+            history_start = resume_date - pd.Timedelta(days=VOLUME_WEIGHT_WINDOW)
+            index_df = build_index(
+                read_basket(conn, basket, since=history_start), weighting, rebalance,
+                base_level=resume_level, start=resume_date
+            )
+            new_rows = index_df[index_df.index > last_stored_date]
+            new_rows.index.name = 'datetime'
+            if new_rows.empty:
+                print(f"Synthetic index '{name}' is already up to date.")
+                return
+            write_bars(conn, name, new_rows)
+            print(f"Appended {len(new_rows)} new records to synthetic index '{name}'.")
+
+        if len(index_df):
+            sources[name] = _history_fingerprints(conn, basket, index_df.index[-1])
+            save_frame(derived_conn, SOURCES_FRAME, sources)
+    finally:
+        derived_conn.close()
+
+
+def update_synthetic_indices(conn, changed_tables=None):
+    """
+    Brings every synthetic index defined in config.SYNTHETIC_INDICES up to date.
+    When changed_tables is given, indices with no changed constituent are skipped.
+    """
+    for name, spec in SYNTHETIC_INDICES.items():
+        if changed_tables is not None and not changed_tables & set(spec['basket'].values()):
+            continue
+        update_synthetic_index(conn, name, spec)
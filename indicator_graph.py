@@ -0,0 +1,141 @@
+import indicators
+import volume_breadth
+from intermediates import get_intermediate
+from config import MEME_INDEX_SYMBOL
+
+# Scope marker for intermediates computed for every asset in the selected basket
+BASKET = '*'
+
+
+def _meme_index_input(data, basket):
+    """
+    The meme strength input: the synthetic MEME_INDEX, whether it was loaded as
+    a named symbol or with the basket, so the index is not rebuilt from its
+    constituents (as on the Meme Strength page).
+    """
+    return {MEME_INDEX_SYMBOL: {**basket, **data}[MEME_INDEX_SYMBOL]}
+
+
+# --- Indicator Registry ---
+# Every dashboard indicator declares its inputs: the named symbols it reads,
+# whether it reads the selected basket, the columns it needs, and the shared
+# per-asset intermediates (scope, intermediate, parameter) it uses. 'compute'
+# receives a dict of the named symbols and the basket dict.
+INDICATOR_SPECS = {
+    'market_flow_gauge': {
+        'symbols': ['TOTAL', 'USDT_D', 'USDC_D'], 'basket': False, 'columns': ['close'],
+        'intermediates': [('TOTAL', 'roc', 30), ('USDT_D', 'roc', 30), ('USDC_D', 'roc', 30)],
+        'compute': lambda data, basket: indicators.calculate_stablecoin_vs_total_roc(data['TOTAL'], data['USDT_D'], data['USDC_D'], roc_len=30),
+    },
+    'altcoin_season_index_v1': {
+        'symbols': ['TOTAL3', 'BTC_D'], 'basket': False, 'columns': ['close'],
+        'intermediates': [],
+        'compute': lambda data, basket: indicators.calculate_altcoin_season_index_v1(data['TOTAL3'], data['BTC_D'], ma_length=30),
+    },
+    'official_altcoin_season_index': {
+        'symbols': ['BTCUSD', 'BTC_D'], 'basket': True, 'columns': ['close', 'volume'],
+        'intermediates': [(BASKET, 'roc', 90), (BASKET, 'volume_sma', 20), ('BTCUSD', 'roc', 90)],
+        'compute': lambda data, basket: indicators.calculate_official_altcoin_season_index(basket, data['BTCUSD'], data['BTC_D']),
+    },
+    'traffic_light': {
+        'symbols': ['TOTAL'], 'basket': False, 'columns': ['close'],
+        'intermediates': [('TOTAL', 'ema', 21), ('TOTAL', 'sma', 50), ('TOTAL', 'sma', 200)],
+        'compute': lambda data, basket: indicators.calculate_traffic_light(data['TOTAL']),
+    },
+    'ad_line': {
+        'symbols': [], 'basket': True, 'columns': ['close'],
+        'intermediates': [(BASKET, 'returns', None)],
+        'compute': lambda data, basket: indicators.calculate_ad_line(basket),
+    },
+    'assets_above_ma': {
+        'symbols': [], 'basket': True, 'columns': ['close'],
+        'intermediates': [(BASKET, 'sma', 200)],
+        'compute': lambda data, basket: indicators.calculate_assets_above_ma(basket, ma_length=200),
+    },
+    'distance_from_ma': {
+        'symbols': [], 'basket': True, 'columns': ['close'],
+        'intermediates': [(BASKET, 'sma', 200)],
+        'compute': lambda data, basket: indicators.calculate_distance_from_ma(basket, ma_length=200),
+    },
+    'market_character': {
+        'symbols': [], 'basket': True, 'columns': ['close'],
+        'intermediates': [(BASKET, 'roc', 30), (BASKET, 'volatility', 30)],
+        'compute': lambda data, basket: indicators.calculate_market_character(basket, lookback_period=30),
+    },
+    'meme_strength': {
+        'symbols': [MEME_INDEX_SYMBOL, 'TOTAL'], 'basket': False, 'columns': ['close'],
+        'intermediates': [(MEME_INDEX_SYMBOL, 'roc', 30), ('TOTAL', 'roc', 30)],
+        'compute': lambda data, basket: indicators.calculate_regime_scatter_data(_meme_index_input(data, basket), data['TOTAL'], lookback_period=30),
+    },
+    'eth_breadth_wave': {
+        'symbols': ['ETHUSD'], 'basket': True, 'columns': ['close'],
+        'intermediates': [(BASKET, 'roc', 30), ('ETHUSD', 'roc', 30)],
+        'compute': lambda data, basket: indicators.calculate_eth_breadth_wave(basket, data['ETHUSD'], lookback_period=30),
+    },
+    'volume_breadth': {
+        'symbols': [], 'basket': True, 'columns': ['close', 'volume'],
+        'intermediates': [],
+        'compute': lambda data, basket: volume_breadth.calculate_volume_breadth(basket),
+    },
+}
+
+
+def required_inputs(names=None):
+    """
+    Returns the union of the inputs declared by the given indicators.
+
+    Returns:
+        tuple: (set of named symbols, set of columns, whether a basket is needed).
+    """
+    names = names or list(INDICATOR_SPECS)
+    symbols, columns, needs_basket = set(), set(), False
+    for name in names:
+        spec = INDICATOR_SPECS[name]
+        symbols.update(spec['symbols'])
+        columns.update(spec['columns'])
+        needs_basket = needs_basket or spec['basket']
+    return symbols, columns, needs_basket
+
+
+def plan_intermediates(names, basket_symbols):
+    """
+    Expands the intermediates declared by the given indicators into the set of
+    (symbol, intermediate, parameter) that must be computed. Intermediates shared
+    by several indicators appear once.
+    """
+    plan = set()
+    for name in names:
+        for scope, intermediate, param in INDICATOR_SPECS[name]['intermediates']:
+            targets = basket_symbols if scope == BASKET else [scope]
+            plan.update((symbol, intermediate, param) for symbol in targets)
+    return plan
+
+
+def evaluate_indicators(data, basket=None, names=None):
+    """
+    Computes several registered indicators, computing every shared intermediate
+    only once across all of them.
+
+    Args:
+        data (dict): DataFrames for the named symbols (e.g. the MACRO_SYMBOLS data).
+        basket (dict, optional): The selected basket's DataFrames.
+        names (list, optional): Indicators to compute. Defaults to all registered indicators.
+
+    Returns:
+        dict: Indicator name -> result. Indicators whose inputs are missing are skipped.
+    """
+    basket = basket or {}
+    names = names or list(INDICATOR_SPECS)
+    frames = {**basket, **data}
+    runnable = [
+        name for name in names
+        if all(symbol in frames for symbol in INDICATOR_SPECS[name]['symbols'])
+        and (basket or not INDICATOR_SPECS[name]['basket'])
+    ]
+
+    # --- Compute the union of all intermediates once ---
+    for symbol, intermediate, param in plan_intermediates(runnable, list(basket)):
+        get_intermediate(frames[symbol], intermediate, param)
+
+    # --- Every indicator now reads its intermediates from the shared cache ---
+    return {name: INDICATOR_SPECS[name]['compute'](data, basket) for name in runnable}
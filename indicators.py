@@ -1,33 +1,54 @@
 import pandas as pd
 import pandas_ta as ta
 import numpy as np
+from statistics import NormalDist
+from panel import align_on_calendar, sum_on_calendar, RaggedPanel
+from baskets import split_by_partition
+from index_builder import build_index
+from intermediates import get_intermediate
+from rolling import rolling_percentile_rank, rolling_robust_zscore
+from memo import disk_memo
+from config import MEME_INDEX_SYMBOL, SYNTHETIC_INDICES
 
+# Column key used when a benchmark series is aligned together with a basket
+BENCHMARK_KEY = '__benchmark__'
+
+# The relative-performance bands of the breadth wave
+BREADTH_WAVE_BANDS = {
+    "Strongly Outperforming (>+20%)": lambda rel: rel > 20,
+    "Outperforming (0% to 20%)": lambda rel: (rel >= 0) & (rel <= 20),
+    "Underperforming (-20% to 0%)": lambda rel: (rel < 0) & (rel >= -20),
+    "Strongly Underperforming (<-20%)": lambda rel: rel < -20,
+}
+
+# Normalization modes of the Official ASI components
+ASI_NORMALIZATIONS = ('zscore', 'percentile', 'robust')
+
+@disk_memo
 def calculate_stablecoin_vs_total_roc(total_df, usdt_d_df, usdc_d_df, roc_len=30):
     """
     Calculates and compares the Rate of Change (ROC) of the total crypto market
     cap against the inverted ROC of major stablecoin dominance.
     """
-    df = pd.concat([
-        total_df['close'].rename('total'),
-        usdt_d_df['close'].rename('usdt_d'),
-        usdc_d_df['close'].rename('usdc_d')
-    ], axis=1).dropna()
-    df['roc_total'] = (df['total'] - df['total'].shift(roc_len)) / df['total'].shift(roc_len) * 100
-    df['roc_usdt'] = (df['usdt_d'] - df['usdt_d'].shift(roc_len)) / df['usdt_d'].shift(roc_len) * 100
-    df['roc_usdc'] = (df['usdc_d'] - df['usdc_d'].shift(roc_len)) / df['usdc_d'].shift(roc_len) * 100
+    df = align_on_calendar({
+        'roc_total': get_intermediate(total_df, 'roc', roc_len),
+        'roc_usdt': get_intermediate(usdt_d_df, 'roc', roc_len),
+        'roc_usdc': get_intermediate(usdc_d_df, 'roc', roc_len)
+    })
     df['roc_stable_inv'] = -((df['roc_usdt'] + df['roc_usdc']) / 2)
     return df[['roc_total', 'roc_stable_inv']].dropna()
 
 
+@disk_memo
 def calculate_altcoin_season_index_v1(total3_df, btcd_df, ma_length=30):
     """
     Calculates the original Altcoin Season Index (ASI) based on the momentum
     spread between TOTAL3 and BTC.D.
     """
-    df = pd.concat([
-        total3_df['close'].rename('total3'),
-        btcd_df['close'].rename('btcd')
-    ], axis=1).dropna()
+    df = align_on_calendar({
+        'total3': total3_df['close'],
+        'btcd': btcd_df['close']
+    }).dropna()
     total3_roc = df['total3'].pct_change(1) * 100
     btcd_roc = df['btcd'].pct_change(1) * 100
     df['asi_value'] = total3_roc - btcd_roc
@@ -35,14 +56,15 @@ def calculate_altcoin_season_index_v1(total3_df, btcd_df, ma_length=30):
     return df[['asi_value', 'signal_line']].dropna()
 
 
+@disk_memo
 def calculate_traffic_light(total_df, len_fast=21, len_medium=50, len_slow=200):
     """
     Determines the macro trend regime based on the alignment of key moving averages.
     """
     df = total_df.copy()
-    df[f'EMA_{len_fast}'] = df.ta.ema(length=len_fast)
-    df[f'SMA_{len_medium}'] = df.ta.sma(length=len_medium)
-    df[f'SMA_{len_slow}'] = df.ta.sma(length=len_slow)
+    df[f'EMA_{len_fast}'] = get_intermediate(total_df, 'ema', len_fast)
+    df[f'SMA_{len_medium}'] = get_intermediate(total_df, 'sma', len_medium)
+    df[f'SMA_{len_slow}'] = get_intermediate(total_df, 'sma', len_slow)
     df.dropna(inplace=True)
     conditions = [
         (df['close'] > df[f'EMA_{len_fast}']) & 
@@ -56,17 +78,69 @@ def calculate_traffic_light(total_df, len_fast=21, len_medium=50, len_slow=200):
     return df
 
 
+# --- Partition Partials ---
+# The breadth indicators below are sums over assets, so they are computed per
+# basket partition (see baskets.py), memoized per partition and summed: a
+# basket reuses the partials of every other basket it shares partitions with.
+# Partials run on ragged panels, so each asset only costs its listed days.
+@disk_memo
+def _ad_partial(data_dict):
+    """Daily sum of the advance (+1) / decline (-1) signs of some assets."""
+    all_changes = {}
+    for symbol, df in data_dict.items():
+        all_changes[symbol] = np.sign(get_intermediate(df, 'returns'))
+    return RaggedPanel(all_changes).sum()
+
+
+@disk_memo
+def _above_ma_partial(data_dict, ma_length):
+    """Per day, the number of assets above their SMA and the number that have an SMA."""
+    above_ma = {}
+    for symbol, df in data_dict.items():
+        if len(df) > ma_length:
+            sma = get_intermediate(df, 'sma', ma_length)
+            above_ma[symbol] = (df['close'] > sma).astype(np.float64).where(sma.notna() & df['close'].notna())
+    panel = RaggedPanel(above_ma)
+    return pd.DataFrame({'above': panel.sum(), 'active': panel.count()})
+
+
+@disk_memo
+def _breadth_wave_partial(data_dict, benchmark_df, lookback_period):
+    """Per day, the number of assets in each breadth wave band relative to the benchmark."""
+    asset_roc = RaggedPanel({symbol: get_intermediate(df, 'roc', lookback_period) for symbol, df in data_dict.items()})
+    benchmark_roc = asset_roc.align(get_intermediate(benchmark_df, 'roc', lookback_period))
+    return breadth_wave_band_counts(asset_roc.map(lambda roc, days: roc - benchmark_roc[days]))
+
+
+@disk_memo
+def _official_asi_partial(data_dict, benchmark_df, lookback_period, vol_ma_period):
+    """
+    Per day, the number of assets outperforming the benchmark, the number that
+    have a ROC, and the summed volume MA of the outperforming assets.
+    """
+    asset_roc = RaggedPanel({symbol: get_intermediate(df, 'roc', lookback_period) for symbol, df in data_dict.items()})
+    benchmark_roc = asset_roc.align(get_intermediate(benchmark_df, 'roc', lookback_period))
+    # 1 / 0 where the asset and the benchmark both have a ROC, NaN otherwise
+    is_outperforming = asset_roc.map(
+        lambda roc, days: np.where(np.isnan(roc) | np.isnan(benchmark_roc[days]), np.nan, roc > benchmark_roc[days])
+    )
+    asset_vol_ma = RaggedPanel(
+        {symbol: get_intermediate(df, 'volume_sma', vol_ma_period) for symbol, df in data_dict.items()}, like=asset_roc
+    )
+    outperforming_volume = is_outperforming.map(
+        lambda outperforming, vol_ma, days: np.where(outperforming == 1, vol_ma, 0.0), asset_vol_ma
+    )
+    return pd.DataFrame({
+        'outperforming': is_outperforming.sum(), 'active': is_outperforming.count(), 'volume': outperforming_volume.sum()
+    })
+
+
+@disk_memo
 def calculate_ad_line(data_dict):
     """
     Calculates the Advance/Decline line from a dictionary of asset DataFrames.
     """
-    all_changes = []
-    for symbol, df in data_dict.items():
-        price_diff = df['close'].diff()
-        score = np.sign(price_diff).rename(symbol)
-        all_changes.append(score)
-    combined_df = pd.concat(all_changes, axis=1)
-    daily_ad_score = combined_df.sum(axis=1, skipna=True)
+    daily_ad_score = sum_on_calendar([_ad_partial(part) for part in split_by_partition(data_dict)])
     ad_line = daily_ad_score.cumsum()
     result_df = pd.DataFrame({
         'daily_ad_score': daily_ad_score,
@@ -75,21 +149,20 @@ def calculate_ad_line(data_dict):
     return result_df.dropna()
 
 
+@disk_memo
 def calculate_assets_above_ma(data_dict, ma_length):
     """
-    Calculates the percentage of assets trading above a specified SMA.
+    Calculates the percentage of assets trading above a specified SMA. Each
+    day's share is taken over the assets that have an SMA on that day, so assets
+    listed later only count once they have ma_length bars.
     """
-    above_ma_list = []
-    for symbol, df in data_dict.items():
-        if len(df) > ma_length:
-            sma = df.ta.sma(length=ma_length)
-            is_above = (df['close'] > sma).rename(symbol)
-            above_ma_list.append(is_above)
-    combined_df = pd.concat(above_ma_list, axis=1)
-    percentage_above = (combined_df.sum(axis=1) / len(combined_df.columns)) * 100
-    return percentage_above.dropna()
+    counts = sum_on_calendar([_above_ma_partial(part, ma_length) for part in split_by_partition(data_dict)])
+    counts = counts[counts['active'] > 0]
+    percentage_above = (counts['above'] / counts['active']) * 100
+    return percentage_above.rename(None)
 
 
+@disk_memo
 def calculate_distance_from_ma(data_dict, ma_length):
     """
     For each asset, calculates the percentage distance of its latest close price
@@ -98,7 +171,7 @@ def calculate_distance_from_ma(data_dict, ma_length):
     distances = {}
     for symbol, df in data_dict.items():
         if len(df) > ma_length:
-            sma = df.ta.sma(length=ma_length)
+            sma = get_intermediate(df, 'sma', ma_length)
             latest_close = df['close'].iloc[-1]
             latest_sma = sma.iloc[-1]
             if latest_sma > 0:
@@ -106,7 +179,8 @@ def calculate_distance_from_ma(data_dict, ma_length):
                 distances[symbol] = distance
     return pd.Series(distances).sort_values()
 
-def calculate_market_character(data_dict, lookback_period=30):
+@disk_memo
+def calculate_market_character(data_dict, lookback_period=30, benchmark_df=None):
     """
     For each asset, calculates its 30-day momentum (ROC) and 30-day
     realized volatility to position it within the Market Character Quadrant.
@@ -114,6 +188,9 @@ def calculate_market_character(data_dict, lookback_period=30):
     Args:
         data_dict (dict): A dictionary of asset DataFrames.
         lookback_period (int): The lookback period for ROC and volatility.
+        benchmark_df (pd.DataFrame, optional): A benchmark (e.g. BTCUSD). When given,
+            the latest rolling 'beta', 'correlation' and 'residual_volatility' versus
+            the benchmark are added, so assets can be placed by beta instead.
 
     Returns:
         pd.DataFrame: A DataFrame with columns for 'momentum' and 'volatility',
@@ -124,11 +201,10 @@ def calculate_market_character(data_dict, lookback_period=30):
     for symbol, df in data_dict.items():
         if len(df) > lookback_period:
             # Calculate 30-Day Rate of Change (Momentum)
-            roc = (df['close'].iloc[-1] - df['close'].iloc[-1 - lookback_period]) / df['close'].iloc[-1 - lookback_period] * 100
+            roc = get_intermediate(df, 'roc', lookback_period).iloc[-1]
             
             # Calculate 30-Day Realized Volatility
-            daily_returns = df['close'].pct_change()
-            volatility = daily_returns.rolling(window=lookback_period).std().iloc[-1] * np.sqrt(365) # Annualized
+            volatility = get_intermediate(df, 'volatility', lookback_period).iloc[-1] * np.sqrt(365) # Annualized
             
             if pd.notna(roc) and pd.notna(volatility):
                 market_character_data.append({
@@ -137,74 +213,152 @@ def calculate_market_character(data_dict, lookback_period=30):
                     'volatility': volatility
                 })
                 
-    return pd.DataFrame(market_character_data).set_index('symbol')
+    character_df = pd.DataFrame(market_character_data, columns=['symbol', 'momentum', 'volatility']).set_index('symbol')
+
+    if benchmark_df is not None and not character_df.empty:
+        # --- Latest beta statistics, taken from each asset's own last bar ---
+        betas = calculate_rolling_beta({symbol: data_dict[symbol] for symbol in character_df.index}, benchmark_df, window=lookback_period)
+        for column, panel in betas.items():
+            character_df[column] = [
+                panel[symbol].get(data_dict[symbol].index[-1], np.nan) for symbol in character_df.index
+            ]
+    return character_df
+
+@disk_memo
+def calculate_rolling_beta(data_dict, benchmark_df, window=30):
+    """
+    Calculates the rolling beta, correlation and annualized residual
+    (idiosyncratic) volatility of every asset's daily returns versus a benchmark,
+    for the whole panel at once.
+
+    The rolling sums of x, y, xy, x^2 and y^2 come from one set of cumulative
+    sums over the aligned returns panel, so every window of every asset costs
+    O(1). Like rolling(window), a value needs `window` days on which both the
+    asset and the benchmark have a return.
+
+    Args:
+        data_dict (dict): A dictionary of asset DataFrames.
+        benchmark_df (pd.DataFrame): The benchmark DataFrame (e.g. BTCUSD or ETHUSD).
+        window (int): The rolling window in days.
+
+    Returns:
+        dict: 'beta', 'correlation' and 'residual_volatility' DataFrames (dates x symbols).
+    """
+    returns = align_on_calendar({
+        **{symbol: get_intermediate(df, 'returns') for symbol, df in data_dict.items()},
+        BENCHMARK_KEY: get_intermediate(benchmark_df, 'returns')
+    })
+    benchmark_returns = returns.pop(BENCHMARK_KEY).to_numpy(dtype=np.float64)[:, None]
+    asset_returns = returns.to_numpy(dtype=np.float64)
+
+    # --- Running sums over the rows where both the asset and the benchmark have a return ---
+    valid = np.isfinite(asset_returns) & np.isfinite(benchmark_returns)
+    x = np.where(valid, asset_returns, 0.0)
+    y = np.where(valid, benchmark_returns, 0.0)
+
+    def window_sums(values):
+        sums = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+        out = np.full(values.shape, np.nan)
+        out[window - 1:] = sums[window:] - sums[:-window]
+        return out
+
+    count = window_sums(valid.astype(np.float64))
+    sum_x, sum_y = window_sums(x), window_sums(y)
+    sum_xy, sum_xx, sum_yy = window_sums(x * y), window_sums(x * x), window_sums(y * y)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        full = count == window
+        covariance = (sum_xy - sum_x * sum_y / window) / (window - 1)
+        variance_x = np.maximum((sum_xx - sum_x ** 2 / window) / (window - 1), 0.0)
+        variance_y = np.maximum((sum_yy - sum_y ** 2 / window) / (window - 1), 0.0)
+        beta = np.where(full, covariance / variance_y, np.nan)
+        correlation = np.where(full, np.clip(covariance / np.sqrt(variance_x * variance_y), -1.0, 1.0), np.nan)
+        residual_variance = np.maximum(variance_x - beta * covariance, 0.0)
+        residual_volatility = np.where(full, np.sqrt(residual_variance) * np.sqrt(365), np.nan)
 
+    return {
+        name: pd.DataFrame(values, index=returns.index, columns=returns.columns)
+        for name, values in (('beta', beta), ('correlation', correlation), ('residual_volatility', residual_volatility))
+    }
+
+@disk_memo
 def calculate_regime_scatter_data(ad_data_dict, total_df, lookback_period=30):
     """
     Calculates the rolling performance (ROC) for a meme coin index and the
     total market cap, providing the data needed for the regime scatter plot.
 
+    The meme index is the synthetic MEME_INDEX symbol when it is present in
+    ad_data_dict. Otherwise it is built on the fly from the MEME_COIN_BASKET
+    constituents found in ad_data_dict, using the MEME_INDEX definition in config.
+
     Args:
-        ad_data_dict (dict): The dictionary of asset data from the A/D line database.
+        ad_data_dict (dict): A dictionary of asset data containing either the
+            synthetic MEME_INDEX or the meme basket constituents.
         total_df (pd.DataFrame): DataFrame with close prices for TOTAL.
         lookback_period (int): The rolling window for the performance calculation.
 
     Returns:
         pd.DataFrame: A DataFrame with 'meme_performance' and 'total_performance' columns.
     """
-    # --- Create Meme Index ---
-    meme_coin_basket = ['DOGEUSDT', 'SHIBUSDT', 'PEPEUSDT', 'BONKUSDT', 'WIFUSDT', 'FLOKIUSDT', "SPXUSDT", "PUMPUSDT", "BUSD", "BRETTUSDT", "MOGUSDT", "REKTCUSD", "SNEKUSD", "TURBOUSDT", "TOSHIUSD", "POPCATUSDT", "FARTCOINUSD"]
-    meme_data = {k: v for k, v in ad_data_dict.items() if k in meme_coin_basket}
-    if not meme_data:
-        return pd.DataFrame()
-
-    all_returns = pd.concat(
-        [df['close'].pct_change().rename(symbol) for symbol, df in meme_data.items()],
-        axis=1
-    )
-    average_daily_return = all_returns.mean(axis=1)
-    meme_index = (1 + average_daily_return).cumprod().fillna(1)
+    # --- Get or Build the Meme Index ---
+    if MEME_INDEX_SYMBOL in ad_data_dict:
+        meme_index_df = ad_data_dict[MEME_INDEX_SYMBOL]
+    else:
+        index_spec = SYNTHETIC_INDICES[MEME_INDEX_SYMBOL]
+        meme_coin_basket = set(index_spec['basket'].values())
+        meme_data = {k: v for k, v in ad_data_dict.items() if k in meme_coin_basket}
+        if not meme_data:
+            return pd.DataFrame()
+        meme_index_df = build_index(meme_data, index_spec['weighting'], index_spec['rebalance'])
 
     # --- Calculate rolling performance for both ---
-    meme_performance = (meme_index / meme_index.shift(lookback_period) - 1) * 100
-    total_performance = (total_df['close'] / total_df['close'].shift(lookback_period) - 1) * 100
+    meme_performance = get_intermediate(meme_index_df, 'roc', lookback_period)
+    total_performance = get_intermediate(total_df, 'roc', lookback_period)
     
     # --- Combine into a single DataFrame ---
-    df = pd.concat([
-        meme_performance.rename('meme_performance'),
-        total_performance.rename('total_performance')
-    ], axis=1).dropna()
+    df = align_on_calendar({
+        'meme_performance': meme_performance,
+        'total_performance': total_performance
+    }).dropna()
     
     return df
 
+@disk_memo
 def calculate_eth_breadth_wave(data_dict, benchmark_df, lookback_period=30):
     """
     Calculates the breadth of the market relative to a benchmark (ETH) by
     grouping assets into performance bands over time, returning percentages.
     """
-    benchmark_roc = benchmark_df['close'].pct_change(periods=lookback_period) * 100
-    
-    all_asset_roc = pd.concat(
-        [df['close'].pct_change(periods=lookback_period).rename(symbol) * 100
-         for symbol, df in data_dict.items()],
-        axis=1
-    )
-    
-    relative_performance_df = all_asset_roc.subtract(benchmark_roc, axis=0)
-    
-    bands = {
-        "Strongly Outperforming (>+20%)": (relative_performance_df > 20),
-        "Outperforming (0% to 20%)": (relative_performance_df >= 0) & (relative_performance_df <= 20),
-        "Underperforming (-20% to 0%)": (relative_performance_df < 0) & (relative_performance_df >= -20),
-        "Strongly Underperforming (<-20%)": (relative_performance_df < -20)
-    }
-    
+    breadth_wave_df = sum_on_calendar([
+        _breadth_wave_partial(part, benchmark_df, lookback_period) for part in split_by_partition(data_dict)
+    ])
+    return breadth_wave_percentages(breadth_wave_df)
+
+@disk_memo
+def calculate_breadth_wave_bands(relative_performance_df):
+    """
+    Groups assets into the four relative-performance bands of the breadth wave
+    and returns the percentage of assets in each band per day.
+    """
+    return breadth_wave_percentages(breadth_wave_band_counts(relative_performance_df))
+
+def breadth_wave_band_counts(relative_performance):
+    """
+    Counts the assets in each of the four relative-performance bands per day,
+    from a dense DataFrame or a RaggedPanel of relative performance.
+    """
     # Count the number of assets in each band
-    breadth_wave_df = pd.concat(
-        [df.sum(axis=1).rename(name) for name, df in bands.items()],
-        axis=1
-    )
-    
+    if isinstance(relative_performance, RaggedPanel):
+        counts = [
+            relative_performance.map(lambda values, days, band=band: band(values)).sum().rename(name)
+            for name, band in BREADTH_WAVE_BANDS.items()
+        ]
+    else:
+        counts = [band(relative_performance).sum(axis=1).rename(name) for name, band in BREADTH_WAVE_BANDS.items()]
+    return pd.concat(counts, axis=1)
+
+def breadth_wave_percentages(breadth_wave_df):
+    """Converts the per-band asset counts into the percentage of assets in each band per day."""
     # --- NEW: Convert counts to percentages ---
     # Calculate the total number of assets with valid data for each day
     total_assets_per_day = breadth_wave_df.sum(axis=1)
@@ -215,49 +369,69 @@ def calculate_eth_breadth_wave(data_dict, benchmark_df, lookback_period=30):
     
     return percentage_df.dropna()
 
-def calculate_official_altcoin_season_index(majors_data, benchmark_df, btcd_df, lookback_period=90, vol_ma_period=20, normalization_window=365, smoothing_period=14):
+@disk_memo
+def calculate_official_altcoin_season_index(majors_data, benchmark_df, btcd_df, lookback_period=90, vol_ma_period=20, normalization_window=365, smoothing_period=14, normalization='zscore'):
     """
     Calculates the comprehensive "Official" Altcoin Season Index on a 0-100 scale,
     using the Z-score methodology with a 50/25/25 weighting.
+
+    normalization selects how each component is scored against its trailing
+    window: 'zscore' (mean/std), 'percentile' (rolling percentile rank) or
+    'robust' (median/MAD), see normalize_official_asi_components.
     """
-    # --- Internal Calculation for Price Breadth ---
-    outperforming_assets = []
-    for symbol, df in majors_data.items():
-        if 'BTC' in symbol:
-            continue
-        temp_df = pd.concat([df['close'].rename('asset'), benchmark_df['close'].rename('benchmark')], axis=1)
-        roc_df = temp_df.pct_change(periods=lookback_period)
-        is_outperforming = (roc_df['asset'] > roc_df['benchmark']).rename(symbol)
-        outperforming_assets.append(is_outperforming)
-    price_breadth = (pd.concat(outperforming_assets, axis=1).sum(axis=1) / len(outperforming_assets)) * 100
-
-    # --- Internal Calculation for Volume Breadth ---
-    outperformance_volumes = []
-    for symbol, df in majors_data.items():
-        if 'BTC' in symbol:
-            continue
-        temp_df = pd.concat([
-            df['close'].rename('asset_close'), df['volume'].rename('asset_volume'),
-            benchmark_df['close'].rename('benchmark_close')
-        ], axis=1).dropna()
-        asset_roc = temp_df['asset_close'].pct_change(periods=lookback_period)
-        benchmark_roc = temp_df['benchmark_close'].pct_change(periods=lookback_period)
-        asset_vol_ma = temp_df['asset_volume'].rolling(window=vol_ma_period).mean()
-        volume_if_outperforming = np.where(asset_roc > benchmark_roc, asset_vol_ma, 0)
-        outperformance_volumes.append(pd.Series(volume_if_outperforming, index=temp_df.index).rename(symbol))
-    volume_breadth = pd.concat(outperformance_volumes, axis=1).sum(axis=1)
+    # --- Price and Volume Breadth, summed over the basket partitions ---
+    altcoins = {symbol: df for symbol, df in majors_data.items() if 'BTC' not in symbol}
+    counts = sum_on_calendar([
+        _official_asi_partial(part, benchmark_df, lookback_period, vol_ma_period) for part in split_by_partition(altcoins)
+    ])
+    if counts.empty:
+        return pd.DataFrame({'altcoin_season_index': pd.Series(dtype=np.float64)})
+    # Share of the assets with a ROC on the day, not of the whole (partly unlisted) basket
+    price_breadth = (counts['outperforming'] / counts['active']) * 100
+    volume_breadth = counts['volume']
 
     # --- Component 3: BTC Dominance Momentum ---
     btcd_momentum = btcd_df['close'].pct_change(periods=lookback_period) * 100
 
     # --- Combine and Align All Raw Components ---
-    combined_df = pd.concat([price_breadth, volume_breadth, btcd_momentum], axis=1).dropna()
-    combined_df.columns = ['price_breadth', 'volume_breadth', 'btcd_momentum']
+    combined_df = align_on_calendar({
+        'price_breadth': price_breadth,
+        'volume_breadth': volume_breadth,
+        'btcd_momentum': btcd_momentum
+    }).dropna()
+
+    return normalize_official_asi_components(combined_df, normalization_window, smoothing_period, normalization)
+
+def _normalize_component(series, window, normalization):
+    """
+    Scores a component against its trailing window on a z-score scale. Percentile
+    ranks are mapped through the inverse normal CDF so every mode feeds the same
+    weights and sigmoid.
+    """
+    if normalization == 'zscore':
+        return (series - series.rolling(window=window).mean()) / series.rolling(window=window).std()
+    if normalization == 'percentile':
+        inverse_cdf = NormalDist().inv_cdf
+        return rolling_percentile_rank(series, window).map(lambda rank: inverse_cdf(rank / 100) if np.isfinite(rank) else np.nan)
+    if normalization == 'robust':
+        return rolling_robust_zscore(series, window)
+    raise ValueError(f"Unknown normalization '{normalization}', expected one of {ASI_NORMALIZATIONS}")
+
+@disk_memo
+def normalize_official_asi_components(combined_df, normalization_window=365, smoothing_period=14, normalization='zscore'):
+    """
+    Turns the raw Official ASI components ('price_breadth', 'volume_breadth',
+    'btcd_momentum') into the smoothed 0-100 index.
+
+    The 'percentile' and 'robust' modes are less sensitive than Z-scores to the
+    fat tails of volume_breadth.
+    """
+    combined_df = combined_df.copy()
 
-    # --- Normalization using Z-scores ---
-    combined_df['price_zscore'] = (combined_df['price_breadth'] - combined_df['price_breadth'].rolling(window=normalization_window).mean()) / combined_df['price_breadth'].rolling(window=normalization_window).std()
-    combined_df['volume_zscore'] = (combined_df['volume_breadth'] - combined_df['volume_breadth'].rolling(window=normalization_window).mean()) / combined_df['volume_breadth'].rolling(window=normalization_window).std()
-    combined_df['btcd_zscore'] = -((combined_df['btcd_momentum'] - combined_df['btcd_momentum'].rolling(window=normalization_window).mean()) / combined_df['btcd_momentum'].rolling(window=normalization_window).std())
+    # --- Normalization (Z-scores by default) ---
+    combined_df['price_zscore'] = _normalize_component(combined_df['price_breadth'], normalization_window, normalization)
+    combined_df['volume_zscore'] = _normalize_component(combined_df['volume_breadth'], normalization_window, normalization)
+    combined_df['btcd_zscore'] = -_normalize_component(combined_df['btcd_momentum'], normalization_window, normalization)
 
     # --- Combine Z-scores with 50/25/25 weights ---
     combined_df['final_zscore'] = (combined_df['price_zscore'] * 0.50) + (combined_df['volume_zscore'] * 0.25) + (combined_df['btcd_zscore'] * 0.25)
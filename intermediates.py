@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+import pandas_ta as ta
+
+# --- Configuration ---
+MAX_CACHED_INTERMEDIATES = 4096  # Least recently used entries are evicted beyond this
+
+
+# --- Intermediate Series ---
+# Per-asset series shared by several indicators. Each takes the asset DataFrame
+# and one parameter, and must not modify the DataFrame.
+def _sma(df, length):
+    return df.ta.sma(length=length)
+
+
+def _ema(df, length):
+    return df.ta.ema(length=length)
+
+
+def _roc(df, length):
+    return df['close'].pct_change(periods=length) * 100
+
+
+def _returns(df, _=None):
+    return df['close'].pct_change()
+
+
+def _volatility(df, length):
+    return get_intermediate(df, 'returns').rolling(window=length).std()
+
+
+def _volume_sma(df, length):
+    return df['volume'].rolling(window=length).mean()
+
+
+INTERMEDIATES = {
+    'sma': _sma,
+    'ema': _ema,
+    'roc': _roc,
+    'returns': _returns,
+    'volatility': _volatility,
+    'volume_sma': _volume_sma,
+}
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def data_version(df):
+    """
+    Returns the data version of an asset DataFrame. When the loader set
+    df.attrs['version'] (the symbol's version in the store) it is combined with
+    the frame's layout, since the same stored data can be loaded as a full frame
+    or on a compact panel's shared calendar. Otherwise the frame's contents are
+    hashed, so a correction anywhere in its history gives a new version.
+    """
+    if df.empty:
+        return (0,)
+    version = df.attrs.get('version')
+    if version is not None:
+        return (version, len(df), df.index[0], df.index[-1], tuple(str(dtype) for dtype in df.dtypes))
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes(), digest_size=16)
+    return ('content', digest.hexdigest(), tuple(df.columns), tuple(str(dtype) for dtype in df.dtypes))
+
+
+def basket_version(data_dict):
+    """Returns a version key for a whole basket: the (symbol, data version) of every asset."""
+    return tuple(sorted((symbol, data_version(df)) for symbol, df in data_dict.items()))
+
+
+def get_intermediate(df, name, param=None):
+    """
+    Returns a per-asset intermediate series, computing it at most once per
+    (symbol, intermediate, parameter, data version).
+
+    DataFrames without a df.attrs['symbol'] (set by load_data) are computed
+    without caching. The returned series is shared and must not be modified.
+
+    Args:
+        df (pd.DataFrame): The asset DataFrame.
+        name (str): One of the keys of INTERMEDIATES, e.g. 'sma' or 'roc'.
+        param (int, optional): The intermediate's parameter, e.g. the window length.
+
+    Returns:
+        pd.Series: The intermediate series, indexed like df.
+    """
+    symbol = df.attrs.get('symbol')
+    if symbol is None:
+        return INTERMEDIATES[name](df, param)
+
+    key = (symbol, name, param, data_version(df))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return _cache[key]
+
+    result = INTERMEDIATES[name](df, param)
+
+    with _cache_lock:
+        _cache_stats['misses'] += 1
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_INTERMEDIATES:
+            _cache.popitem(last=False)
+            _cache_stats['evictions'] += 1
+    return result
+
+
+def intermediate_cache_stats():
+    """Returns the hit/miss/eviction counters and the current size of the intermediate cache."""
+    with _cache_lock:
+        return {**_cache_stats, 'size': len(_cache)}
+
+
+def clear_intermediate_cache():
+    """Drops every cached intermediate series."""
+    with _cache_lock:
+        _cache.clear()
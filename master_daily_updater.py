@@ -1,100 +1,156 @@
+import argparse
 import pandas as pd
-import sqlite3
-from tvDatafeed import TvDatafeed, Interval
 from datetime import datetime
 import time
 # --- THIS IS THE CHANGE ---
-from config import ALL_SYMBOLS_TO_FETCH
+from config import ALL_SYMBOLS_TO_FETCH, FORWARD_FILL_SYMBOLS
+from panel import legacy_stamps_to_utc, normalize_daily_bars
+from post_ingest import run_post_ingest_tasks
+from store import connect_writer, write_bars
+from datafeed import make_datafeed, add_datafeed_argument
 
 # --- Configuration ---
 DB_FILE = "market_data.db"
 MAX_RETRIES = 5
 
 def get_last_timestamp(conn, table_name):
-    """Gets the most recent timestamp from a specific table."""
+    """Gets the most recent timestamp (naive UTC) from a specific table."""
     try:
         query = f'SELECT MAX(datetime) FROM "{table_name}"'
         last_date_str = pd.read_sql(query, conn).iloc[0, 0]
-        return pd.to_datetime(last_date_str) if last_date_str else None
+        return legacy_stamps_to_utc(pd.to_datetime([last_date_str]))[0] if last_date_str else None
     except Exception:
         return None
 
 def append_data_to_db(conn, df, table_name):
-    """Appends new data to a specific table."""
+    """Appends new data to a specific table (bumping its version in the same transaction)."""
     if df.empty:
         print(f"No new data to append for {table_name}.")
         return
-    df.to_sql(table_name, conn, if_exists='append', index=True)
+    write_bars(conn, table_name, df)
     print(f"Successfully appended {len(df)} new records to table '{table_name}'.")
 
-def fetch_and_update():
-    """Fetches only new data for all symbols and updates the unified DB."""
-    tv = TvDatafeed()
-    # Use the correct variable name here
-    symbols_to_process = list(ALL_SYMBOLS_TO_FETCH.items())
+def update_symbol(feed, conn, symbol_exchange, table_name, through=None):
+    """
+    Fetches and appends the bars of one symbol that are newer than its last stored bar.
+
+    Args:
+        feed (datafeed.Datafeed): An open datafeed.
+        conn (sqlite3.Connection): An open connection to the market data DB.
+        symbol_exchange (str): The "EXCHANGE:SYMBOL" key from config.
+        table_name (str): The DB table of the symbol.
+        through (pd.Timestamp, optional): Last bar day to store. Later bars (e.g. the
+            still-open bar of the current day) are left for the next run.
+
+    Returns:
+        int: The number of bars appended, or None when the feed returned nothing
+            (the caller should retry those).
+    """
+    exchange, symbol = symbol_exchange.split(':')
+    print(f"\n--- Processing {table_name} ---")
+
+    last_timestamp = get_last_timestamp(conn, table_name)
+    if not last_timestamp:
+        print(f"No history found for {table_name}. Run the master_data_updater.py script first.")
+        return 0
+
+    days_diff = (datetime.now() - last_timestamp).days
+    if days_diff <= 0:
+        print(f"{table_name} is already up to date.")
+        return 0
+
+    n_bars_to_fetch = days_diff + 5
+    print(f"Last record is from {last_timestamp}. Fetching {n_bars_to_fetch} bars...")
+
+    hist_df = feed.get_daily_bars(symbol, exchange, n_bars_to_fetch)
+
+    if hist_df is None or hist_df.empty:
+        print(f"No new data returned for {symbol}. Will retry.")
+        return None
+
+    hist_df = hist_df[['open', 'high', 'low', 'close', 'volume']]
+    hist_df.index.name = 'datetime'
+    hist_df = normalize_daily_bars(hist_df, forward_fill=table_name in FORWARD_FILL_SYMBOLS)
+    new_data_df = hist_df[hist_df.index > last_timestamp]
+    if through is not None:
+        new_data_df = new_data_df[new_data_df.index <= through]
+
+    append_data_to_db(conn, new_data_df, table_name)
+    time.sleep(feed.request_pause)
+    return len(new_data_df)
+
+def update_symbols(feed, conn, symbols, through=None, max_retries=MAX_RETRIES):
+    """
+    Updates a list of (symbol_exchange, table_name) pairs, retrying failures with
+    an increasing delay.
+
+    Returns:
+        tuple: (dict of table name -> bars appended for the tables that changed,
+            list of (symbol_exchange, table_name) that still failed after all retries).
+    """
+    symbols_to_process = list(symbols)
+    changed = {}
     retry_count = 0
 
-    with sqlite3.connect(DB_FILE) as conn:
-        while symbols_to_process and retry_count <= MAX_RETRIES:
-            failed_symbols = []
-
-            if retry_count > 0:
-                delay = 5 * retry_count
-                print(f"\n--- RETRYING {len(symbols_to_process)} FAILED SYMBOLS (Attempt {retry_count}/{MAX_RETRIES}). Waiting for {delay} seconds... ---")
-                time.sleep(delay)
-
-            for symbol_exchange, table_name in symbols_to_process:
-                try:
-                    exchange, symbol = symbol_exchange.split(':')
-                    print(f"\n--- Processing {table_name} ---")
-
-                    last_timestamp = get_last_timestamp(conn, table_name)
-                    if not last_timestamp:
-                        print(f"No history found for {table_name}. Run the master_data_updater.py script first.")
-                        continue
-
-                    days_diff = (datetime.now() - last_timestamp).days
-                    if days_diff <= 0:
-                        print(f"{table_name} is already up to date.")
-                        continue
-
-                    n_bars_to_fetch = days_diff + 5
-                    print(f"Last record is from {last_timestamp}. Fetching {n_bars_to_fetch} bars...")
-
-                    hist_df = tv.get_hist(
-                        symbol=symbol,
-                        exchange=exchange,
-                        interval=Interval.in_daily,
-                        n_bars=n_bars_to_fetch
-                    )
-
-                    if hist_df is None or hist_df.empty:
-                        print(f"No new data returned for {symbol}. Will retry.")
-                        failed_symbols.append((symbol_exchange, table_name))
-                        continue
-
-                    hist_df = hist_df[['open', 'high', 'low', 'close', 'volume']]
-                    hist_df.index.name = 'datetime'
-                    new_data_df = hist_df[hist_df.index > last_timestamp]
-
-                    append_data_to_db(conn, new_data_df, table_name)
-                    time.sleep(1)
-
-                except Exception as e:
-                    print(f"An error occurred with {symbol_exchange}: {e}. Will retry.")
+    while symbols_to_process and retry_count <= max_retries:
+        failed_symbols = []
+
+        if retry_count > 0:
+            delay = feed.retry_delay * retry_count
+            print(f"\n--- RETRYING {len(symbols_to_process)} FAILED SYMBOLS (Attempt {retry_count}/{max_retries}). Waiting for {delay} seconds... ---")
+            time.sleep(delay)
+
+        for symbol_exchange, table_name in symbols_to_process:
+            try:
+                appended = update_symbol(feed, conn, symbol_exchange, table_name, through=through)
+                if appended is None:
                     failed_symbols.append((symbol_exchange, table_name))
                     continue
+                if appended:
+                    changed[table_name] = appended
+
+            except Exception as e:
+                print(f"An error occurred with {symbol_exchange}: {e}. Will retry.")
+                failed_symbols.append((symbol_exchange, table_name))
+                continue
+
+        symbols_to_process = failed_symbols
+        retry_count += 1
+
+    return changed, symbols_to_process
+
+def fetch_and_update(feed=None, db_file=DB_FILE, symbols=None, post_ingest=True):
+    """
+    Fetches only new data for all symbols and updates the unified DB.
+
+    Args:
+        feed (datafeed.Datafeed, optional): The datafeed to fetch from. Defaults to config.DATAFEED.
+        db_file (str): The market data DB.
+        symbols (dict, optional): symbol_exchange -> table name. Defaults to ALL_SYMBOLS_TO_FETCH.
+        post_ingest (bool): Whether to run the post-ingest tasks afterwards.
+
+    Returns:
+        tuple: (changed tables -> bars appended, failed (symbol_exchange, table_name) pairs).
+    """
+    feed = feed or make_datafeed()
+    symbols = ALL_SYMBOLS_TO_FETCH if symbols is None else symbols
 
-            symbols_to_process = failed_symbols
-            retry_count += 1
+    with connect_writer(db_file) as conn:
+        changed, failed_symbols = update_symbols(feed, conn, symbols.items())
+        if post_ingest:
+            run_post_ingest_tasks(conn, set(changed))
 
-    if symbols_to_process:
+    if failed_symbols:
         print("\n--- The following symbols failed to update after all retries: ---")
-        for symbol, _ in symbols_to_process:
+        for symbol, _ in failed_symbols:
             print(f"- {symbol}")
     else:
         print("\n--- All symbols updated successfully. ---")
+    return changed, failed_symbols
 
 if __name__ == "__main__":
-    fetch_and_update()
+    parser = argparse.ArgumentParser(description="Appends the latest daily bars of every symbol to the DB.")
+    add_datafeed_argument(parser)
+    args = parser.parse_args()
+    fetch_and_update(make_datafeed(args.feed))
     print("\n--- Daily update process finished. ---")
\ No newline at end of file
@@ -1,31 +1,43 @@
-import sqlite3
+import argparse
 import time
-from tvDatafeed import TvDatafeed, Interval
 import pandas as pd
 # --- THIS IS THE CHANGE ---
-from config import ALL_SYMBOLS_TO_FETCH
+from config import ALL_SYMBOLS_TO_FETCH, FORWARD_FILL_SYMBOLS
+from panel import normalize_daily_bars
+from post_ingest import run_post_ingest_tasks
+from store import connect_writer, write_bars
+from datafeed import make_datafeed, add_datafeed_argument
 
 # --- Configuration ---
 DB_FILE = "market_data.db"
 N_BARS = 5000
 MAX_RETRIES = 10
 
-def fetch_and_save_all():
+def fetch_and_save_all(feed=None, db_file=DB_FILE, symbols=None, n_bars=N_BARS, post_ingest=True):
     """
     Performs a one-time full historical data download for all assets
     and saves them to a single SQLite database, with a retry mechanism.
+
+    Args:
+        feed (datafeed.Datafeed, optional): The datafeed to fetch from. Defaults to config.DATAFEED.
+        db_file (str): The market data DB.
+        symbols (dict, optional): symbol_exchange -> table name. Defaults to ALL_SYMBOLS_TO_FETCH.
+        n_bars (int): Bars of history to download per symbol.
+        post_ingest (bool): Whether to run the post-ingest tasks afterwards.
+
+    Returns:
+        list: The (symbol_exchange, table_name) pairs that failed after all retries.
     """
-    tv = TvDatafeed()
-    # Use the correct variable name here
-    symbols_to_process = list(ALL_SYMBOLS_TO_FETCH.items())
+    feed = feed or make_datafeed()
+    symbols_to_process = list((ALL_SYMBOLS_TO_FETCH if symbols is None else symbols).items())
     retry_count = 0
 
-    with sqlite3.connect(DB_FILE) as conn:
+    with connect_writer(db_file) as conn:
         while symbols_to_process and retry_count <= MAX_RETRIES:
             failed_symbols = []
 
             if retry_count > 0:
-                delay = 5 * retry_count
+                delay = feed.retry_delay * retry_count
                 print(f"\n--- RETRYING {len(symbols_to_process)} FAILED SYMBOLS (Attempt {retry_count}/{MAX_RETRIES}). Waiting for {delay} seconds... ---")
                 time.sleep(delay)
 
@@ -34,24 +46,20 @@ def fetch_and_save_all():
                     exchange, symbol = symbol_exchange.split(':')
                     print(f"--- Fetching {symbol} from {exchange} for table {table_name} ---")
 
-                    df = tv.get_hist(
-                        symbol=symbol,
-                        exchange=exchange,
-                        interval=Interval.in_daily,
-                        n_bars=N_BARS
-                    )
+                    df = feed.get_daily_bars(symbol, exchange, n_bars)
 
                     if df is not None and not df.empty:
                         df = df[['open', 'high', 'low', 'close', 'volume']]
                         df.index.name = 'datetime'
-                        df.to_sql(table_name, conn, if_exists='replace', index=True)
+                        df = normalize_daily_bars(df, forward_fill=table_name in FORWARD_FILL_SYMBOLS)
+                        write_bars(conn, table_name, df, replace=True)
                         print(f"Successfully saved {len(df)} records for {table_name}.")
                     else:
                         print(f"No data returned for {symbol_exchange}. Will retry.")
                         failed_symbols.append((symbol_exchange, table_name))
                         continue
 
-                    time.sleep(1)
+                    time.sleep(feed.request_pause)
 
                 except Exception as e:
                     print(f"An error occurred with {symbol_exchange}: {e}. Will retry.")
@@ -61,12 +69,19 @@ def fetch_and_save_all():
             symbols_to_process = failed_symbols
             retry_count += 1
 
+        if post_ingest:
+            run_post_ingest_tasks(conn)
+
     if symbols_to_process:
         print("\n--- The following symbols failed to download after all retries: ---")
         for symbol, _ in symbols_to_process:
             print(f"- {symbol}")
     else:
         print("\n--- Unified data fetching complete! ---")
+    return symbols_to_process
 
 if __name__ == "__main__":
-    fetch_and_save_all()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Downloads the full daily history of every symbol into the DB.")
+    add_datafeed_argument(parser)
+    args = parser.parse_args()
+    fetch_and_save_all(make_datafeed(args.feed))
\ No newline at end of file
@@ -0,0 +1,185 @@
+import functools
+import hashlib
+import importlib.util
+import inspect
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from config import MEMO_DB_FILE, MEMO_MAX_BYTES, MEMO_ENABLED
+from intermediates import data_version
+from store import BUSY_TIMEOUT_SECONDS
+
+# --- Persistent Memoization ---
+# Indicator results are stored in their own SQLite file, shared by every
+# process (the dashboard, scripts, notebooks), under a key built from the
+# function, the source of the modules it depends on and its arguments. Asset
+# DataFrames enter the key through their symbol and stored data version, so
+# results are reused until the data changes; asset frames without a stored
+# version are not memoized. Payloads are compressed pickles; the least
+# recently used entries are evicted once the file holds more than
+# MEMO_MAX_BYTES of payload.
+COMPRESSION_LEVEL = 1  # Fast; indicator frames compress well even at the lowest level
+MEMO_SCHEMA_VERSION = 2  # Bump to invalidate every entry, e.g. when a result's meaning changes
+# Modules whose source enters every key (with the decorated function's own
+# module), so editing a helper a memoized function calls invalidates its entries
+MEMO_SOURCE_MODULES = (
+    'memo', 'config', 'indicators', 'intermediates', 'panel', 'baskets', 'index_builder',
+    'rolling', 'correlation', 'volume_breadth',
+)
+
+_thread_state = threading.local()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'errors': 0, 'unversioned': 0}
+_source_hashes = {}
+
+
+class _Unversioned(Exception):
+    """Raised while building a key for an asset DataFrame that has no stored data version."""
+
+
+def _connection():
+    """Returns this thread's connection to the memo DB, creating the table on first use."""
+    conn = getattr(_thread_state, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(MEMO_DB_FILE, timeout=BUSY_TIMEOUT_SECONDS)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, function TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_memo_last_used ON memo (last_used)")
+        _thread_state.conn = conn
+    return conn
+
+
+def _content_hash(obj):
+    """Hashes the full contents (values, index and columns) of a DataFrame or Series."""
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes(), digest_size=16)
+    digest.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+    return digest.hexdigest()
+
+
+def _argument_key(value):
+    """
+    A stable, hashable description of one argument: asset DataFrames by symbol
+    and data version, other frames by content, containers element-wise.
+    """
+    if isinstance(value, pd.DataFrame) and 'symbol' in value.attrs:
+        if value.attrs.get('version') is None and not value.empty:
+            # Without a stored version, a correction inside the history would not change the key
+            raise _Unversioned(value.attrs['symbol'])
+        return ('asset', value.attrs['symbol'], data_version(value), tuple(value.columns), str(value.index.dtype))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ('content', _content_hash(value))
+    if isinstance(value, np.ndarray):
+        return ('array', value.dtype.str, value.shape, hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16).hexdigest())
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((str(key), _argument_key(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_argument_key(item) for item in value))
+    return value
+
+
+def _source_hash(module_name):
+    """
+    Fingerprint of the source files of MEMO_SOURCE_MODULES and the given module,
+    computed once per process.
+    """
+    if module_name not in _source_hashes:
+        digest = hashlib.blake2b(repr(MEMO_SCHEMA_VERSION).encode(), digest_size=8)
+        for name in sorted(set(MEMO_SOURCE_MODULES) | {module_name}):
+            spec = importlib.util.find_spec(name)
+            if spec is not None and spec.origin and spec.origin.endswith('.py'):
+                with open(spec.origin, 'rb') as source:
+                    digest.update(name.encode() + b'\0' + source.read())
+        _source_hashes[module_name] = digest.hexdigest()
+    return _source_hashes[module_name]
+
+
+def _evict(conn):
+    """Deletes the least recently used entries until the stored payloads fit in MEMO_MAX_BYTES."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM memo").fetchone()[0]
+    if total <= MEMO_MAX_BYTES:
+        return
+    evicted = []
+    for key, size in conn.execute("SELECT key, size FROM memo ORDER BY last_used"):
+        if total <= MEMO_MAX_BYTES:
+            break
+        evicted.append((key,))
+        total -= size
+    conn.executemany("DELETE FROM memo WHERE key = ?", evicted)
+    _stats['evictions'] += len(evicted)
+
+
+def disk_memo(func):
+    """
+    Decorator that memoizes a function's results on disk (see the section
+    comment above). Calls fall through to the function itself whenever the
+    memo DB cannot be used or an asset frame has no stored data version, and
+    results that cannot be pickled are not stored.
+    """
+    signature = inspect.signature(func)
+    function_id = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not MEMO_ENABLED:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            arguments = tuple((name, _argument_key(value)) for name, value in bound.arguments.items())
+        except _Unversioned:
+            _stats['unversioned'] += 1
+            return func(*args, **kwargs)
+        key_source = repr((function_id, _source_hash(func.__module__), arguments))
+        key = hashlib.blake2b(key_source.encode(), digest_size=20).hexdigest()
+
+        try:
+            conn = _connection()
+            row = conn.execute("SELECT payload FROM memo WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                with conn:
+                    conn.execute("UPDATE memo SET last_used = ? WHERE key = ?", (time.time(), key))
+                _stats['hits'] += 1
+                return pickle.loads(zlib.decompress(row[0]))
+        except (sqlite3.Error, pickle.UnpicklingError, zlib.error):
+            _stats['errors'] += 1
+            return func(*args, **kwargs)
+
+        _stats['misses'] += 1
+        result = func(*args, **kwargs)
+        try:
+            payload = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), COMPRESSION_LEVEL)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO memo (key, function, size, last_used, payload) VALUES (?, ?, ?, ?, ?)",
+                    (key, function_id, len(payload), time.time(), sqlite3.Binary(payload))
+                )
+                _evict(conn)
+        except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError):
+            _stats['errors'] += 1
+        return result
+
+    wrapper.uncached = func
+    return wrapper
+
+
+def memo_stats():
+    """Returns this process's hit/miss/eviction counts and the size of the memo DB."""
+    entries, size = _connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM memo").fetchone()
+    return {**_stats, 'entries': entries, 'bytes': size}
+
+
+def clear_memo(function=None):
+    """Deletes every memoized result, or only those of one function (e.g. 'indicators.calculate_ad_line')."""
+    conn = _connection()
+    with conn:
+        if function is None:
+            conn.execute("DELETE FROM memo")
+        else:
+            conn.execute("DELETE FROM memo WHERE function = ?", (function,))
@@ -1,40 +1,38 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data
+from utils import load_data_many, data_versions, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
 from indicators import calculate_eth_breadth_wave
-from config import (
-    MACRO_SYMBOLS, MAJORS_LARGE_CAP, MAJORS_MID_CAP,
-    MAJORS_SMALL_CAP, MAJORS_MICRO_CAP, MEME_COIN_BASKET
-)
+from config import MACRO_SYMBOLS, BASKETS
 import pandas as pd
 
 # --- Page Configuration ---
 st.set_page_config(page_title="ETH Breadth Wave", page_icon="🌊", layout="wide")
+show_warmup_status()
 st.title("🌊 ETH Outperformance Breadth Wave")
 
 # --- UI Controls ---
-asset_baskets = {
-    "Everything (All Baskets)": {**MAJORS_LARGE_CAP, **MAJORS_MID_CAP, **MAJORS_SMALL_CAP, **MAJORS_MICRO_CAP, **MEME_COIN_BASKET},
-    "Large Caps (>$1B)": MAJORS_LARGE_CAP,
-    "Mid Caps (>$500M)": MAJORS_MID_CAP,
-    "Small Caps (>$100M)": MAJORS_SMALL_CAP,
-    "Micro Caps (>$50M)": MAJORS_MICRO_CAP,
-    "Meme Coins": MEME_COIN_BASKET
-}
-selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(asset_baskets.keys()), index=0)
-selected_basket = asset_baskets[selected_basket_name]
+selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+selected_basket = BASKETS[selected_basket_name]
 
-# --- Data Loading ---
-asset_data = load_data(asset_list=list(selected_basket.values()))
-macro_data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
+# --- Data Loading and Indicator Calculation ---
+# Cached per basket and data version, so reruns and switching back to a basket skip both
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=16)
+def compute_eth_wave(basket_symbols, versions):
+    """ETH breadth wave of a basket, or None without data (`versions` only keys the cache)."""
+    loaded = load_data_many({'assets': list(basket_symbols), 'macro': list(MACRO_SYMBOLS.values())})
+    asset_data, macro_data = loaded['assets'], loaded['macro']
+    if asset_data is None or macro_data is None or 'ETHUSD' not in macro_data:
+        return None
+    return calculate_eth_breadth_wave(asset_data, macro_data['ETHUSD'], lookback_period=30)
 
-if asset_data is None or macro_data is None or 'ETHUSD' not in macro_data:
+
+basket_symbols = tuple(selected_basket.values())
+wave_df = compute_eth_wave(basket_symbols, data_versions(basket_symbols, list(MACRO_SYMBOLS.values())))
+if wave_df is None:
     st.warning("Could not load all required data for the ETH Breadth Wave. Please run the data updater scripts.")
     st.stop()
 
-# --- Indicator Calculation ---
-wave_df = calculate_eth_breadth_wave(asset_data, macro_data['ETHUSD'], lookback_period=30)
-
 # --- Charting ---
 colors = {
     "Strongly Outperforming (>+20%)": '#00b300', "Outperforming (0% to 20%)": '#66ff66',
@@ -0,0 +1,99 @@
+import streamlit as st
+import plotly.graph_objects as go
+from utils import load_data_many, data_versions, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
+from correlation import calculate_rolling_correlation, calculate_correlation_matrix, cluster_correlation_matrix
+from config import MACRO_SYMBOLS, BASKETS
+import pandas as pd
+
+# --- Page Configuration ---
+st.set_page_config(page_title="Correlation Matrix", page_icon="🕸️", layout="wide")
+show_warmup_status()
+st.title("🕸️ Market Correlation & Clusters")
+
+# --- UI Controls ---
+col1, col2 = st.columns(2)
+with col1:
+    selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=1)
+with col2:
+    window = st.selectbox("Correlation Window (days):", options=[30, 90], index=0)
+selected_basket = BASKETS[selected_basket_name]
+
+# --- Data Loading and Indicator Calculation ---
+# Cached per basket, window and data version, so reruns and switching back skip both
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=32)
+def compute_correlations(basket_symbols, window, versions):
+    """Rolling correlations and the latest correlation matrix of a basket, or None without data (`versions` only keys the cache)."""
+    loaded = load_data_many({'assets': list(basket_symbols), 'macro': list(MACRO_SYMBOLS.values())})
+    asset_data, macro_data = loaded['assets'], loaded['macro']
+    if asset_data is None or macro_data is None or 'BTCUSD' not in macro_data or 'ETHUSD' not in macro_data:
+        return None
+    benchmarks = {'BTCUSD': macro_data['BTCUSD'], 'ETHUSD': macro_data['ETHUSD']}
+    return calculate_rolling_correlation(asset_data, benchmarks, window=window), calculate_correlation_matrix(asset_data, window=window)
+
+
+basket_symbols = tuple(selected_basket.values())
+computed = compute_correlations(basket_symbols, window, data_versions(basket_symbols, list(MACRO_SYMBOLS.values())))
+if computed is None:
+    st.warning("Could not load all required data. Please run the data updater scripts.")
+    st.stop()
+rolling_df, corr_matrix = computed
+
+if rolling_df.empty or corr_matrix.empty:
+    st.warning("Not enough historical data to compute correlations for this basket.")
+    st.stop()
+
+# --- Chart 1: Average Correlation Over Time ---
+fig_ts = go.Figure()
+fig_ts.add_trace(go.Scatter(x=rolling_df.index, y=rolling_df['average_correlation'], mode='lines', name='Average Pairwise Correlation', line=dict(color='cyan', width=2)))
+fig_ts.add_trace(go.Scatter(x=rolling_df.index, y=rolling_df['corr_to_BTCUSD'], mode='lines', name='Average Correlation to BTC', line=dict(color='orange', width=1.5)))
+fig_ts.add_trace(go.Scatter(x=rolling_df.index, y=rolling_df['corr_to_ETHUSD'], mode='lines', name='Average Correlation to ETH', line=dict(color='mediumpurple', width=1.5)))
+fig_ts.update_layout(
+    height=450, title_text=f"{window}-Day Rolling Correlation: {selected_basket_name}",
+    yaxis_title="Correlation", xaxis_title="Date", yaxis_range=[-0.2, 1],
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    plot_bgcolor='rgba(17, 17, 17, 1)'
+)
+st.plotly_chart(fig_ts, use_container_width=True)
+
+# --- Chart 2 and Clusters ---
+# The cluster cut only re-clusters the matrix above, so its slider reruns just this fragment
+@st.fragment
+def correlation_clusters(corr_matrix, window, as_of):
+    max_distance = st.slider("Cluster Cut (1 - correlation):", min_value=0.1, max_value=1.5, value=0.5, step=0.05)
+    labels, order = cluster_correlation_matrix(corr_matrix, max_distance=max_distance)
+
+    # --- Chart 2: Latest Correlation Matrix, Ordered by Cluster ---
+    ordered = corr_matrix.loc[order, order]
+    fig_matrix = go.Figure(data=go.Heatmap(
+        z=ordered.values, x=ordered.columns, y=ordered.index,
+        colorscale='RdBu_r', zmin=-1, zmax=1, colorbar=dict(title="Correlation")
+    ))
+    fig_matrix.update_layout(
+        height=800, title_text=f"Latest {window}-Day Correlation Matrix ({as_of.strftime('%Y-%m-%d')}, {labels.nunique()} clusters)",
+        yaxis=dict(autorange='reversed'), plot_bgcolor='rgba(17, 17, 17, 1)'
+    )
+    st.plotly_chart(fig_matrix, use_container_width=True)
+
+    # --- Cluster Table ---
+    st.subheader("Clusters")
+    cluster_summary = pd.DataFrame([
+        {
+            'cluster': cluster, 'size': len(members), 'members': ", ".join(members.index),
+            'average_correlation': ordered.loc[members.index, members.index].values.mean()
+        }
+        for cluster, members in labels.groupby(labels)
+    ]).set_index('cluster')
+    st.dataframe(cluster_summary.sort_values('size', ascending=False), use_container_width=True)
+
+
+correlation_clusters(corr_matrix, window, rolling_df.index[-1])
+
+# --- Indicator Explanation ---
+st.markdown("---")
+st.header("How to Use the Correlation Matrix")
+st.markdown(f"""
+- **Average Pairwise Correlation** is the mean correlation of daily returns across every pair of assets in the basket over the last {window} days. High readings mean the market is moving as one block (typically during sell-offs); low readings mean coins are trading on their own narratives.
+- **Correlation to BTC / ETH** is the average correlation of the basket's assets to each benchmark. A falling value while the average correlation stays high points to an alt-driven market.
+- **Clusters** group assets whose returns move together (average-linkage on 1 - correlation). Raise the cut to merge clusters, lower it to split them.
+""")
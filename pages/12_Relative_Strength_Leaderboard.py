@@ -0,0 +1,103 @@
+import streamlit as st
+import plotly.graph_objects as go
+from utils import load_data, load_derived, data_versions, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
+from relative_strength import calculate_relative_strength, top_bottom_movers, RS_CHANGE_PERIOD
+from config import RS_HORIZONS, RS_BENCHMARKS, BASKETS
+from baskets import all_basket_symbols
+import pandas as pd
+
+# --- Page Configuration ---
+st.set_page_config(page_title="Relative Strength Leaderboard", page_icon="🏆", layout="wide")
+show_warmup_status()
+st.title("🏆 Relative Strength Leaderboard")
+
+# --- UI Controls ---
+selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+selected_basket = BASKETS[selected_basket_name]
+
+# --- Data Loading (precomputed after every ingest) ---
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=4)
+def compute_relative_strength(symbols, versions):
+    """Fallback when nothing is precomputed, cached per data version (`versions` only keys the cache)."""
+    asset_data = load_data(asset_list=list(symbols))
+    return None if asset_data is None else calculate_relative_strength(asset_data)
+
+
+results = {name: load_derived(f'relative_strength:{name}') for name in ('ranks', 'scores', 'rank_changes', 'leaderboard')}
+
+if any(frame is None for frame in results.values()):
+    st.info("Relative strength has not been precomputed yet; computing it now. Run the data updater to precompute it.")
+    all_symbols = tuple(dict.fromkeys([*RS_BENCHMARKS, *all_basket_symbols()]))
+    results = compute_relative_strength(all_symbols, data_versions(all_symbols))
+    if results is None:
+        st.warning("Could not load asset data. Please ensure the data updater has been run.")
+        st.stop()
+
+ranks, leaderboard, rank_changes = results['ranks'], results['leaderboard'], results['rank_changes']
+if leaderboard.empty:
+    st.warning("Not enough historical data to rank assets.")
+    st.stop()
+
+# --- Restrict to the Selected Basket (ranks stay universe-wide) ---
+basket_symbols = [symbol for symbol in selected_basket.values() if symbol in leaderboard.index]
+basket_board = leaderboard.loc[basket_symbols].sort_values('rank')
+basket_board.insert(1, 'basket_rank', range(1, len(basket_board) + 1))
+benchmark_rows = leaderboard.loc[[symbol for symbol in RS_BENCHMARKS if symbol in leaderboard.index]]
+
+st.caption(
+    f"Ranked {len(leaderboard)} assets on {ranks.index[-1].strftime('%Y-%m-%d')} by mean cross-sectional percentile of "
+    f"their {', '.join(f'{h}d' for h in RS_HORIZONS)} returns. "
+    + ", ".join(f"{symbol} ranks #{int(row['rank'])}" for symbol, row in benchmark_rows.iterrows())
+)
+
+# --- Leaderboards and Movers ---
+# The table size and the rank history selection only redraw their own fragment
+@st.fragment
+def leaderboards(basket_board, basket_rank_changes):
+    top_n = st.slider("Assets per Table:", min_value=5, max_value=50, value=15, step=5)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Strongest")
+        st.dataframe(basket_board.head(top_n).round(2), use_container_width=True)
+    with col2:
+        st.subheader("Weakest")
+        st.dataframe(basket_board.tail(top_n).iloc[::-1].round(2), use_container_width=True)
+
+    top_movers, bottom_movers = top_bottom_movers(basket_rank_changes, n=top_n)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader(f"Biggest Climbers ({RS_CHANGE_PERIOD}d)")
+        st.dataframe(top_movers.rename('ranks gained').to_frame(), use_container_width=True)
+    with col2:
+        st.subheader(f"Biggest Fallers ({RS_CHANGE_PERIOD}d)")
+        st.dataframe(bottom_movers.rename('ranks gained').to_frame(), use_container_width=True)
+
+
+# --- Rank History ---
+@st.fragment
+def rank_history(ranks, default_symbols):
+    selected_symbols = st.multiselect("Rank History:", options=list(ranks.columns), default=default_symbols)
+    fig = go.Figure()
+    for symbol in selected_symbols:
+        fig.add_trace(go.Scatter(x=ranks.index, y=ranks[symbol], mode='lines', name=symbol))
+    fig.update_layout(
+        height=500, title_text="Relative Strength Rank (1 = strongest)",
+        yaxis_title="Rank", xaxis_title="Date", yaxis=dict(autorange='reversed'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor='rgba(17, 17, 17, 1)'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+leaderboards(basket_board, rank_changes[basket_symbols])
+rank_history(ranks, list(basket_board.index[:5]) + [symbol for symbol in RS_BENCHMARKS if symbol in ranks.columns])
+
+# --- Indicator Explanation ---
+st.markdown("---")
+st.header("How to Use the Leaderboard")
+st.markdown("""
+- **Score** is the average percentile of an asset's returns across the ranking horizons (100 = best in every horizon). **Rank** orders the whole universe by score; **basket_rank** orders only the selected basket.
+- **vs_BTCUSD / vs_ETHUSD** columns are the asset's return minus the benchmark's return over that horizon. Assets ranked above BTCUSD are outperforming Bitcoin on balance across the horizons.
+- **Climbers and Fallers** are the assets whose rank changed the most over the last week; early climbers often lead rotations.
+""")
@@ -0,0 +1,80 @@
+import streamlit as st
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from utils import load_data, load_derived, data_versions, cached_figure, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
+from volume_breadth import calculate_volume_breadth, VOLUME_BREADTH_FRAME
+from config import BASKETS
+
+# --- Page Configuration ---
+st.set_page_config(page_title="Volume Breadth", layout="wide")
+show_warmup_status()
+st.title("📊 Volume Breadth: Up/Down Volume, McClellan & Arms Index")
+
+# --- UI Controls ---
+selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+selected_basket = BASKETS[selected_basket_name]
+
+# --- Data Loading (precomputed after every ingest) ---
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=16)
+def compute_volume_breadth(basket_symbols, versions):
+    """Fallback when nothing is precomputed, cached per basket and data version (`versions` only keys the cache)."""
+    asset_data = load_data(asset_list=list(basket_symbols), compact=True, columns=('close', 'volume'))
+    return None if asset_data is None else calculate_volume_breadth(asset_data)
+
+
+basket_symbols = tuple(selected_basket.values())
+versions = data_versions(basket_symbols)
+suite = load_derived(f'{VOLUME_BREADTH_FRAME}:{selected_basket_name}')
+if suite is None:
+    suite = compute_volume_breadth(basket_symbols, versions)
+if suite is None or suite.empty:
+    st.warning("Could not load asset data. Please ensure the data updater has been run.")
+    st.stop()
+
+# --- Charting ---
+# Built once per basket and data version (one bar color per day)
+def build_volume_breadth_figure():
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.4, 0.3, 0.3])
+
+    fig.add_trace(go.Scatter(x=suite.index, y=suite['up_down_volume_ratio'], mode='lines', name='Up/Down Volume Ratio', line=dict(color='deepskyblue', width=1.5)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=suite.index, y=suite['trin'], mode='lines', name='Arms Index (TRIN)', line=dict(color='orange', width=1.5)), row=1, col=1)
+    fig.add_hline(y=1, line_dash="dash", line_color="gray", line_width=1, row=1, col=1)
+
+    colors = ['limegreen' if val >= 0 else 'tomato' for val in suite['mcclellan_oscillator']]
+    fig.add_trace(go.Bar(x=suite.index, y=suite['mcclellan_oscillator'], name='McClellan Oscillator', marker_color=colors, marker_opacity=0.7), row=2, col=1)
+    fig.add_trace(go.Scatter(x=suite.index, y=suite['mcclellan_summation'], mode='lines', name='McClellan Summation Index', line=dict(color='cyan', width=2)), row=3, col=1)
+
+    fig.update_layout(height=800, title_text=f"Volume Breadth for {selected_basket_name}", showlegend=True,
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                      plot_bgcolor='rgba(17, 17, 17, 1)')
+    fig.update_yaxes(title_text="Ratio", type="log", row=1, col=1)
+    fig.update_yaxes(title_text="Oscillator", row=2, col=1)
+    fig.update_yaxes(title_text="Summation", row=3, col=1)
+    return fig
+
+
+st.plotly_chart(cached_figure(('volume_breadth', selected_basket_name, versions), build_volume_breadth_figure), use_container_width=True)
+
+# --- Indicator Explanation ---
+st.markdown("---")
+st.header("How to Use Volume Breadth")
+col1, col2 = st.columns(2)
+
+with col1:
+    st.subheader("⚙️ How It's Computed")
+    st.markdown("""
+    Each day, the assets of the basket are split into advancers and decliners (as for the A/D Line), and their USD volume (`close × volume`) is added up.
+    1.  **Up/Down Volume Ratio**: USD volume of the advancers divided by that of the decliners.
+    2.  **McClellan Oscillator**: The 19-day EMA minus the 39-day EMA of `Advancers - Decliners`.
+    3.  **McClellan Summation Index**: The running total of the oscillator.
+    4.  **Arms Index (TRIN)**: `(Advancers / Decliners) / (Up Volume / Down Volume)`.
+    """)
+
+with col2:
+    st.subheader("🎯 The Signal")
+    st.markdown("""
+    - **<font color='lightgreen'>🟢 Accumulation</font>**: An Up/Down Volume Ratio above 1 and a TRIN **below 1** show volume concentrated in the advancing assets.
+    - **<font color='lightcoral'>🔴 Distribution</font>**: A TRIN well **above 1** shows heavy volume in the declining assets, even on days with many advancers.
+    - **<font color='cyan'>🔵 Breadth Trend</font>**: The Oscillator crossing 0 marks short-term shifts in participation; a rising Summation Index confirms a broad, lasting advance.
+    """, unsafe_allow_html=True)
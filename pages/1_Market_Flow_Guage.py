@@ -1,11 +1,13 @@
 import streamlit as st
 import plotly.graph_objects as go
 from utils import load_data
+from warmup import show_warmup_status
 from indicators import calculate_stablecoin_vs_total_roc
 from config import MACRO_SYMBOLS
 
 # --- Page Configuration ---
 st.set_page_config(page_title="MFG", layout="wide") # Changed page title
+show_warmup_status()
 
 # --- Data Loading ---
 data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
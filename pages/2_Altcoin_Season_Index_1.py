@@ -1,12 +1,14 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data
+from utils import load_data, data_versions, cached_figure
+from warmup import show_warmup_status
 from indicators import calculate_altcoin_season_index_v1 # Corrected import
 from config import MACRO_SYMBOLS
 import pandas as pd
 
 # --- Page Configuration ---
 st.set_page_config(page_title="ASI1", layout="wide")
+show_warmup_status()
 
 # --- Data Loading ---
 data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
@@ -19,44 +21,48 @@ if data is None:
 # Corrected function call
 asi_df = calculate_altcoin_season_index_v1(data['TOTAL3'], data['BTC_D'], ma_length=30)
 
-# --- Charting ---
 st.title("🔥 Altcoin Season Index 1")
 
-fig = go.Figure()
+# --- Charting ---
+# Built once per data version of its inputs (one bar color per day)
+def build_asi_figure():
+    fig = go.Figure()
+
+    # Add the bar chart for the daily ASI value
+    colors = ['limegreen' if val >= 0 else 'tomato' for val in asi_df['asi_value']]
+    fig.add_trace(go.Bar(
+        x=asi_df.index,
+        y=asi_df['asi_value'],
+        name='Daily ASI Value',
+        marker_color=colors,
+        marker_opacity=0.5
+    ))
 
-# Add the bar chart for the daily ASI value
-colors = ['limegreen' if val >= 0 else 'tomato' for val in asi_df['asi_value']]
-fig.add_trace(go.Bar(
-    x=asi_df.index,
-    y=asi_df['asi_value'],
-    name='Daily ASI Value',
-    marker_color=colors,
-    marker_opacity=0.5
-))
+    # Add the moving average signal line
+    fig.add_trace(go.Scatter(
+        x=asi_df.index,
+        y=asi_df['signal_line'],
+        mode='lines',
+        name='30-Day Signal Line',
+        line=dict(color='white', width=2.5)
+    ))
 
-# Add the moving average signal line
-fig.add_trace(go.Scatter(
-    x=asi_df.index,
-    y=asi_df['signal_line'],
-    mode='lines',
-    name='30-Day Signal Line',
-    line=dict(color='white', width=2.5)
-))
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", line_width=1)
 
-fig.add_hline(y=0, line_dash="dash", line_color="gray", line_width=1)
+    # --- Layout and Aesthetics ---
+    fig.update_layout(
+        height=600,
+        xaxis_title="Date",
+        yaxis_title="Momentum Spread (TOTAL3 vs. BTC.D)",
+        yaxis_range=[-10, 10],
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor='rgba(17, 17, 17, 1)'
+    )
+    return fig
 
-# --- Layout and Aesthetics ---
-fig.update_layout(
-    height=600,
-    xaxis_title="Date",
-    yaxis_title="Momentum Spread (TOTAL3 vs. BTC.D)",
-    yaxis_range=[-10, 10],
-    showlegend=True,
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-    plot_bgcolor='rgba(17, 17, 17, 1)'
-)
 
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(cached_figure(('asi_v1', data_versions(['TOTAL3', 'BTC_D'])), build_asi_figure), use_container_width=True)
 
 # --- Indicator Explanation ---
 st.markdown("---")
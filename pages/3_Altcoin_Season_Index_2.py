@@ -1,41 +1,44 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data
-from indicators import calculate_official_altcoin_season_index
-from config import (
-    MACRO_SYMBOLS, MAJORS_LARGE_CAP, MAJORS_MID_CAP,
-    MAJORS_SMALL_CAP, MAJORS_MICRO_CAP, MEME_COIN_BASKET
-)
+from utils import load_data_many, data_versions, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
+from indicators import calculate_official_altcoin_season_index, ASI_NORMALIZATIONS
+from config import MACRO_SYMBOLS, BASKETS
 import numpy as np
 import pandas as pd
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Official Altcoin Season Index", layout="wide")
+show_warmup_status()
 st.title("Official Altcoin Season Index")
 
 # --- UI Controls ---
-asset_baskets = {
-    "Everything (All Baskets)": {**MAJORS_LARGE_CAP, **MAJORS_MID_CAP, **MAJORS_SMALL_CAP, **MAJORS_MICRO_CAP, **MEME_COIN_BASKET},
-    "Large Caps (>$1B)": MAJORS_LARGE_CAP,
-    "Mid Caps (>$500M)": MAJORS_MID_CAP,
-    "Small Caps (>$100M)": MAJORS_SMALL_CAP,
-    "Micro Caps (>$50M)": MAJORS_MICRO_CAP,
-    "Meme Coins": MEME_COIN_BASKET
-}
-selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(asset_baskets.keys()), index=0)
-selected_basket = asset_baskets[selected_basket_name]
+selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+selected_basket = BASKETS[selected_basket_name]
+normalization_labels = {'zscore': "Z-score (mean / std)", 'percentile': "Percentile rank", 'robust': "Robust (median / MAD)"}
+normalization = st.selectbox(
+    "Normalization:", options=list(ASI_NORMALIZATIONS), index=0, format_func=normalization_labels.get,
+    help="How each component is scored against its one-year history. Percentile rank and median/MAD are less distorted by volume spikes."
+)
 
-# --- Data Loading ---
-majors_data = load_data(asset_list=list(selected_basket.values()))
-macro_data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
+# --- Data Loading and Indicator Calculation ---
+# Cached per basket, normalization and data version, so reruns and switching back skip both
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=32)
+def compute_altcoin_season_index(basket_symbols, normalization, versions):
+    """Altcoin Season Index of a basket, or None without data (`versions` only keys the cache)."""
+    loaded = load_data_many({'assets': list(basket_symbols), 'macro': list(MACRO_SYMBOLS.values())})
+    majors_data, macro_data = loaded['assets'], loaded['macro']
+    if majors_data is None or macro_data is None or 'BTCUSD' not in macro_data or 'BTC_D' not in macro_data:
+        return None
+    return calculate_official_altcoin_season_index(majors_data, macro_data['BTCUSD'], macro_data['BTC_D'], normalization=normalization)
 
-if majors_data is None or macro_data is None or 'BTCUSD' not in macro_data or 'BTC_D' not in macro_data:
+
+basket_symbols = tuple(selected_basket.values())
+index_df = compute_altcoin_season_index(basket_symbols, normalization, data_versions(basket_symbols, list(MACRO_SYMBOLS.values())))
+if index_df is None:
     st.warning("Could not load all required data. Please run the data updater scripts.")
     st.stop()
 
-# --- Indicator Calculation ---
-index_df = calculate_official_altcoin_season_index(majors_data, macro_data['BTCUSD'], macro_data['BTC_D'])
-
 # --- Charting ---
 fig = go.Figure()
 fig.add_trace(go.Scatter(x=index_df.index, y=index_df['altcoin_season_index'], mode='lines', name='Altcoin Season Index', line=dict(color='cyan', width=2.5)))
@@ -61,13 +64,14 @@ with col1:
     """)
     st.markdown("<h6>Step 1: Calculate the Raw Metrics</h6>", unsafe_allow_html=True)
     st.markdown("""
-    - **Price Breadth**: The percentage of altcoins outperforming Bitcoin over the last 90 days.
+    - **Price Breadth**: The percentage of altcoins outperforming Bitcoin over the last 90 days, out of those listed for at least 90 days.
     - **Volume Breadth**: The total USD volume of those outperforming altcoins.
     - **Dominance Momentum**: The 90-day performance of Bitcoin Dominance (`BTC.D`).
     """)
     st.markdown("<h6>Step 2: Measure Significance with Z-Scores</h6>", unsafe_allow_html=True)
     st.markdown("""
     We convert each raw metric into a **Z-score** to measure its statistical significance relative to its one-year history.
+    The *Percentile rank* and *Robust (median / MAD)* normalizations score the same history in a way that is less distorted by extreme volume days.
     """)
     st.markdown("<h6>Step 3: Combine Scores with Weights</h6>", unsafe_allow_html=True)
     st.markdown("""
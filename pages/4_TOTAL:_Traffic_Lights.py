@@ -1,11 +1,14 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data
+from utils import load_data, load_derived, data_versions, cached_figure, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
 from indicators import calculate_traffic_light
-from config import MACRO_SYMBOLS
+from regime_breadth import calculate_asset_regimes, calculate_regime_shares, summarize_current_regimes, REGIMES_FRAME
+from config import MACRO_SYMBOLS, BASKETS
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Regime Map", layout="wide")
+show_warmup_status()
 
 # --- Data Loading ---
 data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
@@ -17,48 +20,106 @@ if data is None:
 # --- Indicator Calculation ---
 regime_df = calculate_traffic_light(data['TOTAL'])
 
-# --- Charting ---
 st.title("🚦 TOTAL Regime Map (Traffic Lights)")
 
-fig = go.Figure()
+# --- Charting ---
+# Built once per data version of TOTAL (one rectangle per regime change)
+def build_regime_map_figure():
+    fig = go.Figure()
+
+    # --- Logic to draw the background color fills ---
+    # This creates the colored rectangles for each regime, added in one layout
+    # update (fig.add_vrect re-validates every existing shape on each call)
+    colors = regime_df['regime_color']
+    block_starts = colors.ne(colors.shift()).to_numpy().nonzero()[0]
+    block_ends = list(block_starts[1:] - 1) + [len(regime_df) - 1]
+    fig.update_layout(shapes=[
+        dict(
+            type='rect', xref='x', yref='y domain', x0=regime_df.index[start], x1=regime_df.index[end], y0=0, y1=1,
+            fillcolor=colors.iloc[start], opacity=0.4, layer="below", line_width=0,
+        )
+        for start, end in zip(block_starts, block_ends)
+    ])
+
+    # --- Add the price and moving average lines ---
+    fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['close'], mode='lines', name='TOTAL Market Cap', line=dict(color='white', width=2.5)))
+    fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['EMA_21'], mode='lines', name='21 EMA', line=dict(color='cyan', width=1.5, dash='dot')))
+    fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['SMA_50'], mode='lines', name='50 SMA', line=dict(color='magenta', width=1.5, dash='dot')))
+    fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['SMA_200'], mode='lines', name='200 SMA', line=dict(color='yellow', width=2)))
+
+
+    # --- Layout and Aesthetics ---
+    fig.update_layout(
+        height=600,
+        yaxis_title="Market Cap (USD)",
+        xaxis_title="Date",
+        yaxis_type="log", # Log scale is often better for viewing market cap over long periods
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor='rgba(17, 17, 17, 1)' # Dark background
+    )
+    return fig
 
-# --- Logic to draw the background color fills ---
-# This creates the colored rectangles for each regime
-current_color = regime_df['regime_color'].iloc[0]
-start_date = regime_df.index[0]
 
-for i in range(1, len(regime_df)):
-    if regime_df['regime_color'].iloc[i] != current_color:
-        fig.add_vrect(
-            x0=start_date, x1=regime_df.index[i-1],
-            fillcolor=current_color, opacity=0.4, layer="below", line_width=0,
+st.plotly_chart(cached_figure(('traffic_lights', data_versions(['TOTAL'])), build_regime_map_figure), use_container_width=True)
+
+# --- Regime Breadth Across the Universe ---
+st.markdown("---")
+st.header("🚦 Regime Breadth: Traffic Lights for Every Asset")
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=16)
+def compute_basket_regimes(basket_symbols, versions):
+    """Regimes of a basket when they have not been precomputed (`versions` only keys the cache)."""
+    basket_data = load_data(asset_list=list(basket_symbols))
+    return calculate_asset_regimes(basket_data) if basket_data else None
+
+
+# The basket only changes this section, so its selectbox reruns just this fragment
+@st.fragment
+def regime_breadth():
+    selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+    selected_basket = BASKETS[selected_basket_name]
+    basket_symbols = list(selected_basket.values())
+
+    # Regimes are precomputed after every ingest; compute them on the fly if they are not there yet
+    all_regimes = load_derived(REGIMES_FRAME)
+    if all_regimes is not None:
+        regimes = all_regimes[[symbol for symbol in basket_symbols if symbol in all_regimes.columns]]
+    else:
+        regimes = compute_basket_regimes(tuple(basket_symbols), data_versions(basket_symbols))
+
+    if regimes is None or regimes.empty:
+        st.warning("Could not compute per-asset regimes. Please run the data updater scripts.")
+    else:
+        shares_df = calculate_regime_shares(regimes)
+        current_df = summarize_current_regimes(regimes)
+
+        fig_breadth = go.Figure()
+        for regime, color in (('green', '#57e45c'), ('yellow', '#ffeb3b'), ('red', '#ff5252')):
+            fig_breadth.add_trace(go.Scatter(
+                x=shares_df.index, y=shares_df[regime], mode='lines', name=regime.capitalize(),
+                line=dict(width=0.5, color=color), stackgroup='one'
+            ))
+        fig_breadth.update_layout(
+            height=450, title_text=f"Share of {selected_basket_name} in Each Regime",
+            yaxis_title="Share of Assets (%)", xaxis_title="Date", yaxis_range=[0, 100],
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            plot_bgcolor='rgba(17, 17, 17, 1)'
         )
-        start_date = regime_df.index[i]
-        current_color = regime_df['regime_color'].iloc[i]
-# Add the final colored block
-fig.add_vrect(
-    x0=start_date, x1=regime_df.index[-1],
-    fillcolor=current_color, opacity=0.4, layer="below", line_width=0,
-)
-
-# --- Add the price and moving average lines ---
-fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['close'], mode='lines', name='TOTAL Market Cap', line=dict(color='white', width=2.5)))
-fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['EMA_21'], mode='lines', name='21 EMA', line=dict(color='cyan', width=1.5, dash='dot')))
-fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['SMA_50'], mode='lines', name='50 SMA', line=dict(color='magenta', width=1.5, dash='dot')))
-fig.add_trace(go.Scatter(x=regime_df.index, y=regime_df['SMA_200'], mode='lines', name='200 SMA', line=dict(color='yellow', width=2)))
-
-
-# --- Layout and Aesthetics ---
-fig.update_layout(
-    height=600,
-    yaxis_title="Market Cap (USD)",
-    xaxis_title="Date",
-    yaxis_type="log", # Log scale is often better for viewing market cap over long periods
-    showlegend=True,
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-    plot_bgcolor='rgba(17, 17, 17, 1)' # Dark background
-)
-st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_breadth, use_container_width=True)
+
+        latest = shares_df.iloc[-1]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🟢 Green", f"{latest['green']:.1f}%")
+        col2.metric("🟡 Yellow", f"{latest['yellow']:.1f}%")
+        col3.metric("🔴 Red", f"{latest['red']:.1f}%")
+
+        st.subheader("Current Regime by Asset")
+        st.dataframe(current_df, use_container_width=True)
+
+
+regime_breadth()
 
 # --- Indicator Explanation (Always visible) ---
 st.markdown("---")
@@ -1,30 +1,15 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from utils import load_data
+from utils import load_data, data_versions, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
 from config import MACRO_SYMBOLS
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Returns Heatmap", layout="wide")
+show_warmup_status()
 st.title("📅 Monthly Returns Heatmap")
 
-# --- Data Loading ---
-# --- THIS IS THE FIX ---
-# We now correctly pass the dictionary *values* (the table names) to the loader.
-data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
-
-if data is None:
-    st.warning("Could not load the required data. Please run the data updater scripts.")
-    st.stop()
-
-# --- UI Controls: Asset Selection ---
-asset_options = list(data.keys())
-selected_asset = st.selectbox(
-    "Select an Asset to Analyze:",
-    asset_options,
-    index=asset_options.index('BTCUSDT') if 'BTCUSDT' in asset_options else 0 # Default to BTC
-)
-
 # --- Data Processing Function ---
 def calculate_monthly_returns_grid(daily_prices_df):
     """Transforms a DataFrame of daily prices into a pivot table of monthly returns."""
@@ -43,8 +28,33 @@ def calculate_monthly_returns_grid(daily_prices_df):
     
     return heatmap_data
 
+# --- Data Loading ---
+# Monthly grids of every macro asset, cached per data version, so picking another asset is a lookup
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=8)
+def compute_monthly_returns(versions):
+    """Monthly returns grid of every macro asset, or None without data (`versions` only keys the cache)."""
+    data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
+    if data is None:
+        return None
+    return {asset: calculate_monthly_returns_grid(df) for asset, df in data.items()}
+
+
+returns_grids = compute_monthly_returns(data_versions(list(MACRO_SYMBOLS.values())))
+
+if returns_grids is None:
+    st.warning("Could not load the required data. Please run the data updater scripts.")
+    st.stop()
+
+# --- UI Controls: Asset Selection ---
+asset_options = list(returns_grids.keys())
+selected_asset = st.selectbox(
+    "Select an Asset to Analyze:",
+    asset_options,
+    index=asset_options.index('BTCUSDT') if 'BTCUSDT' in asset_options else 0 # Default to BTC
+)
+
 # --- Charting ---
-returns_grid = calculate_monthly_returns_grid(data[selected_asset])
+returns_grid = returns_grids[selected_asset]
 
 custom_colorscale = [
     [0.0, 'rgb(200, 0, 0)'],
@@ -1,57 +1,61 @@
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from utils import load_data
+from utils import load_data_many, data_versions, cached_figure, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
 from indicators import calculate_ad_line
-from config import (
-    MACRO_SYMBOLS, MAJORS_LARGE_CAP, MAJORS_MID_CAP,
-    MAJORS_SMALL_CAP, MAJORS_MICRO_CAP, MEME_COIN_BASKET
-)
+from config import MACRO_SYMBOLS, BASKETS
 import pandas as pd
 
 # --- Page Configuration ---
 st.set_page_config(page_title="A/D Line", layout="wide")
+show_warmup_status()
 st.title("📈 Market Breadth: Advance/Decline (A/D) Line")
 
 # --- UI Controls ---
-asset_baskets = {
-    "Everything (All Baskets)": {**MAJORS_LARGE_CAP, **MAJORS_MID_CAP, **MAJORS_SMALL_CAP, **MAJORS_MICRO_CAP, **MEME_COIN_BASKET},
-    "Large Caps (>$1B)": MAJORS_LARGE_CAP,
-    "Mid Caps (>$500M)": MAJORS_MID_CAP,
-    "Small Caps (>$100M)": MAJORS_SMALL_CAP,
-    "Micro Caps (>$50M)": MAJORS_MICRO_CAP,
-    "Meme Coins": MEME_COIN_BASKET
-}
-selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(asset_baskets.keys()), index=0)
-selected_basket = asset_baskets[selected_basket_name]
+selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+selected_basket = BASKETS[selected_basket_name]
 
-# --- Data Loading ---
-ad_line_assets = load_data(asset_list=list(selected_basket.values()))
-macro_data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
+# --- Data Loading and Indicator Calculation ---
+# Cached per basket and data version, so reruns and switching back to a basket skip both
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=16)
+def compute_ad_line(basket_symbols, versions):
+    """A/D line of a basket plus TOTAL's close, or None without data (`versions` only keys the cache)."""
+    loaded = load_data_many({'assets': list(basket_symbols), 'macro': list(MACRO_SYMBOLS.values())})
+    ad_line_assets, macro_data = loaded['assets'], loaded['macro']
+    if ad_line_assets is None or macro_data is None:
+        return None
+    return calculate_ad_line(ad_line_assets), macro_data['TOTAL']['close']
 
-if ad_line_assets is None or macro_data is None:
+
+basket_symbols = tuple(selected_basket.values())
+versions = data_versions(basket_symbols, list(MACRO_SYMBOLS.values()))
+computed = compute_ad_line(basket_symbols, versions)
+if computed is None:
     st.warning("Could not load all required data. Please run the data updater scripts.")
     st.stop()
-
-# --- Indicator Calculation ---
-ad_line_df = calculate_ad_line(ad_line_assets)
+ad_line_df, total_close = computed
 
 # --- Charting ---
-fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.6, 0.4])
+# Built once per basket and data version (one bar color per day)
+def build_ad_line_figure():
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.6, 0.4])
+
+    fig.add_trace(go.Scatter(x=total_close.index, y=total_close, mode='lines', name='TOTAL Market Cap', line=dict(color='white')), row=1, col=1)
 
-fig.add_trace(go.Scatter(x=macro_data['TOTAL'].index, y=macro_data['TOTAL']['close'], mode='lines', name='TOTAL Market Cap', line=dict(color='white')), row=1, col=1)
+    colors = ['limegreen' if val >= 0 else 'tomato' for val in ad_line_df['daily_ad_score']]
+    fig.add_trace(go.Bar(x=ad_line_df.index, y=ad_line_df['daily_ad_score'], name='Daily A/D Score', marker_color=colors, marker_opacity=0.7), row=2, col=1)
+    fig.add_trace(go.Scatter(x=ad_line_df.index, y=ad_line_df['ad_line'], mode='lines', name='A/D Line (Cumulative)', line=dict(color='cyan', width=2)), row=2, col=1)
 
-colors = ['limegreen' if val >= 0 else 'tomato' for val in ad_line_df['daily_ad_score']]
-fig.add_trace(go.Bar(x=ad_line_df.index, y=ad_line_df['daily_ad_score'], name='Daily A/D Score', marker_color=colors, marker_opacity=0.7), row=2, col=1)
-fig.add_trace(go.Scatter(x=ad_line_df.index, y=ad_line_df['ad_line'], mode='lines', name='A/D Line (Cumulative)', line=dict(color='cyan', width=2)), row=2, col=1)
+    fig.update_layout(height=700, title_text=f"A/D Line for {selected_basket_name}", showlegend=True,
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                      plot_bgcolor='rgba(17, 17, 17, 1)')
+    fig.update_yaxes(title_text="Market Cap (USD)", type="log", row=1, col=1)
+    fig.update_yaxes(title_text="A/D Score / Line", row=2, col=1)
+    return fig
 
-fig.update_layout(height=700, title_text=f"A/D Line for {selected_basket_name}", showlegend=True,
-                  legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                  plot_bgcolor='rgba(17, 17, 17, 1)')
-fig.update_yaxes(title_text="Market Cap (USD)", type="log", row=1, col=1)
-fig.update_yaxes(title_text="A/D Score / Line", row=2, col=1)
 
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(cached_figure(('ad_line', selected_basket_name, versions), build_ad_line_figure), use_container_width=True)
 
 # --- Indicator Explanation ---
 st.markdown("---")
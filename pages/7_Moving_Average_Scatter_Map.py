@@ -1,15 +1,14 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data
+from utils import load_data, data_versions, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
 from indicators import calculate_distance_from_ma
-from config import (
-    MAJORS_LARGE_CAP, MAJORS_MID_CAP,
-    MAJORS_SMALL_CAP, MAJORS_MICRO_CAP, MEME_COIN_BASKET
-)
+from config import BASKETS
 import pandas as pd
 
 # --- Page Configuration ---
 st.set_page_config(page_title="MA Distance Map", layout="wide")
+show_warmup_status()
 st.title("📊 MA Distance Map")
 
 # --- UI Controls ---
@@ -18,27 +17,26 @@ with col1:
     ma_period = st.radio("Select Moving Average Period:", (50, 200), index=1, horizontal=True)
 
 with col2:
-    asset_baskets = {
-        "Everything (All Baskets)": {**MAJORS_LARGE_CAP, **MAJORS_MID_CAP, **MAJORS_SMALL_CAP, **MAJORS_MICRO_CAP, **MEME_COIN_BASKET},
-        "Large Caps (>$1B)": MAJORS_LARGE_CAP,
-        "Mid Caps (>$500M)": MAJORS_MID_CAP,
-        "Small Caps (>$100M)": MAJORS_SMALL_CAP,
-        "Micro Caps (>$50M)": MAJORS_MICRO_CAP,
-        "Meme Coins": MEME_COIN_BASKET
-    }
-    selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(asset_baskets.keys()), index=0)
-    selected_basket = asset_baskets[selected_basket_name]
-
-# --- Data Loading ---
-asset_data = load_data(asset_list=list(selected_basket.values()))
-
-if asset_data is None:
+    selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+    selected_basket = BASKETS[selected_basket_name]
+
+# --- Data Loading and Indicator Calculation ---
+# Cached per basket, MA period and data version, so reruns and switching back skip both
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=32)
+def compute_distance_from_ma(basket_symbols, ma_period, versions):
+    """Distance of every asset from its MA, or None without data (`versions` only keys the cache)."""
+    asset_data = load_data(asset_list=list(basket_symbols))
+    if asset_data is None:
+        return None
+    return calculate_distance_from_ma(asset_data, ma_length=ma_period)
+
+
+basket_symbols = tuple(selected_basket.values())
+distance_series = compute_distance_from_ma(basket_symbols, ma_period, data_versions(basket_symbols))
+if distance_series is None:
     st.warning("Could not load asset data. Please ensure the data updater has been run.")
     st.stop()
 
-# --- Indicator Calculation ---
-distance_series = calculate_distance_from_ma(asset_data, ma_length=ma_period)
-
 # --- Charting ---
 custom_colorscale = [[0.0, 'rgb(200, 0, 0)'], [0.5, 'rgb(80, 80, 80)'], [1.0, 'rgb(0, 200, 0)']]
 fig = go.Figure()
@@ -1,75 +1,104 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data
+from utils import load_data, data_versions, cached_figure, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
 from indicators import calculate_market_character
-from config import (
-    MAJORS_LARGE_CAP, MAJORS_MID_CAP,
-    MAJORS_SMALL_CAP, MAJORS_MICRO_CAP, MEME_COIN_BASKET
-)
+from config import MACRO_SYMBOLS, BASKETS
 import pandas as pd
 
 # --- Page Configuration ---
 st.set_page_config(page_title="MoVol Map", layout="wide")
+show_warmup_status()
 st.title("🧭 Momentum-Volatility Map (MoVol)")
 
 # --- UI Controls ---
-asset_baskets = {
-    "Everything (All Baskets)": {**MAJORS_LARGE_CAP, **MAJORS_MID_CAP, **MAJORS_SMALL_CAP, **MAJORS_MICRO_CAP, **MEME_COIN_BASKET},
-    "Large Caps (>$1B)": MAJORS_LARGE_CAP,
-    "Mid Caps (>$500M)": MAJORS_MID_CAP,
-    "Small Caps (>$100M)": MAJORS_SMALL_CAP,
-    "Micro Caps (>$50M)": MAJORS_MICRO_CAP,
-    "Meme Coins": MEME_COIN_BASKET
+selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(BASKETS.keys()), index=0)
+selected_basket = BASKETS[selected_basket_name]
+x_axis_modes = {
+    "Volatility": (None, 'volatility', "30-Day Volatility (Annualized)"),
+    "Beta vs BTC": ('BTCUSD', 'beta', "30-Day Beta vs BTC"),
+    "Beta vs ETH": ('ETHUSD', 'beta', "30-Day Beta vs ETH"),
+    "Idiosyncratic Volatility vs BTC": ('BTCUSD', 'residual_volatility', "30-Day Residual Volatility vs BTC (Annualized)"),
 }
-selected_basket_name = st.selectbox("Select an Asset Basket:", options=list(asset_baskets.keys()), index=0)
-selected_basket = asset_baskets[selected_basket_name]
+x_axis_mode = st.radio("X-Axis:", options=list(x_axis_modes.keys()), index=0, horizontal=True)
+benchmark_symbol, x_column, x_title = x_axis_modes[x_axis_mode]
 
 
-# --- Data Loading ---
-asset_data = load_data(asset_list=list(selected_basket.values()))
+# --- Data Loading and Indicator Calculation ---
+# Cached per basket, benchmark and data version, so reruns and switching back skip both
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=32)
+def compute_market_character(basket_symbols, benchmark_symbol, versions):
+    """
+    Market character of a basket (with beta columns against the benchmark, if any).
+    `versions` only keys the cache.
+
+    Returns:
+        tuple: (DataFrame or None, warning to show or None).
+    """
+    asset_data = load_data(asset_list=list(basket_symbols))
+    if asset_data is None:
+        return None, "Could not load asset data. Please ensure the data updater has been run."
+
+    benchmark_df = None
+    if benchmark_symbol:
+        macro_data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
+        if macro_data is None or benchmark_symbol not in macro_data:
+            return None, f"Could not load {benchmark_symbol}. Please ensure the data updater has been run."
+        benchmark_df = macro_data[benchmark_symbol]
+    return calculate_market_character(asset_data, benchmark_df=benchmark_df), None
 
-if asset_data is None:
-    st.warning("Could not load asset data. Please ensure the data updater has been run.")
-    st.stop()
 
-# --- Indicator Calculation ---
-character_df = calculate_market_character(asset_data)
+basket_symbols = tuple(selected_basket.values())
+inputs = [basket_symbols, list(MACRO_SYMBOLS.values())] if benchmark_symbol else [basket_symbols]
+versions = data_versions(*inputs)
+character_df, load_warning = compute_market_character(basket_symbols, benchmark_symbol, versions)
+if load_warning:
+    st.warning(load_warning)
+    st.stop()
+if benchmark_symbol:
+    character_df = character_df.dropna(subset=[x_column])
 
 if character_df.empty:
     st.warning("Could not compute Market Character. Not enough historical data available for calculation.")
     st.stop()
 
 # --- Charting ---
-fig = go.Figure()
-
-fig.add_trace(go.Scatter(
-    x=character_df['volatility'], y=character_df['momentum'],
-    mode='markers+text', text=character_df.index, textposition='top center',
-    marker=dict(size=12, color=character_df['momentum'], colorscale='RdYlGn',
-                showscale=True, colorbar=dict(title="Momentum (%)")),
-    hoverinfo='text'
-))
-
-# --- Quadrant Dividers ---
-x_divider = character_df['volatility'].median()
-y_divider = character_df['momentum'].median()
-fig.add_vline(x=x_divider, line_width=1, line_dash="dash", line_color="gray")
-fig.add_hline(y=y_divider, line_width=1, line_dash="dash", line_color="gray")
-
-# --- Layout ---
-fig.update_layout(
-    height=800, title_text=f"MoVol Map for {selected_basket_name}",
-    xaxis_title="30-Day Volatility (Annualized)", yaxis_title="30-Day Momentum (ROC %)",
-    showlegend=False, plot_bgcolor='rgba(17, 17, 17, 1)'
-)
-
-# --- Quadrant Labels ---
-fig.add_annotation(x=x_divider/2, y=y_divider + (character_df['momentum'].max()-y_divider)/2, text="Ideal Uptrend", showarrow=False, font=dict(color="lightgreen", size=14))
-fig.add_annotation(x=x_divider + (character_df['volatility'].max()-x_divider)/2, y=y_divider + (character_df['momentum'].max()-y_divider)/2, text="Speculative Frenzy", showarrow=False, font=dict(color="yellow", size=14))
-fig.add_annotation(x=x_divider/2, y=y_divider/2, text="Boring / Stable", showarrow=False, font=dict(color="orange", size=14))
-fig.add_annotation(x=x_divider + (character_df['volatility'].max()-x_divider)/2, y=y_divider/2, text="Capitulation / Fear", showarrow=False, font=dict(color="tomato", size=14))
-
-st.plotly_chart(fig, use_container_width=True)
+# Built once per basket, x-axis and data version (one labelled marker per asset)
+def build_movol_figure():
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=character_df[x_column], y=character_df['momentum'],
+        mode='markers+text', text=character_df.index, textposition='top center',
+        marker=dict(size=12, color=character_df['momentum'], colorscale='RdYlGn',
+                    showscale=True, colorbar=dict(title="Momentum (%)")),
+        hoverinfo='text'
+    ))
+
+    # --- Quadrant Dividers ---
+    x_divider = character_df[x_column].median()
+    y_divider = character_df['momentum'].median()
+    # Betas can be negative, so the left labels are centered between the axis floor and the divider
+    x_left = (min(0, character_df[x_column].min()) + x_divider) / 2
+    fig.add_vline(x=x_divider, line_width=1, line_dash="dash", line_color="gray")
+    fig.add_hline(y=y_divider, line_width=1, line_dash="dash", line_color="gray")
+
+    # --- Layout ---
+    fig.update_layout(
+        height=800, title_text=f"MoVol Map for {selected_basket_name}",
+        xaxis_title=x_title, yaxis_title="30-Day Momentum (ROC %)",
+        showlegend=False, plot_bgcolor='rgba(17, 17, 17, 1)'
+    )
+
+    # --- Quadrant Labels ---
+    fig.add_annotation(x=x_left, y=y_divider + (character_df['momentum'].max()-y_divider)/2, text="Ideal Uptrend", showarrow=False, font=dict(color="lightgreen", size=14))
+    fig.add_annotation(x=x_divider + (character_df[x_column].max()-x_divider)/2, y=y_divider + (character_df['momentum'].max()-y_divider)/2, text="Speculative Frenzy", showarrow=False, font=dict(color="yellow", size=14))
+    fig.add_annotation(x=x_left, y=y_divider/2, text="Boring / Stable", showarrow=False, font=dict(color="orange", size=14))
+    fig.add_annotation(x=x_divider + (character_df[x_column].max()-x_divider)/2, y=y_divider/2, text="Capitulation / Fear", showarrow=False, font=dict(color="tomato", size=14))
+    return fig
+
+
+st.plotly_chart(cached_figure(('movol', selected_basket_name, x_axis_mode, versions), build_movol_figure), use_container_width=True)
 
 # --- Explanation ---
 st.markdown("---")
@@ -82,6 +111,8 @@ with col1:
     1.  **Momentum (Y-Axis)**: The 30-day Rate of Change (ROC).
     2.  **Volatility (X-Axis)**: The 30-day annualized realized volatility.
     The dashed lines represent the **median** values, dynamically dividing the market into four quadrants.
+
+    The X-axis can instead show each asset's 30-day **beta** to BTC or ETH (how much it moves per 1% move in the benchmark), or its **idiosyncratic volatility** (the volatility left after removing the BTC-driven part).
     """)
 with col2:
     st.subheader("🎯 The Quadrants")
@@ -1,79 +1,98 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data
+from utils import load_data, load_data_many, data_versions, CACHE_TTL_SECONDS
+from warmup import show_warmup_status
 from indicators import calculate_regime_scatter_data
-from config import MEME_COIN_BASKET, MACRO_SYMBOLS
+from config import MEME_COIN_BASKET, MACRO_SYMBOLS, MEME_INDEX_SYMBOL
 import pandas as pd
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Meme Strength", layout="wide")
+show_warmup_status()
 st.title("Meme Strength Indicator: Memes vs. Total Market")
 
-# --- UI Controls ---
-lookback_days = st.slider(
-    "Select Lookback Window (Days):",
-    min_value=30,
-    max_value=365,
-    value=90, # Default to the last 90 days
-    step=15,
-    help="Adjust the slider to see how the market character has changed over different timeframes."
+# --- Data Loading and Indicator Calculation ---
+# One cached stage per data version, computed over the entire history; the
+# lookback slider below only re-slices it, inside its own fragment.
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=8)
+def compute_regime_scatter(versions):
+    """Full-history regime scatter data of the meme index vs. TOTAL (`versions` only keys the cache)."""
+    # Load the synthetic meme index; fall back to its constituents if it has not been built yet
+    loaded = load_data_many(
+        {'meme_index': [MEME_INDEX_SYMBOL], 'macro': list(MACRO_SYMBOLS.values())}, optional=('meme_index',)
+    )
+    meme_assets, macro_data = loaded['meme_index'], loaded['macro']
+    if meme_assets is None:
+        meme_assets = load_data(asset_list=list(MEME_COIN_BASKET.values()))
+    if meme_assets is None or macro_data is None:
+        return None
+    return calculate_regime_scatter_data(meme_assets, macro_data['TOTAL'])
+
+
+full_regime_df = compute_regime_scatter(
+    data_versions([MEME_INDEX_SYMBOL], list(MACRO_SYMBOLS.values()), list(MEME_COIN_BASKET.values()))
 )
-
-# --- Data Loading ---
-# Load the necessary assets for the calculation
-meme_assets = load_data(asset_list=list(MEME_COIN_BASKET.values()))
-macro_data = load_data(asset_list=list(MACRO_SYMBOLS.values()))
-
-
-if meme_assets is None or macro_data is None:
+if full_regime_df is None:
     st.warning("Could not load all required data for the Meme Index. Please run the data updater scripts.")
     st.stop()
 
-# --- Indicator Calculation ---
-# Calculate the data for the entire history first
-full_regime_df = calculate_regime_scatter_data(meme_assets, macro_data['TOTAL'])
-
-# Filter the data based on the slider
-regime_df = full_regime_df.tail(lookback_days)
-
-# --- Charting ---
-fig = go.Figure()
-
-fig.add_trace(go.Scatter(
-    x=regime_df['total_performance'],
-    y=regime_df['meme_performance'],
-    mode='markers',
-    marker=dict(
-        size=8,
-        color=regime_df['meme_performance'],
-        colorscale='RdYlGn',
-        showscale=True,
-        colorbar=dict(title="Meme Index Perf. (%)")
-    ),
-    text=regime_df.index.strftime('%Y-%m-%d'),
-    hoverinfo='text+x+y'
-))
-
-# --- Add reference lines ---
-# Diagonal line for 1:1 performance
-min_val = min(regime_df['total_performance'].min(), regime_df['meme_performance'].min())
-max_val = max(regime_df['total_performance'].max(), regime_df['meme_performance'].max())
-fig.add_shape(type="line", x0=min_val, y0=min_val, x1=max_val, y1=max_val, line=dict(color="gray", width=2, dash="dash"))
-# Zero lines for quadrants
-fig.add_vline(x=0, line_width=1, line_color="gray")
-fig.add_hline(y=0, line_width=1, line_color="gray")
-
-# --- Layout ---
-fig.update_layout(
-    height=700,
-    xaxis_title="Total Market 30-Day Performance (%)",
-    yaxis_title="Meme Index 30-Day Performance (%)",
-    title=f"Market Regime: Last {lookback_days} Days",
-    showlegend=False,
-    plot_bgcolor='rgba(17, 17, 17, 1)'
-)
 
-st.plotly_chart(fig, use_container_width=True)
+@st.fragment
+def regime_scatter(full_regime_df):
+    # --- UI Controls ---
+    lookback_days = st.slider(
+        "Select Lookback Window (Days):",
+        min_value=30,
+        max_value=365,
+        value=90, # Default to the last 90 days
+        step=15,
+        help="Adjust the slider to see how the market character has changed over different timeframes."
+    )
+
+    # Filter the data based on the slider
+    regime_df = full_regime_df.tail(lookback_days)
+
+    # --- Charting ---
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=regime_df['total_performance'],
+        y=regime_df['meme_performance'],
+        mode='markers',
+        marker=dict(
+            size=8,
+            color=regime_df['meme_performance'],
+            colorscale='RdYlGn',
+            showscale=True,
+            colorbar=dict(title="Meme Index Perf. (%)")
+        ),
+        text=regime_df.index.strftime('%Y-%m-%d'),
+        hoverinfo='text+x+y'
+    ))
+
+    # --- Add reference lines ---
+    # Diagonal line for 1:1 performance
+    min_val = min(regime_df['total_performance'].min(), regime_df['meme_performance'].min())
+    max_val = max(regime_df['total_performance'].max(), regime_df['meme_performance'].max())
+    fig.add_shape(type="line", x0=min_val, y0=min_val, x1=max_val, y1=max_val, line=dict(color="gray", width=2, dash="dash"))
+    # Zero lines for quadrants
+    fig.add_vline(x=0, line_width=1, line_color="gray")
+    fig.add_hline(y=0, line_width=1, line_color="gray")
+
+    # --- Layout ---
+    fig.update_layout(
+        height=700,
+        xaxis_title="Total Market 30-Day Performance (%)",
+        yaxis_title="Meme Index 30-Day Performance (%)",
+        title=f"Market Regime: Last {lookback_days} Days",
+        showlegend=False,
+        plot_bgcolor='rgba(17, 17, 17, 1)'
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+regime_scatter(full_regime_df)
 
 
 # --- Indicator Explanation (Always visible) ---
@@ -0,0 +1,413 @@
+import numpy as np
+import pandas as pd
+
+# --- Compact Panel Configuration ---
+DAY_NUMBER_DTYPE = np.int32
+COMPACT_PRICE_DTYPE = np.float32
+COMPACT_DEFAULT_COLUMNS = ('close',)
+
+
+def to_day_numbers(index):
+    """
+    Converts a DatetimeIndex into integer day numbers (days since 1970-01-01 UTC).
+
+    Args:
+        index (pd.Index): A datetime-like index. Timezone-aware indexes are converted to UTC first.
+
+    Returns:
+        np.ndarray: An int32 array with one day number per entry.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values.astype('datetime64[D]').astype(np.int64).astype(DAY_NUMBER_DTYPE)
+
+
+def day_numbers_to_datetime(day_numbers):
+    """
+    Converts day numbers back into a (midnight UTC) DatetimeIndex, e.g. for charting
+    the output of an indicator that was computed on a compact panel.
+    """
+    return pd.to_datetime(np.asarray(day_numbers, dtype=np.int64), unit='D')
+
+
+def local_to_utc(index):
+    """
+    Converts naive timestamps in this machine's local time (how tvDatafeed stamps
+    its bars) to naive UTC, following the local DST rules of each date.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        return index.tz_convert('UTC').tz_localize(None)
+    epoch_seconds = np.array([timestamp.timestamp() for timestamp in index.to_pydatetime()], dtype=np.float64)
+    return pd.DatetimeIndex(pd.to_datetime(np.round(epoch_seconds).astype(np.int64), unit='s'), name=index.name)
+
+
+def legacy_stamps_to_utc(index):
+    """
+    Converts the stamps of stored rows to naive UTC. Rows written before bars were
+    normalized carry tvDatafeed's local-time stamps, while normalized rows are
+    stamped at midnight UTC: stamps off midnight are converted from local time,
+    midnight stamps are kept.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        return index.tz_convert('UTC').tz_localize(None)
+    legacy = index != index.normalize()
+    if not legacy.any():
+        return index
+    values = index.to_numpy().copy()
+    values[legacy] = local_to_utc(index[legacy]).to_numpy()
+    return pd.DatetimeIndex(values, name=index.name)
+
+
+def compact_panel(data_dict, columns=COMPACT_DEFAULT_COLUMNS):
+    """
+    Converts a dictionary of OHLCV DataFrames into the compact layout:
+    float32 values, only the requested columns, and an integer day-number index
+    that is shared across every frame in the panel.
+
+    Every frame is placed on the same calendar Index object, so the index memory is
+    paid once per panel instead of once per symbol and pd.concat(..., axis=1) can
+    skip the index union entirely. Days before listing (or missing inside a
+    symbol's history) are NaN rows.
+
+    Args:
+        data_dict (dict): A dictionary of DataFrames indexed by datetime.
+        columns (tuple): The columns to keep. Defaults to ('close',).
+
+    Returns:
+        dict: A dictionary of compact DataFrames, keyed like the input.
+    """
+    columns = list(columns)
+    day_numbers = {}
+    for symbol, df in data_dict.items():
+        days = to_day_numbers(df.index)
+        # Keep the last bar if a source reports more than one bar on the same day
+        keep = np.append(days[1:] != days[:-1], True) if len(days) else days.astype(bool)
+        day_numbers[symbol] = (days[keep], keep)
+
+    non_empty = [days for days, _ in day_numbers.values() if len(days)]
+    if not non_empty:
+        return {}
+    first_day = min(int(days[0]) for days in non_empty)
+    last_day = max(int(days[-1]) for days in non_empty)
+    calendar = pd.Index(np.arange(first_day, last_day + 1, dtype=DAY_NUMBER_DTYPE), name='day')
+
+    compact = {}
+    for symbol, df in data_dict.items():
+        days, keep = day_numbers[symbol]
+        if not len(days):
+            continue
+        values = np.full((len(calendar), len(columns)), np.nan, dtype=COMPACT_PRICE_DTYPE)
+        values[days - first_day] = df[columns].to_numpy(dtype=COMPACT_PRICE_DTYPE)[keep]
+        compact[symbol] = pd.DataFrame(values, index=calendar, columns=columns, copy=False)
+        compact[symbol].attrs.update(df.attrs)
+    return compact
+
+
+def panel_memory_bytes(data_dict):
+    """
+    Returns the memory used by a dictionary of DataFrames, counting each shared
+    index object only once.
+    """
+    total = 0
+    seen_indexes = set()
+    for df in data_dict.values():
+        total += int(df.memory_usage(index=False, deep=True).sum())
+        if id(df.index) not in seen_indexes:
+            seen_indexes.add(id(df.index))
+            total += int(df.index.memory_usage(deep=True))
+    return total
+
+
+def normalize_daily_bars(df, forward_fill=False):
+    """
+    Normalizes a daily OHLCV DataFrame onto the canonical UTC day calendar.
+
+    Each bar is assigned to the UTC day it falls in (naive timestamps are treated
+    as UTC; convert local-time stamps with local_to_utc first) and stamped at
+    midnight, so bars from sources that report different times of day land on the
+    same calendar row. Rows of one day with the same open (the close when there is
+    no open column) are the same bar stamped twice, e.g. a legacy local-time row
+    and its UTC re-fetch, and only the last is kept. If a source reports more than
+    one distinct bar for the same day they are merged (first open, max high, min
+    low, last close, summed volume).
+
+    Forward-fill policy: series that do not trade 24/7 (see FORWARD_FILL_SYMBOLS in
+    config.py) are extended over the days they are closed. A filled day repeats
+    the previous close as its open/high/low/close and carries zero volume, so
+    returns over weekends and holidays are 0 instead of NaN. Days after the last
+    real bar are never filled.
+
+    Args:
+        df (pd.DataFrame): A DataFrame with a datetime index and OHLCV columns.
+        forward_fill (bool): Whether to apply the forward-fill policy.
+
+    Returns:
+        pd.DataFrame: The normalized DataFrame, indexed by midnight UTC 'datetime'.
+    """
+    if df.empty:
+        return df
+    days = to_day_numbers(df.index)
+    if np.any(days[1:] <= days[:-1]):
+        bar_key = df['open' if 'open' in df.columns else 'close'].to_numpy()
+        restamped = pd.DataFrame({'day': days, 'bar': bar_key}).duplicated(keep='last').to_numpy()
+        df, days = df[~restamped], days[~restamped]
+    if np.any(days[1:] <= days[:-1]):
+        aggregations = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        df = df.groupby(days, sort=True).agg({col: aggregations.get(col, 'last') for col in df.columns})
+        days = df.index.to_numpy(dtype=np.int64)
+    df = df.set_axis(pd.Index(day_numbers_to_datetime(days), name='datetime'), axis=0)
+
+    if forward_fill and int(days[-1]) - int(days[0]) + 1 > len(days):
+        full_calendar = pd.Index(day_numbers_to_datetime(np.arange(days[0], days[-1] + 1)), name='datetime')
+        df = df.reindex(full_calendar)
+        filled = df['close'].isna()
+        df['close'] = df['close'].ffill()
+        for col in ('open', 'high', 'low'):
+            if col in df.columns:
+                df[col] = df[col].where(~filled, df['close'])
+        if 'volume' in df.columns:
+            df['volume'] = df['volume'].fillna(0)
+    return df
+
+
+def align_on_calendar(series_dict):
+    """
+    Aligns several series on the shared day calendar by integer indexing instead
+    of a pd.concat outer join on their DatetimeIndexes.
+
+    Args:
+        series_dict (dict): A dictionary of Series indexed either by datetime or by
+            day number (compact panels).
+
+    Returns:
+        pd.DataFrame: One column per key, with one row per calendar day between the
+            earliest and latest input. Cells without data are NaN.
+    """
+    series_dict = {name: s for name, s in series_dict.items() if len(s)}
+    if not series_dict:
+        return pd.DataFrame(columns=list(series_dict))
+
+    is_datetime = all(isinstance(s.index, pd.DatetimeIndex) for s in series_dict.values())
+    day_numbers = {
+        name: to_day_numbers(s.index) if isinstance(s.index, pd.DatetimeIndex) else s.index.to_numpy(dtype=np.int64)
+        for name, s in series_dict.items()
+    }
+    first_day = min(int(days.min()) for days in day_numbers.values())
+    last_day = max(int(days.max()) for days in day_numbers.values())
+    dtype = np.result_type(*[s.dtype for s in series_dict.values()])
+    if dtype.kind != 'f':
+        dtype = np.dtype(np.float64)
+
+    values = np.full((last_day - first_day + 1, len(series_dict)), np.nan, dtype=dtype)
+    for position, (name, s) in enumerate(series_dict.items()):
+        values[day_numbers[name] - first_day, position] = s.to_numpy(dtype=dtype)
+
+    calendar = np.arange(first_day, last_day + 1)
+    if is_datetime:
+        index = pd.Index(day_numbers_to_datetime(calendar), name='datetime')
+    else:
+        index = pd.Index(calendar, name='day')
+    return pd.DataFrame(values, index=index, columns=list(series_dict))
+
+
+def sum_on_calendar(frames):
+    """
+    Adds up Series or DataFrames (with the same columns) computed on disjoint
+    parts of a panel, e.g. the per-partition counts of a breadth metric.
+
+    Args:
+        frames (list): Series or DataFrames indexed either by datetime or by day number.
+
+    Returns:
+        pd.Series | pd.DataFrame: The element-wise sum, with one row per calendar day
+            between the earliest and latest input. Days missing from an input count as 0.
+            DataFrame columns keep their own dtypes.
+    """
+    if isinstance(frames[0], pd.DataFrame):
+        return pd.DataFrame({column: sum_on_calendar([f[column] for f in frames]) for column in frames[0].columns})
+
+    non_empty = [f for f in frames if len(f)]
+    if not non_empty:
+        return frames[0]
+
+    first = non_empty[0]
+    is_datetime = all(isinstance(f.index, pd.DatetimeIndex) for f in non_empty)
+    day_numbers = [
+        to_day_numbers(f.index) if isinstance(f.index, pd.DatetimeIndex) else f.index.to_numpy(dtype=np.int64)
+        for f in non_empty
+    ]
+    first_day = min(int(days.min()) for days in day_numbers)
+    last_day = max(int(days.max()) for days in day_numbers)
+    dtype = np.result_type(*[f.dtype for f in non_empty])
+
+    values = np.zeros(last_day - first_day + 1, dtype=dtype)
+    for f, days in zip(non_empty, day_numbers):
+        values[days - first_day] += f.to_numpy(dtype=dtype)
+
+    calendar = np.arange(first_day, last_day + 1)
+    if is_datetime:
+        index = pd.Index(day_numbers_to_datetime(calendar), name='datetime')
+    else:
+        index = pd.Index(calendar, name='day')
+    return pd.Series(values, index=index, name=first.name)
+
+
+# --- Ragged Panels ---
+class RaggedPanel:
+    """
+    Series on a shared day calendar, each stored as one array covering only its
+    active range (first to last valid value) plus the offset of that range on
+    the calendar. Unlike a dense dates x symbols frame, the years before a late
+    listing take no memory and no work, and count() gives the number of series
+    active on each day, the right denominator for a share of the basket.
+
+    Args:
+        series_dict (dict): Series indexed either by datetime or by day number, as
+            for align_on_calendar. The calendar spans their indexes.
+        like (RaggedPanel): Optional. Places the series on this panel's calendar and
+            active ranges instead (cells without data are NaN), so both panels can
+            be combined element-wise with map().
+    """
+
+    def __init__(self, series_dict, like=None):
+        series_dict = {name: s for name, s in series_dict.items() if len(s)}
+        day_numbers = {
+            name: to_day_numbers(s.index) if isinstance(s.index, pd.DatetimeIndex) else s.index.to_numpy(dtype=np.int64)
+            for name, s in series_dict.items()
+        }
+        if like is not None:
+            self.names, self.starts = like.names, like.starts
+            self.first_day, self.n_days, self.is_datetime = like.first_day, like.n_days, like.is_datetime
+            lengths = [len(values) for values in like.values]
+        else:
+            self.names = list(series_dict)
+            self.is_datetime = all(isinstance(s.index, pd.DatetimeIndex) for s in series_dict.values())
+            self.first_day = min((int(days.min()) for days in day_numbers.values()), default=0)
+            last_day = max((int(days.max()) for days in day_numbers.values()), default=-1)
+            self.n_days = last_day - self.first_day + 1
+
+        self.values = []
+        starts = []
+        for i, name in enumerate(self.names):
+            s = series_dict.get(name)
+            dtype = s.dtype if s is not None and s.dtype.kind == 'f' else np.dtype(np.float64)
+            if s is None:
+                self.values.append(np.full(lengths[i] if like is not None else 0, np.nan, dtype=dtype))
+                starts.append(self.starts[i] if like is not None else 0)
+                continue
+            positions = day_numbers[name].astype(np.int64) - self.first_day
+            series_values = s.to_numpy(dtype=dtype)
+            if like is not None:
+                start, length = int(self.starts[i]), lengths[i]
+            else:
+                valid = np.flatnonzero(~np.isnan(series_values))
+                start = int(positions[valid[0]]) if len(valid) else 0
+                length = int(positions[valid[-1]]) - start + 1 if len(valid) else 0
+            values = np.full(length, np.nan, dtype=dtype)
+            inside = (positions >= start) & (positions < start + length)
+            values[positions[inside] - start] = series_values[inside]
+            self.values.append(values)
+            starts.append(start)
+        if like is None:
+            self.starts = np.array(starts, dtype=np.int64)
+
+    @property
+    def index(self):
+        """The calendar as a datetime index (or a day-number index for compact input)."""
+        calendar = np.arange(self.first_day, self.first_day + self.n_days)
+        if self.is_datetime:
+            return pd.Index(day_numbers_to_datetime(calendar), name='datetime')
+        return pd.Index(calendar, name='day')
+
+    @property
+    def nbytes(self):
+        """Memory used by the stored values."""
+        return sum(values.nbytes for values in self.values) + self.starts.nbytes
+
+    def _days(self, i):
+        """The calendar positions covered by the i-th series."""
+        return slice(int(self.starts[i]), int(self.starts[i]) + len(self.values[i]))
+
+    def align(self, series):
+        """
+        Places one more series (e.g. a benchmark) on the full calendar.
+
+        Returns:
+            np.ndarray: One value per calendar day, NaN where the series has no data.
+        """
+        dtype = series.dtype if series.dtype.kind == 'f' else np.dtype(np.float64)
+        aligned = np.full(self.n_days, np.nan, dtype=dtype)
+        days = to_day_numbers(series.index) if isinstance(series.index, pd.DatetimeIndex) else series.index.to_numpy(dtype=np.int64)
+        positions = days.astype(np.int64) - self.first_day
+        inside = (positions >= 0) & (positions < self.n_days)
+        aligned[positions[inside]] = series.to_numpy(dtype=dtype)[inside]
+        return aligned
+
+    def flatten(self):
+        """
+        Returns every stored cell as (calendar positions, values), one series after
+        the other, e.g. for per-day totals with np.bincount. Panels built with
+        like= flatten in the same order, so their values line up cell by cell.
+        """
+        if not self.values:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        positions = np.concatenate([np.arange(self._days(i).start, self._days(i).stop) for i in range(len(self.values))])
+        return positions, np.concatenate(self.values)
+
+    def map(self, func, *others):
+        """
+        Applies a kernel to every series over its active range only.
+
+        Args:
+            func (callable): Called as func(values, *other_values, days) per series, where
+                other_values are the same series of the other panels and days is the slice
+                of the calendar they cover (to index arrays returned by align()). Returns
+                an array of the same length; NaN marks an inactive cell.
+            *others (RaggedPanel): Panels built with like=self.
+
+        Returns:
+            RaggedPanel: The results, on this panel's calendar and active ranges.
+        """
+        result = object.__new__(RaggedPanel)
+        result.names, result.starts = self.names, self.starts
+        result.first_day, result.n_days, result.is_datetime = self.first_day, self.n_days, self.is_datetime
+        result.values = [
+            np.asarray(func(values, *[other.values[i] for other in others], self._days(i)))
+            for i, values in enumerate(self.values)
+        ]
+        return result
+
+    def sum(self):
+        """
+        Returns the per-day sum over the series, NaN cells counting as 0 (boolean
+        series give counts).
+        """
+        dtype = np.result_type(*[values.dtype for values in self.values]) if self.values else np.dtype(np.float64)
+        if dtype.kind == 'b':
+            dtype = np.dtype(np.int64)
+        total = np.zeros(self.n_days, dtype=dtype)
+        for i, values in enumerate(self.values):
+            if values.dtype.kind == 'f':
+                values = np.where(np.isnan(values), 0, values)
+            total[self._days(i)] += values.astype(dtype, copy=False)
+        return pd.Series(total, index=self.index)
+
+    def count(self):
+        """Returns the number of series with a valid (non-NaN) value on each day."""
+        counts = np.zeros(self.n_days, dtype=np.int64)
+        for i, values in enumerate(self.values):
+            counts[self._days(i)] += ~np.isnan(values) if values.dtype.kind == 'f' else 1
+        return pd.Series(counts, index=self.index)
+
+    def to_frame(self):
+        """Returns the dense DataFrame (one column per series), as align_on_calendar would."""
+        dtype = np.result_type(*[values.dtype for values in self.values]) if self.values else np.dtype(np.float64)
+        if dtype.kind != 'f':
+            dtype = np.dtype(np.float64)
+        frame = np.full((self.n_days, len(self.names)), np.nan, dtype=dtype)
+        for i, values in enumerate(self.values):
+            frame[self._days(i), i] = values
+        return pd.DataFrame(frame, index=self.index, columns=self.names)
@@ -0,0 +1,62 @@
+from index_builder import update_synthetic_indices
+from relative_strength import update_relative_strength, RS_STATE_FRAME
+from regime_breadth import update_regime_breadth, REGIMES_FRAME
+from volume_breadth import update_volume_breadth, COUNTS_FRAME
+from alerts import evaluate_alerts, ALERT_STATE_FRAME
+from config import SYNTHETIC_INDICES
+from derived_store import connect_derived, delete_frames
+
+# --- Post-Ingest Tasks ---
+# Run in order by the updaters after new bars have been written to the DB.
+# Every task takes the DB connection and the set of tables that received new
+# bars (None = unknown, treat everything as changed).
+POST_INGEST_TASKS = [
+    update_synthetic_indices,
+    update_relative_strength,
+    update_regime_breadth,
+    update_volume_breadth,
+    evaluate_alerts,
+]
+# The stored state the incremental tasks extend forward in time. Without it a
+# task rebuilds from the full history (synthetic indices detect replaced
+# constituent history themselves, see index_builder.update_synthetic_index).
+INCREMENTAL_STATE_FRAMES = (RS_STATE_FRAME, REGIMES_FRAME, COUNTS_FRAME, ALERT_STATE_FRAME)
+
+
+def run_post_ingest_tasks(conn, changed_tables=None, rebuild=False):
+    """
+    Runs every post-ingest task against an open DB connection. A failing task
+    is reported and skipped so that the remaining tasks still run.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the market data DB.
+        changed_tables (set, optional): Tables that received new bars. When given,
+            tasks only recompute what depends on them, and nothing runs if it is empty.
+        rebuild (bool): Clears the incremental tasks' stored state first and treats
+            every table as changed, so results cover history added before existing
+            bars. The alert state is rebuilt without firing.
+    """
+    if rebuild:
+        print("\n--- Clearing the incremental post-ingest state for a full rebuild. ---")
+        derived_conn = connect_derived()
+        try:
+            delete_frames(derived_conn, INCREMENTAL_STATE_FRAMES)
+        finally:
+            derived_conn.close()
+        changed_tables = None
+    if changed_tables is not None:
+        changed_tables = set(changed_tables)
+        if not changed_tables:
+            print("\n--- No tables changed; skipping post-ingest tasks. ---")
+            return
+        # Synthetic indices rebuilt from changed constituents count as changed too
+        changed_tables |= {
+            name for name, spec in SYNTHETIC_INDICES.items() if changed_tables & set(spec['basket'].values())
+        }
+
+    for task in POST_INGEST_TASKS:
+        try:
+            print(f"\n--- Running post-ingest task: {task.__name__} ---")
+            task(conn, changed_tables)
+        except Exception as e:
+            print(f"Post-ingest task {task.__name__} failed: {e}")
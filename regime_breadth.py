@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from baskets import all_basket_symbols
+from panel import align_on_calendar
+from intermediates import get_intermediate
+from index_builder import read_basket
+from derived_store import connect_derived, save_frame, load_frame
+
+# --- Configuration ---
+REGIME_LENGTHS = (21, 50, 200)  # EMA fast, SMA medium, SMA slow, as in calculate_traffic_light
+# Bars of each asset's history recomputed before the first new day on an incremental
+# update: enough for the slow SMA plus ~20 EMA lengths, after which the EMA seed has no effect.
+REGIME_WARMUP_BARS = REGIME_LENGTHS[2] + 20 * REGIME_LENGTHS[0]
+REGIMES_FRAME = 'regime_breadth:regimes'
+REGIME_LABELS = {1: 'green', 0: 'yellow', -1: 'red'}
+
+
+def calculate_asset_regimes(data_dict, len_fast=21, len_medium=50, len_slow=200):
+    """
+    Classifies every asset's Traffic Light regime on every date, like
+    calculate_traffic_light does for TOTAL: green (1) when close > EMA fast >
+    SMA medium > SMA slow, red (-1) when close < SMA slow, yellow (0) otherwise.
+
+    The moving averages come from the shared per-asset intermediates (each on the
+    asset's own bars); the classification itself is one vectorized pass over the
+    aligned panel.
+
+    Returns:
+        pd.DataFrame: Regimes (dates x symbols), NaN where an asset has no bar or
+            not enough history for the slow SMA.
+    """
+    def panel(name, length=None):
+        if name == 'close':
+            series = {symbol: df['close'] for symbol, df in data_dict.items()}
+        else:
+            series = {symbol: get_intermediate(df, name, length) for symbol, df in data_dict.items()}
+        return align_on_calendar(series)
+
+    close = panel('close')
+    columns, index = close.columns, close.index
+    close = close.to_numpy(dtype=np.float64)
+    ema_fast = panel('ema', len_fast).reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+    sma_medium = panel('sma', len_medium).reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+    sma_slow = panel('sma', len_slow).reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+
+    classified = np.isfinite(close) & np.isfinite(ema_fast) & np.isfinite(sma_medium) & np.isfinite(sma_slow)
+    with np.errstate(invalid='ignore'):
+        green = (close > ema_fast) & (ema_fast > sma_medium) & (sma_medium > sma_slow)
+        red = close < sma_slow
+    regimes = np.where(green, 1.0, np.where(red, -1.0, 0.0))
+    return pd.DataFrame(np.where(classified, regimes, np.nan), index=index, columns=columns)
+
+
+def calculate_regime_shares(regimes):
+    """
+    Share of the classified assets in each regime per date.
+
+    Returns:
+        pd.DataFrame: 'green', 'yellow' and 'red' (% of classified assets) and
+            'classified' (number of assets with a regime), indexed by date.
+    """
+    values = regimes.to_numpy(dtype=np.float64)
+    classified = np.isfinite(values).sum(axis=1)
+    shares = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for regime, label in REGIME_LABELS.items():
+            shares[label] = (values == regime).sum(axis=1) / classified * 100
+    shares_df = pd.DataFrame(shares, index=regimes.index)
+    shares_df['classified'] = classified
+    return shares_df[shares_df['classified'] > 0]
+
+
+def summarize_current_regimes(regimes):
+    """
+    Returns each asset's latest regime and how many consecutive bars it has been
+    in that regime, vectorized over the panel (no per-asset loop).
+
+    Returns:
+        pd.DataFrame: 'regime' (green/yellow/red), 'as_of' (date of the latest
+            classified bar) and 'days_in_regime', indexed by symbol.
+    """
+    values = regimes.to_numpy(dtype=np.float64)
+    valid = np.isfinite(values)
+    has_regime = valid.any(axis=0)
+    # Row of each asset's last classified bar
+    last_rows = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+    columns = np.arange(values.shape[1])
+    latest = values[last_rows, columns]
+
+    # Bars up to and including the last one that differ from it (or are missing) end the run
+    rows = np.arange(len(values))[:, None]
+    breaks = (values != latest) & (rows <= last_rows)
+    last_break = np.where(breaks.any(axis=0), len(values) - 1 - np.argmax(breaks[::-1], axis=0), -1)
+    days_in_regime = last_rows - last_break
+
+    summary = pd.DataFrame({
+        'regime': pd.Series(latest).map(REGIME_LABELS).to_numpy(),
+        'as_of': regimes.index[last_rows],
+        'days_in_regime': days_in_regime,
+    }, index=regimes.columns)
+    return summary[has_regime].sort_values('days_in_regime', ascending=False)
+
+
+def _warmup_start(conn, symbols, last_date):
+    """
+    The day to re-read from so every symbol has REGIME_WARMUP_BARS of its own bars
+    before last_date (counted in bars, so gaps do not shorten the warm-up), or
+    all of them when it has fewer.
+    """
+    last_date_text = last_date.strftime('%Y-%m-%d %H:%M:%S')
+    existing_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    start = last_date
+    for symbol in symbols:
+        if symbol not in existing_tables:
+            continue
+        row = conn.execute(
+            f'SELECT datetime FROM "{symbol}" WHERE datetime < ? ORDER BY datetime DESC LIMIT 1 OFFSET ?',
+            (last_date_text, REGIME_WARMUP_BARS - 1)
+        ).fetchone()
+        if row is None:
+            row = conn.execute(f'SELECT MIN(datetime) FROM "{symbol}" WHERE datetime < ?', (last_date_text,)).fetchone()
+        if row[0] is not None:
+            start = min(start, pd.Timestamp(row[0]).normalize())
+    return start
+
+
+def update_regime_breadth(conn, changed_tables=None):
+    """
+    Post-ingest task: brings the stored per-asset regimes up to date.
+
+    The regimes are recomputed from the earliest last classified day of a
+    changed symbol (so bars that arrive late for one symbol are picked up too),
+    re-reading REGIME_WARMUP_BARS of each symbol's bars before it, and every row from that day onwards
+    is replaced. A full rebuild runs when nothing is stored yet or the basket
+    symbols have changed. Skipped when none of the basket symbols changed.
+    """
+    symbols = all_basket_symbols()
+    if changed_tables is not None and not changed_tables & set(symbols):
+        print("No basket symbols changed; skipping regime breadth.")
+        return
+    derived_conn = connect_derived()
+    try:
+        stored = load_frame(derived_conn, REGIMES_FRAME)
+        data = None
+        if stored is not None and not stored.empty:
+            changed = [symbol for symbol in stored.columns if changed_tables is None or symbol in changed_tables]
+            # Symbols without a classified day yet are covered by the warm-up window
+            last_classified = [stored[symbol].last_valid_index() for symbol in changed]
+            last_date = min([day for day in last_classified if day is not None] + [stored.index[-1]])
+            data = read_basket(conn, symbols, since=_warmup_start(conn, symbols, last_date))
+            if set(data) - set(stored.columns):
+                stored, data = None, None  # New symbols need their full history
+
+        if stored is None or stored.empty or data is None:
+            data = read_basket(conn, symbols)
+            if not data:
+                print("No basket data found; skipping regime breadth.")
+                return
+            regimes = calculate_asset_regimes(data, *REGIME_LENGTHS)
+            print(f"Built regimes for {regimes.shape[1]} assets over {len(regimes)} days.")
+        else:
+            tail = calculate_asset_regimes(data, *REGIME_LENGTHS)
+            tail = tail[tail.index >= last_date].reindex(columns=stored.columns)
+            regimes = pd.concat([stored[stored.index < last_date], tail])
+            print(f"Updated regimes for {len(tail)} day(s) from {last_date.strftime('%Y-%m-%d')}.")
+
+        save_frame(derived_conn, REGIMES_FRAME, regimes.astype(np.float32))
+    finally:
+        derived_conn.close()
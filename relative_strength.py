@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+from config import RS_HORIZONS, RS_BENCHMARKS
+from baskets import all_basket_symbols
+from panel import align_on_calendar
+from index_builder import read_basket, tail_start
+from derived_store import connect_derived, save_frame, load_frame
+
+# --- Configuration ---
+RS_CHANGE_PERIOD = 7  # Days over which rank changes (movers) are measured
+RS_FRAME_NAMES = ('ranks', 'scores', 'rank_changes', 'leaderboard')
+RS_STATE_FRAME = 'relative_strength:last_bars'  # {symbol: last bar ranked}, to extend the stored frames
+
+
+def _row_positions(values):
+    """
+    0-based position of every value in its ascending row order, from one
+    row-wise argsort of the whole panel. Ties get the average of their
+    positions (pandas' 'average' method); NaNs sort last.
+    """
+    valid = np.isfinite(values)
+    order = np.argsort(np.where(valid, values, np.inf), axis=1)
+    ordered = np.take_along_axis(np.where(valid, values, np.inf), order, axis=1)
+    index = np.broadcast_to(np.arange(values.shape[1]), values.shape)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    first = np.maximum.accumulate(np.where(starts, index, 0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, index, values.shape[1] - 1)[:, ::-1], axis=1)[:, ::-1]
+    positions = np.empty(values.shape)
+    np.put_along_axis(positions, order, (first + last) / 2, axis=1)
+    return positions
+
+
+def _row_percentiles(values):
+    """
+    Cross-sectional percentile (0 = weakest, 1 = strongest) of every value in
+    its row; tied values share their average percentile. NaNs stay NaN.
+    """
+    valid = np.isfinite(values)
+    n_valid = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percentiles = np.where(n_valid > 1, _row_positions(values) / (n_valid - 1), 0.5)
+    return np.where(valid, percentiles, np.nan)
+
+
+def _row_ranks(scores):
+    """Rank of every score within its row (1 = highest score, ties averaged). NaNs stay NaN."""
+    valid = np.isfinite(scores)
+    return np.where(valid, _row_positions(-scores) + 1, np.nan)
+
+
+def calculate_relative_strength(data_dict, horizons=RS_HORIZONS, benchmarks=RS_BENCHMARKS, change_period=RS_CHANGE_PERIOD,
+                                previous=None, since=None):
+    """
+    Ranks every asset on every date by multi-horizon relative strength.
+
+    For each horizon, the cross-sectional percentile of every asset's return is
+    taken with one row-wise argsort over the aligned (date x symbol) panel. The
+    composite score is the mean percentile across horizons; assets without a
+    full history for the longest horizon are not ranked. Subtracting a
+    benchmark's return does not change a cross-sectional ranking, so the
+    benchmarks (BTCUSD, ETHUSD) are ranked within the same cross-section and
+    their excess returns are reported on the leaderboard.
+
+    Args:
+        data_dict (dict): Asset DataFrames to rank, including the benchmarks.
+        horizons (tuple): Return horizons in days.
+        benchmarks (tuple): Benchmark symbols for the leaderboard's excess returns.
+        change_period (int): Days over which rank changes are measured.
+        previous (dict, optional): Results of an earlier run to extend. Only the days
+            from `since` on are then ranked from data_dict, which must hold every asset's
+            bars from its last bar at least max(horizons) days before `since`.
+        since (pd.Timestamp, optional): The first day to rank when previous is given.
+
+    Returns:
+        dict: 'scores' and 'ranks' (date x symbol), 'rank_changes' (date x symbol,
+            positive = climbed) and 'leaderboard' (the latest date, one row per symbol).
+    """
+    closes = align_on_calendar({symbol: df['close'] for symbol, df in data_dict.items()})
+    # Each asset keeps its last close within its own active range, like pct_change's padding
+    padded = closes.ffill().where(closes.bfill().notna()).to_numpy(dtype=np.float64)
+
+    horizon_returns, horizon_percentiles = {}, []
+    for horizon in horizons:
+        returns = np.full_like(padded, np.nan)
+        returns[horizon:] = (padded[horizon:] / padded[:-horizon] - 1) * 100
+        returns[~np.isfinite(closes.to_numpy(dtype=np.float64))] = np.nan
+        horizon_returns[horizon] = returns
+        horizon_percentiles.append(_row_percentiles(returns))
+
+    stacked = np.stack(horizon_percentiles)
+    scores = np.where(np.isfinite(stacked).all(axis=0), stacked.mean(axis=0) * 100, np.nan)
+    ranks = _row_ranks(scores)
+
+    scores_df = pd.DataFrame(scores, index=closes.index, columns=closes.columns).dropna(how='all')
+    ranks_df = pd.DataFrame(ranks, index=closes.index, columns=closes.columns).reindex(scores_df.index)
+    if previous is not None:
+        # Earlier days keep their stored rows; assets without new bars keep their columns
+        columns = previous['scores'].columns.append(closes.columns.difference(previous['scores'].columns, sort=False))
+        scores_df = pd.concat([previous['scores'][previous['scores'].index < since], scores_df[scores_df.index >= since]])
+        ranks_df = pd.concat([previous['ranks'][previous['ranks'].index < since], ranks_df[ranks_df.index >= since]])
+        scores_df, ranks_df = scores_df.reindex(columns=columns), ranks_df.reindex(columns=columns)
+    rank_changes_df = -ranks_df.diff(periods=change_period)
+
+    # --- Leaderboard for the latest date ---
+    if scores_df.empty:
+        leaderboard = pd.DataFrame()
+    else:
+        last = closes.index.get_loc(scores_df.index[-1])
+        leaderboard = pd.DataFrame({
+            'rank': ranks_df.iloc[-1], 'score': scores_df.iloc[-1], f'rank_change_{change_period}d': rank_changes_df.iloc[-1]
+        })
+        for horizon, returns in horizon_returns.items():
+            leaderboard[f'return_{horizon}d'] = returns[last]
+            for benchmark in benchmarks:
+                if benchmark in closes.columns:
+                    benchmark_return = returns[last, closes.columns.get_loc(benchmark)]
+                    leaderboard[f'vs_{benchmark}_{horizon}d'] = returns[last] - benchmark_return
+        leaderboard = leaderboard.dropna(subset=['rank']).sort_values('rank')
+        leaderboard.index.name = 'symbol'
+
+    return {'scores': scores_df, 'ranks': ranks_df, 'rank_changes': rank_changes_df, 'leaderboard': leaderboard}
+
+
+def top_bottom_movers(rank_changes, n=10, as_of=None):
+    """
+    Returns the assets whose rank improved and worsened the most on a date
+    (the latest date by default).
+
+    Returns:
+        tuple: (top movers, bottom movers) as Series of rank changes.
+    """
+    row = rank_changes.iloc[-1] if as_of is None else rank_changes.loc[as_of]
+    row = row.dropna()
+    return row.nlargest(n), row.nsmallest(n)
+
+
+def update_relative_strength(conn, changed_tables=None):
+    """
+    Post-ingest task: ranks every basket asset and the benchmarks and stores
+    the results in the derived DB, so the leaderboard page only has to read them.
+
+    The stored frames are extended from the earliest last ranked bar of a
+    changed symbol onwards, re-reading the longest horizon of bars before it
+    (see index_builder.tail_start). The full history is ranked when nothing is
+    stored yet or a new symbol appears. Skipped when none of the ranked symbols changed.
+    """
+    symbols = list(dict.fromkeys([*RS_BENCHMARKS, *all_basket_symbols()]))
+    if changed_tables is not None and not changed_tables & set(symbols):
+        print("No ranked symbols changed; skipping relative strength.")
+        return
+    derived_conn = connect_derived()
+    try:
+        previous = {name: load_frame(derived_conn, f'relative_strength:{name}') for name in RS_FRAME_NAMES}
+        last_bars = load_frame(derived_conn, RS_STATE_FRAME)
+        data = None
+        if last_bars is not None and previous['scores'] is not None and not previous['scores'].empty:
+            # Days from the earliest last bar of a changed symbol may have gained bars
+            changed = [symbol for symbol in last_bars if changed_tables is None or symbol in changed_tables]
+            since = min((last_bars[symbol] for symbol in changed), default=previous['scores'].index[-1])
+            data = read_basket(conn, symbols, since=tail_start(conn, symbols, since - pd.Timedelta(days=max(RS_HORIZONS) - 1)))
+            if set(data) - set(last_bars):
+                data = None  # New symbols need their full history
+
+        if data is None:
+            data = read_basket(conn, symbols)
+            if not data:
+                print("No basket data found; skipping relative strength.")
+                return
+            results, last_bars = calculate_relative_strength(data), {}
+            print(f"Ranked {len(data)} assets over {len(results['ranks'])} days.")
+        else:
+            results = calculate_relative_strength(data, previous=previous, since=since)
+            last_bars = dict(last_bars)
+            print(f"Ranked {len(data)} assets from {since.strftime('%Y-%m-%d')}.")
+        last_bars.update({symbol: df.index[-1] for symbol, df in data.items()})
+
+        for name in RS_FRAME_NAMES:
+            save_frame(derived_conn, f'relative_strength:{name}', results[name])
+        save_frame(derived_conn, RS_STATE_FRAME, last_bars)
+    finally:
+        derived_conn.close()
@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+from panel import align_on_calendar
+from statistics import NormalDist
+from rolling import RollingWindow, SortedWindow, LaggedValue, EMA
+
+# --- Replay Configuration ---
+ASI_UPPER_THRESHOLD = 75
+ASI_LOWER_THRESHOLD = 25
+REGIME_NAMES = {1: 'green', 0: 'yellow', -1: 'red'}
+
+
+# A NaN close means the asset has no bar that day: its lags and windows only
+# step on its own bars, like the per-asset intermediates the indicators use.
+
+
+class OfficialASIReplay:
+    """
+    Point-in-time state for calculate_official_altcoin_season_index on one basket.
+    Each step consumes one day of closes/volumes and returns that day's index value.
+    """
+
+    def __init__(self, n_assets, lookback_period=90, vol_ma_period=20, normalization_window=365, smoothing_period=14,
+                 normalization='zscore'):
+        self.n_assets = n_assets
+        self.normalization = normalization
+        self._asset_lag = LaggedValue(lookback_period, n_assets)
+        self._benchmark_lag = LaggedValue(lookback_period)
+        self._btcd_lag = LaggedValue(lookback_period)
+        self._volume_ma = RollingWindow(vol_ma_period, n_assets)
+        # The z-scores and the smoothing roll over the rows where every component exists
+        self._components = RollingWindow(normalization_window, 3)
+        self._sorted_components = [SortedWindow(normalization_window) for _ in range(3)]
+        self._smoothing = RollingWindow(smoothing_period)
+
+    def step(self, closes, volumes, benchmark_close, btcd_close):
+        present = np.isfinite(closes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            asset_roc = np.where(present, closes / self._asset_lag.push(closes, present) - 1, np.nan)
+            benchmark_roc = benchmark_close / _push_own(self._benchmark_lag, benchmark_close) - 1
+            btcd_momentum = (btcd_close / _push_own(self._btcd_lag, btcd_close) - 1) * 100
+        self._volume_ma.push(volumes, present)
+
+        with np.errstate(invalid='ignore'):
+            is_outperforming = asset_roc > benchmark_roc
+        # Share of the assets with a ROC today, like the dashboard's per-day active count
+        active = np.isfinite(asset_roc) & np.isfinite(benchmark_roc)
+        price_breadth = is_outperforming.sum() / active.sum() * 100 if active.any() else np.nan
+        volume_breadth = np.nansum(np.where(is_outperforming, self._volume_ma.mean(), 0.0))
+
+        row = np.array([price_breadth, volume_breadth, btcd_momentum])
+        if not np.isfinite(row).all():
+            return np.nan
+
+        zscores = self._normalize(row)
+        final_zscore = zscores[0] * 0.50 + zscores[1] * 0.25 - zscores[2] * 0.25
+        self._smoothing.push(100 / (1 + np.exp(-final_zscore)))
+        return float(self._smoothing.mean()[0])
+
+    def _normalize(self, row):
+        """Scores today's components against their trailing windows, like _normalize_component in indicators.py."""
+        if self.normalization == 'zscore':
+            self._components.push(row)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return (row - self._components.mean()) / self._components.std()
+        for window, value in zip(self._sorted_components, row):
+            window.push(value)
+        if self.normalization == 'percentile':
+            ranks = [window.percentile_rank(value) for window, value in zip(self._sorted_components, row)]
+            return np.array([NormalDist().inv_cdf(rank) if np.isfinite(rank) else np.nan for rank in ranks])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.array([
+                (value - window.median()) / (1.4826 * np.float64(window.mad()))
+                for window, value in zip(self._sorted_components, row)
+            ])
+
+
+class TrafficLightReplay:
+    """Point-in-time state for calculate_traffic_light. Returns 1 (green), 0 (yellow), -1 (red) or NaN."""
+
+    def __init__(self, len_fast=21, len_medium=50, len_slow=200):
+        self._ema_fast = EMA(len_fast)
+        self._sma_medium = RollingWindow(len_medium)
+        self._sma_slow = RollingWindow(len_slow)
+
+    def step(self, close):
+        ema_fast = self._ema_fast.push(close)[0]
+        if not np.isfinite(close):
+            return np.nan
+        self._sma_medium.push(close)
+        self._sma_slow.push(close)
+        sma_medium, sma_slow = self._sma_medium.mean()[0], self._sma_slow.mean()[0]
+        if not np.isfinite([ema_fast, sma_medium, sma_slow]).all():
+            return np.nan
+        if close > ema_fast > sma_medium > sma_slow:
+            return 1
+        if close < sma_slow:
+            return -1
+        return 0
+
+
+class MoVolReplay:
+    """
+    Point-in-time state for the MoVol map (calculate_market_character) on one
+    basket. Each step returns the cross-sectional medians that divide the map.
+    Like the indicator, every asset is placed by its latest bar, so an asset
+    without a bar today keeps its last momentum and volatility.
+    """
+
+    def __init__(self, n_assets, lookback_period=30):
+        self.lookback_period = lookback_period
+        self._lag = LaggedValue(lookback_period, n_assets)
+        self._previous = LaggedValue(1, n_assets)
+        self._returns = RollingWindow(lookback_period, n_assets)
+        self._bars = np.zeros(n_assets, dtype=np.int64)
+        self._momentum = np.full(n_assets, np.nan)
+        self._volatility = np.full(n_assets, np.nan)
+
+    def step(self, closes):
+        present = np.isfinite(closes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            momentum = (closes / self._lag.push(closes, present) - 1) * 100
+            returns = closes / self._previous.push(closes, present) - 1
+        self._returns.push(returns, present)
+        self._bars += present
+        self._momentum = np.where(present, momentum, self._momentum)
+        self._volatility = np.where(present, self._returns.std() * np.sqrt(365), self._volatility)
+
+        momentum, volatility = self._momentum, self._volatility
+        valid = (self._bars > self.lookback_period) & np.isfinite(momentum) & np.isfinite(volatility)
+        if not valid.any():
+            return np.nan, np.nan
+        return float(np.median(momentum[valid])), float(np.median(volatility[valid]))
+
+
+class MarketFlowReplay:
+    """
+    Point-in-time state for calculate_stablecoin_vs_total_roc. Each step returns
+    (roc_total, roc_stable_inv) for the day.
+    """
+
+    def __init__(self, roc_len=30):
+        self._lag = LaggedValue(roc_len, 3)
+
+    def step(self, total_close, usdt_d_close, usdc_d_close):
+        closes = np.array([total_close, usdt_d_close, usdc_d_close], dtype=np.float64)
+        present = np.isfinite(closes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            roc = np.where(present, (closes / self._lag.push(closes, present) - 1) * 100, np.nan)
+        return float(roc[0]), float(-(roc[1] + roc[2]) / 2)
+
+
+class AssetsAboveMAReplay:
+    """
+    Point-in-time state for calculate_assets_above_ma on one basket. The share is
+    taken over the assets that have a full SMA window on the day.
+    """
+
+    def __init__(self, n_assets, ma_length=200):
+        self._sma = RollingWindow(ma_length, n_assets)
+
+    def step(self, closes):
+        self._sma.push(closes, np.isfinite(closes))
+        sma = self._sma.mean()
+        has_sma = np.isfinite(sma) & np.isfinite(closes)
+        if not has_sma.any():
+            return np.nan
+        return float((closes[has_sma] > sma[has_sma]).sum() / has_sma.sum() * 100)
+
+
+def _push_own(lagged_value, value):
+    """Steps a single-series LaggedValue on its own bars and returns the lagged value."""
+    return lagged_value.push(value, np.atleast_1d(np.isfinite(value)))[0]
+
+
+def _crossings(series, threshold):
+    """Returns the dates on which a series crosses above and below a threshold."""
+    previous = series.shift(1)
+    crossed_above = series[(previous <= threshold) & (series > threshold)].index
+    crossed_below = series[(previous >= threshold) & (series < threshold)].index
+    return crossed_above, crossed_below
+
+
+def replay_signals(macro_data, baskets, start=None, normalization='zscore'):
+    """
+    Steps through history one day at a time and records what the dashboard
+    indicators would have shown on each day using only the data available then.
+
+    Every indicator keeps incremental state (rolling sums, EMAs, lagged closes),
+    so a full replay costs O(days x assets) rather than recomputing the whole
+    history for every day.
+
+    Args:
+        macro_data (dict): The MACRO_SYMBOLS DataFrames (needs TOTAL, BTCUSD, BTC_D).
+        baskets (dict): Basket name -> dict of asset DataFrames (with 'close' and 'volume').
+        start (optional): First date to emit. Earlier days only warm the state up.
+        normalization (str): The Official ASI normalization mode ('zscore', 'percentile' or 'robust').
+
+    Returns:
+        tuple: (series, events) where series is a DataFrame indexed by date with one
+            column per replayed output, and events is a DataFrame of signal
+            events with 'date', 'signal', 'basket' and 'value' columns.
+    """
+    all_assets = {}
+    for basket_data in baskets.values():
+        all_assets.update(basket_data)
+
+    closes = align_on_calendar({
+        **{symbol: df['close'] for symbol, df in all_assets.items()},
+        **{f'macro:{symbol}': macro_data[symbol]['close'] for symbol in ('TOTAL', 'BTCUSD', 'BTC_D')}
+    })
+    volumes = align_on_calendar({symbol: df['volume'] for symbol, df in all_assets.items()}).reindex(closes.index)
+    close_values = closes.to_numpy(dtype=np.float64)
+    volume_values = volumes.to_numpy(dtype=np.float64)
+    macro_positions = {symbol: closes.columns.get_loc(f'macro:{symbol}') for symbol in ('TOTAL', 'BTCUSD', 'BTC_D')}
+
+    states = {}
+    for name, basket_data in baskets.items():
+        altcoins = [symbol for symbol in basket_data if 'BTC' not in symbol]
+        states[name] = {
+            'asi_positions': [closes.columns.get_loc(symbol) for symbol in altcoins],
+            'movol_positions': [closes.columns.get_loc(symbol) for symbol in basket_data],
+            'asi': OfficialASIReplay(len(altcoins), normalization=normalization),
+            'movol': MoVolReplay(len(basket_data)),
+        }
+    traffic_light = TrafficLightReplay()
+
+    records = []
+    for t in range(len(closes)):
+        row = close_values[t]
+        record = {'traffic_light': traffic_light.step(row[macro_positions['TOTAL']])}
+        for name, state in states.items():
+            asi_positions = state['asi_positions']
+            record[f'asi:{name}'] = state['asi'].step(
+                row[asi_positions], volume_values[t, asi_positions],
+                row[macro_positions['BTCUSD']], row[macro_positions['BTC_D']]
+            )
+            median_momentum, median_volatility = state['movol'].step(row[state['movol_positions']])
+            record[f'movol_median_momentum:{name}'] = median_momentum
+            record[f'movol_median_volatility:{name}'] = median_volatility
+        records.append(record)
+
+    series = pd.DataFrame(records, index=closes.index)
+    if start is not None:
+        series = series[series.index >= start]
+
+    # --- Derive signal events from the point-in-time series ---
+    events = []
+    for name in baskets:
+        asi = series[f'asi:{name}'].dropna()
+        for threshold in (ASI_UPPER_THRESHOLD, ASI_LOWER_THRESHOLD):
+            crossed_above, crossed_below = _crossings(asi, threshold)
+            events += [(date, f'asi_cross_above_{threshold}', name, asi[date]) for date in crossed_above]
+            events += [(date, f'asi_cross_below_{threshold}', name, asi[date]) for date in crossed_below]
+
+    regime = series['traffic_light'].dropna()
+    changes = regime[regime != regime.shift(1)].iloc[1:]
+    events += [(date, f'traffic_light_{REGIME_NAMES[int(value)]}', 'TOTAL', value) for date, value in changes.items()]
+
+    events = pd.DataFrame(events, columns=['date', 'signal', 'basket', 'value']).sort_values('date', kind='stable')
+    return series, events.reset_index(drop=True)
@@ -0,0 +1,329 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# --- Incremental Rolling State ---
+# Streaming counterparts of the pandas rolling/ewm calls used in indicators.py.
+# Each object is fed one row (a scalar or one value per asset) per day and
+# returns the value the full-history computation would have on that day,
+# using only the rows seen so far.
+
+
+class RollingWindow:
+    """
+    A fixed-length window over a stream of rows with O(1) running mean and
+    standard deviation per column. Like rolling(window=n), results are NaN
+    until the window holds n valid values. Each column keeps its own position,
+    so a column only steps on the rows it is pushed (e.g. an asset's own bars).
+    """
+
+    def __init__(self, window, width=1):
+        self.window = window
+        self._values = np.full((window, width), np.nan)
+        self._columns = np.arange(width)
+        self._position = np.zeros(width, dtype=np.int64)
+        self._steps = 0
+        self._sum = np.zeros(width)
+        self._sum_sq = np.zeros(width)
+        self._count = np.zeros(width, dtype=np.int64)
+
+    def push(self, row, where=None):
+        """
+        Adds a row (dropping the one from `window` steps ago). With `where`, only
+        the columns where it is True step; the others keep their window as is.
+        """
+        row = np.asarray(row, dtype=np.float64).reshape(-1)
+        columns = self._columns if where is None else np.flatnonzero(where)
+        positions = self._position[columns]
+        old, new = self._values[positions, columns], row[columns]
+        old_valid, new_valid = np.isfinite(old), np.isfinite(new)
+        old_clean, new_clean = np.where(old_valid, old, 0.0), np.where(new_valid, new, 0.0)
+
+        self._sum[columns] += new_clean - old_clean
+        self._sum_sq[columns] += new_clean ** 2 - old_clean ** 2
+        self._count[columns] += new_valid.astype(np.int64) - old_valid.astype(np.int64)
+        self._values[positions, columns] = new
+        self._position[columns] = (positions + 1) % self.window
+        self._steps += 1
+
+        # Re-derive the running sums from the buffer once per window to stop float drift
+        if self._steps % self.window == 0:
+            valid = np.isfinite(self._values)
+            clean = np.where(valid, self._values, 0.0)
+            self._sum = clean.sum(axis=0)
+            self._sum_sq = (clean ** 2).sum(axis=0)
+            self._count = valid.sum(axis=0)
+
+    @property
+    def is_full(self):
+        """Per column: whether the window holds `window` valid values."""
+        return self._count == self.window
+
+    def oldest(self):
+        """The row that will be dropped next, i.e. each column's value from `window - 1` of its steps ago."""
+        return self._values[self._position, self._columns]
+
+    def values(self):
+        """The rows in the window, oldest first in each column."""
+        order = (self._position + np.arange(self.window)[:, None]) % self.window
+        return self._values[order, self._columns]
+
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.is_full, self._sum / self.window, np.nan)
+
+    def std(self, ddof=1):
+        n = self.window
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (self._sum_sq - self._sum ** 2 / n) / (n - ddof)
+        return np.where(self.is_full, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+
+class LaggedValue:
+    """Returns, for each column, the last valid value seen `lag` steps ago (padded like pct_change)."""
+
+    def __init__(self, lag, width=1):
+        self._window = RollingWindow(lag + 1, width)
+        self._padded = np.full(width, np.nan)
+
+    @property
+    def current(self):
+        """Each column's latest valid value, i.e. today's padded value."""
+        return self._padded.copy()
+
+    def push(self, row, where=None):
+        """
+        Adds today's row and returns the padded value from `lag` steps ago. With
+        `where`, only those columns step, so lags count each column's own rows.
+        """
+        row = np.asarray(row, dtype=np.float64).reshape(-1)
+        stepped = np.isfinite(row) if where is None else np.isfinite(row) & where
+        self._padded = np.where(stepped, row, self._padded)
+        self._window.push(self._padded, where)
+        return self._window.oldest()
+
+
+class EMA:
+    """
+    Streaming EMA matching pandas_ta's ema: each column is seeded with the SMA of
+    its first `length` values and then updated with alpha = 2 / (length + 1).
+    """
+
+    def __init__(self, length, width=1):
+        self.length = length
+        self._alpha = 2.0 / (length + 1)
+        self._seen = np.zeros(width, dtype=np.int64)
+        self._seed_sum = np.zeros(width)
+        self._value = np.full(width, np.nan)
+
+    def push(self, row):
+        """Adds a row and returns the current EMA (NaN until seeded)."""
+        row = np.asarray(row, dtype=np.float64).reshape(-1)
+        valid = np.isfinite(row)
+        seeding = valid & (self._seen < self.length)
+        self._seed_sum = np.where(seeding, self._seed_sum + np.where(valid, row, 0.0), self._seed_sum)
+        self._seen = self._seen + seeding
+        seeded_now = seeding & (self._seen == self.length)
+        updating = valid & ~seeding & np.isfinite(self._value)
+
+        self._value = np.where(seeded_now, self._seed_sum / self.length, self._value)
+        self._value = np.where(updating, self._alpha * np.where(valid, row, 0.0) + (1 - self._alpha) * self._value, self._value)
+        return self._value.copy()
+
+
+# --- Order-Statistics Windows ---
+class _SortedList:
+    """
+    A sorted multiset kept as a list of short sorted blocks, with a Fenwick tree
+    over the block sizes. A value is found by bisecting the block maxima and then
+    its block, and the k-th smallest value by descending the Fenwick tree, so
+    inserts, removals, ranks and selections cost O(log n) plus a memmove of one
+    block. The tree is rebuilt (O(n / BLOCK_SIZE)) only when a block splits or
+    empties, about once every BLOCK_SIZE updates.
+    """
+
+    BLOCK_SIZE = 64
+
+    def __init__(self):
+        self._blocks = []
+        self._maxes = []
+        self._tree = [0]
+        self._top_step = 0  # Largest power of two <= the number of blocks, where the tree descent starts
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _rebuild_index(self):
+        n = len(self._blocks)
+        tree = [0] * (n + 1)
+        for i, block in enumerate(self._blocks, start=1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._top_step = 1 << (n.bit_length() - 1) if n else 0
+
+    def _update_index(self, block_index, delta):
+        i, n = block_index + 1, len(self._blocks)
+        while i <= n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_before(self, block_index):
+        """Number of values in the blocks before block_index."""
+        total, i = 0, block_index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, value):
+        if not self._blocks:
+            self._blocks, self._maxes = [[value]], [value]
+            self._rebuild_index()
+        else:
+            i = min(bisect_left(self._maxes, value), len(self._blocks) - 1)
+            block = self._blocks[i]
+            insort(block, value)
+            self._maxes[i] = block[-1]
+            if len(block) > 2 * self.BLOCK_SIZE:
+                self._blocks[i:i + 1] = [block[:self.BLOCK_SIZE], block[self.BLOCK_SIZE:]]
+                self._maxes[i:i + 1] = [self._blocks[i][-1], block[-1]]
+                self._rebuild_index()
+            else:
+                self._update_index(i, 1)
+        self._size += 1
+
+    def remove(self, value):
+        """Removes one occurrence of a value that is in the list."""
+        i = bisect_left(self._maxes, value)
+        block = self._blocks[i]
+        del block[bisect_left(block, value)]
+        self._size -= 1
+        if block:
+            self._maxes[i] = block[-1]
+            self._update_index(i, -1)
+        else:
+            del self._blocks[i], self._maxes[i]
+            self._rebuild_index()
+
+    def bisect_left(self, value):
+        i = bisect_left(self._maxes, value)
+        if i == len(self._blocks):
+            return self._size
+        return self._count_before(i) + bisect_left(self._blocks[i], value)
+
+    def bisect_right(self, value):
+        i = bisect_right(self._maxes, value)
+        if i == len(self._blocks):
+            return self._size
+        return self._count_before(i) + bisect_right(self._blocks[i], value)
+
+    def __getitem__(self, k):
+        """The k-th smallest value (0-based)."""
+        tree, n = self._tree, len(self._blocks)
+        position, step = 0, self._top_step
+        while step:
+            if position + step <= n and tree[position + step] <= k:
+                position += step
+                k -= tree[position]
+            step >>= 1
+        return self._blocks[position][k]
+
+
+class SortedWindow:
+    """
+    A fixed-length window over a scalar stream that also keeps its valid values
+    in a sorted list (_SortedList), so each step, a rank and the median cost
+    O(log W) and the MAD O(log^2 W) instead of re-sorting the window on every
+    step. Like rolling(window=n), results are NaN until the window holds n valid
+    values.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._raw = deque()
+        self._sorted = _SortedList()
+
+    def push(self, value):
+        """Adds a value (dropping the one from `window` steps ago)."""
+        value = float(value)
+        if len(self._raw) == self.window:
+            old = self._raw.popleft()
+            if np.isfinite(old):
+                self._sorted.remove(old)
+        self._raw.append(value)
+        if np.isfinite(value):
+            self._sorted.add(value)
+
+    @property
+    def is_full(self):
+        return len(self._sorted) == self.window
+
+    def percentile_rank(self, value):
+        """Mid-rank of `value` within the window, as a fraction in (0, 1)."""
+        if not (self.is_full and np.isfinite(value)):
+            return np.nan
+        below = self._sorted.bisect_left(value)
+        equal = self._sorted.bisect_right(value) - below
+        return (below + equal / 2) / self.window
+
+    def median(self):
+        if not self.is_full:
+            return np.nan
+        n, values = self.window, self._sorted
+        return values[n // 2] if n % 2 else (values[n // 2 - 1] + values[n // 2]) / 2
+
+    def mad(self):
+        """
+        Median absolute deviation from the window median. The distances below
+        and above the median form two sorted sequences, so their median is a
+        k-th smallest selection across two sorted arrays.
+        """
+        if not self.is_full:
+            return np.nan
+        n, values, median = self.window, self._sorted, self.median()
+        half = n // 2
+        below = lambda i: median - values[half - 1 - i]  # ascending distances of values[:half]
+        above = lambda i: values[half + i] - median      # ascending distances of values[half:]
+        size_below, size_above = half, n - half
+
+        def kth(k):
+            lo, hi = max(0, k + 1 - size_above), min(k + 1, size_below)
+            while lo < hi:
+                i = (lo + hi) // 2
+                if below(i) < above(k - i):
+                    lo = i + 1
+                else:
+                    hi = i
+            taken_above = k + 1 - lo
+            candidates = ([below(lo - 1)] if lo > 0 else []) + ([above(taken_above - 1)] if taken_above > 0 else [])
+            return max(candidates)
+
+        return kth(half) if n % 2 else (kth(half - 1) + kth(half)) / 2
+
+
+def rolling_percentile_rank(series, window):
+    """Rolling mid-rank (0-100) of each value within its trailing window."""
+    sorted_window, ranks = SortedWindow(window), []
+    for value in series.to_numpy(dtype=np.float64):
+        sorted_window.push(value)
+        ranks.append(sorted_window.percentile_rank(value) * 100)
+    return pd.Series(ranks, index=series.index, name=series.name)
+
+
+def rolling_robust_zscore(series, window):
+    """
+    Rolling robust z-score: (value - median) / (1.4826 * MAD) over the trailing
+    window. The 1.4826 factor makes the MAD consistent with the standard
+    deviation for normally distributed data.
+    """
+    sorted_window, scores = SortedWindow(window), []
+    for value in series.to_numpy(dtype=np.float64):
+        sorted_window.push(value)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores.append((value - sorted_window.median()) / (1.4826 * np.float64(sorted_window.mad())))
+    return pd.Series(scores, index=series.index, name=series.name)
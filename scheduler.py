@@ -0,0 +1,287 @@
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from zoneinfo import ZoneInfo
+import pandas as pd
+from config import (
+    ALL_SYMBOLS_TO_FETCH, DB_FILE, DATAFEED, SCHEDULE_GROUPS, DEFAULT_SCHEDULE_GROUP, SCHEDULER_HEALTH_PORT
+)
+from master_daily_updater import update_symbols, get_last_timestamp
+from post_ingest import run_post_ingest_tasks
+from store import connect_writer
+from derived_store import connect_derived, save_frame, load_frame
+from datafeed import make_datafeed, add_datafeed_argument
+
+# --- Configuration ---
+HEALTH_FRAME = 'scheduler:health'
+MAX_SLEEP_SECONDS = 60           # The loop re-checks the schedule at least this often
+FEED_RESET_AFTER_FAILURES = 3    # Consecutive failed runs before the datafeed session is recreated
+
+
+def group_symbols(symbols=ALL_SYMBOLS_TO_FETCH, groups=SCHEDULE_GROUPS):
+    """Splits the (symbol_exchange, table_name) pairs into their exchange groups."""
+    group_of_exchange = {exchange: name for name, spec in groups.items() for exchange in spec['exchanges']}
+    grouped = {name: [] for name in groups}
+    for symbol_exchange, table_name in symbols.items():
+        exchange = symbol_exchange.split(':')[0]
+        grouped[group_of_exchange.get(exchange, DEFAULT_SCHEDULE_GROUP)].append((symbol_exchange, table_name))
+    return grouped
+
+
+def _close_on(spec, day):
+    """The (timezone-aware) close of a group on a local calendar day."""
+    hour, minute = map(int, spec['close'].split(':'))
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=ZoneInfo(spec['timezone']))
+
+
+def last_close(spec, now):
+    """The most recent close of a group at or before now (timezone-aware)."""
+    today = now.astimezone(ZoneInfo(spec['timezone'])).date()
+    for days_back in range(0, 8):
+        day = today - timedelta(days=days_back)
+        close = _close_on(spec, day)
+        if day.weekday() in spec['weekdays'] and close <= now:
+            return close
+    raise ValueError("Schedule group has no close in the last week; check its 'weekdays'.")
+
+
+def next_wake(spec, now):
+    """The next time (after now) at which a group's new bars should be fetched: its close plus the offset."""
+    today = now.astimezone(ZoneInfo(spec['timezone'])).date()
+    offset = timedelta(minutes=spec['offset_minutes'])
+    for days_ahead in range(-1, 8):
+        day = today + timedelta(days=days_ahead)
+        wake = _close_on(spec, day) + offset
+        if day.weekday() in spec['weekdays'] and wake > now:
+            return wake
+    raise ValueError("Schedule group has no close in the next week; check its 'weekdays'.")
+
+
+def last_complete_bar_day(spec, close):
+    """The day stamp (UTC midnight, as stored in the DB) of the last bar completed by a close."""
+    local_day = close.astimezone(ZoneInfo(spec['timezone'])).date()
+    return pd.Timestamp(local_day - timedelta(days=spec['close_day_offset']))
+
+
+class Scheduler:
+    """
+    Resident ingestion loop. Keeps one datafeed session and one DB connection
+    for its whole life, wakes shortly after each exchange group's daily close,
+    appends that group's completed bars and runs the post-ingest tasks for the
+    tables that changed. Health and metrics are kept in memory, stored in the
+    derived DB after every run and served as JSON on /health.
+    """
+
+    def __init__(self, groups=SCHEDULE_GROUPS, db_file=DB_FILE, feed_kind=DATAFEED):
+        self.groups = groups
+        self.symbols = group_symbols(groups=groups)
+        self.conn = connect_writer(db_file, check_same_thread=False)
+        self.derived_conn = connect_derived()
+        self.feed_kind = feed_kind
+        self._feed = None
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._wakes = {}  # Group name -> pending wake, kept until that group has run for it
+        self.health = {
+            'status': 'starting',
+            'started_at': _utc_string(_utc_now()),
+            'groups': {
+                name: {'symbols': len(self.symbols[name]), 'next_wake': None, 'last_run': None,
+                       'last_duration_seconds': None, 'last_changed': 0, 'last_failed': [], 'runs': 0}
+                for name in groups
+            },
+            'symbols': {},
+        }
+
+    @property
+    def feed(self):
+        """The shared datafeed session, created on first use and after repeated failures."""
+        if self._feed is None:
+            print(f"Opening {self.feed_kind} datafeed...")
+            self._feed = make_datafeed(self.feed_kind)
+        return self._feed
+
+    def run_group(self, name, close):
+        """Fetches the bars of one group completed by the given close and runs the post-ingest tasks."""
+        spec = self.groups[name]
+        through = last_complete_bar_day(spec, close)
+        started = time.perf_counter()
+        self._set_status(f'updating {name}')
+        print(f"\n=== {name}: fetching bars through {through.date()} ===")
+
+        changed, failed = update_symbols(self.feed, self.conn, self.symbols[name], through=through)
+        run_post_ingest_tasks(self.conn, set(changed))
+
+        if failed and not changed:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= FEED_RESET_AFTER_FAILURES:
+                print("Repeated failures; the datafeed session will be reopened on the next run.")
+                self._feed, self._consecutive_failures = None, 0
+        else:
+            self._consecutive_failures = 0
+
+        with self._lock:
+            group_health = self.health['groups'][name]
+            group_health.update({
+                'last_run': _utc_string(_utc_now()),
+                'last_duration_seconds': round(time.perf_counter() - started, 2),
+                'last_changed': len(changed),
+                'last_failed': [table_name for _, table_name in failed],
+                'runs': group_health['runs'] + 1,
+            })
+        self._set_status('idle')
+        self.refresh_symbol_lags()
+
+    def refresh_symbol_lags(self):
+        """Records every symbol's last stored bar and how many bars it is behind its group's last close."""
+        now = _utc_now()
+        lags = {}
+        for name, symbols in self.symbols.items():
+            expected = last_complete_bar_day(self.groups[name], last_close(self.groups[name], now))
+            for _, table_name in symbols:
+                last_bar = get_last_timestamp(self.conn, table_name)
+                lags[table_name] = {
+                    'group': name,
+                    'last_bar': last_bar.strftime('%Y-%m-%d') if last_bar is not None else None,
+                    'lag_days': (expected - last_bar.normalize()).days if last_bar is not None else None,
+                }
+        with self._lock:
+            self.health['symbols'] = lags
+        self._save_health()
+
+    def snapshot(self):
+        """A JSON-serializable copy of the current health and metrics."""
+        with self._lock:
+            snapshot = json.loads(json.dumps(self.health))
+        lagging = [table for table, info in snapshot['symbols'].items() if info['lag_days'] is None or info['lag_days'] > 0]
+        snapshot['lagging_symbols'] = sorted(lagging)
+        return snapshot
+
+    def run_once(self):
+        """Updates every group for its most recent close, then returns."""
+        now = _utc_now()
+        for name, spec in self.groups.items():
+            self.run_group(name, last_close(spec, now))
+
+    def run_due(self, now):
+        """
+        Runs every group whose pending wake is at or before now, once, and advances
+        it to the wake after that one. Returns the earliest pending wake.
+        """
+        for name, spec in self.groups.items():
+            if name not in self._wakes:
+                self._wakes[name] = next_wake(spec, now)
+        for name, wake in sorted(self._wakes.items(), key=lambda item: item[1]):
+            if wake > now:
+                continue
+            spec = self.groups[name]
+            try:
+                self.run_group(name, wake - timedelta(minutes=spec['offset_minutes']))
+            except Exception as e:
+                print(f"Scheduled run for {name} failed: {e}")
+                self._feed = None
+            # A missed close is picked up by update_symbols on the next run, so wakes are never replayed
+            self._wakes[name] = next_wake(spec, max(wake, now))
+
+        with self._lock:
+            for name, wake in self._wakes.items():
+                self.health['groups'][name]['next_wake'] = _utc_string(wake)
+        self._set_status('idle')
+        return min(self._wakes.values())
+
+    def run_forever(self):
+        """Sleeps until the next group wake-up, runs the due groups, and repeats."""
+        while True:
+            next_due = self.run_due(_utc_now())
+            remaining = (next_due - _utc_now()).total_seconds()
+            if remaining > 0:
+                time.sleep(min(remaining, MAX_SLEEP_SECONDS))
+
+    def close(self):
+        self.conn.close()
+        self.derived_conn.close()
+
+    def _set_status(self, status):
+        with self._lock:
+            self.health['status'] = status
+            self.health['updated_at'] = _utc_string(_utc_now())
+
+    def _save_health(self):
+        save_frame(self.derived_conn, HEALTH_FRAME, self.snapshot())
+
+
+def _utc_now():
+    return datetime.now(timezone.utc)
+
+
+def _utc_string(moment):
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def start_health_server(scheduler, port=SCHEDULER_HEALTH_PORT):
+    """Serves the scheduler's health snapshot as JSON on http://localhost:<port>/health in a daemon thread."""
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') not in ('/health', '/metrics'):
+                self.send_error(404)
+                return
+            body = json.dumps(scheduler.snapshot(), indent=2).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep the scheduler's console output readable
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), HealthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Health endpoint on http://127.0.0.1:{port}/health")
+    return server
+
+
+def print_status():
+    """Prints the health snapshot stored by the running (or last) scheduler."""
+    derived_conn = connect_derived()
+    try:
+        snapshot = load_frame(derived_conn, HEALTH_FRAME)
+    finally:
+        derived_conn.close()
+    if snapshot is None:
+        print("The scheduler has not run yet.")
+        return
+    lagging = snapshot.pop('lagging_symbols')
+    snapshot.pop('symbols')
+    print(json.dumps(snapshot, indent=2))
+    print(f"{len(lagging)} symbol(s) behind their last close: {', '.join(lagging[:20])}{' ...' if len(lagging) > 20 else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident scheduler for daily ingestion and post-ingest recomputation.")
+    parser.add_argument('--once', action='store_true', help="Update every group for its latest close and exit.")
+    parser.add_argument('--status', action='store_true', help="Print the health stored by the scheduler and exit.")
+    add_datafeed_argument(parser)
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+    else:
+        scheduler = Scheduler(feed_kind=args.feed)
+        server = start_health_server(scheduler) if SCHEDULER_HEALTH_PORT and not args.once else None
+        try:
+            scheduler.refresh_symbol_lags()
+            if args.once:
+                scheduler.run_once()
+            else:
+                scheduler.run_forever()
+        except KeyboardInterrupt:
+            print("\n--- Scheduler stopped. ---")
+        finally:
+            if server:
+                server.shutdown()
+            scheduler.close()
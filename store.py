@@ -0,0 +1,198 @@
+import queue
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+from config import DB_FILE
+
+# --- Configuration ---
+# The writers (updaters, scheduler, importer) put the market data DB in WAL
+# mode, so the dashboard's read-only connections read the last committed
+# state without ever waiting for a running ingest, and the writer never
+# waits for readers.
+READ_POOL_SIZE = 8
+BUSY_TIMEOUT_SECONDS = 30
+MMAP_SIZE = 256 * 1024 * 1024   # bytes of the DB file memory-mapped per reader
+CACHE_SIZE_KB = 64 * 1024       # page cache per connection
+READER_PRAGMAS = (
+    f"PRAGMA mmap_size = {MMAP_SIZE}",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA query_only = ON",
+)
+WRITER_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",  # Durable at every checkpoint; the usual pairing with WAL
+    f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def connect_writer(db_file=DB_FILE, check_same_thread=True):
+    """
+    Opens a read/write connection to the market data DB for the ingestion
+    side, switches the DB to WAL (a persistent setting of the file) and makes
+    sure every table has a version (see the Symbol Versions section).
+    """
+    conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=check_same_thread)
+    for pragma in WRITER_PRAGMAS:
+        conn.execute(pragma)
+    _ensure_versions_table(conn)
+    return conn
+
+
+def connect_reader(db_file=DB_FILE):
+    """Opens a read-only (mode=ro) connection to the market data DB, tuned for scans."""
+    uri = f"{Path(db_file).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+    for pragma in READER_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ReadPool:
+    """
+    A bounded pool of read-only connections shared by every dashboard thread.
+    Connections are opened on demand (up to `size`), handed out one thread at
+    a time and kept open between uses, so a cache miss does not pay for
+    opening the DB and re-warming its page cache.
+    """
+
+    def __init__(self, db_file=DB_FILE, size=READ_POOL_SIZE):
+        self.db_file = db_file
+        self._idle = queue.LifoQueue()  # Most recently used first: its cache is warmest
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection for the duration of a with-block (waiting if all are in use)."""
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = connect_reader(self.db_file)
+            yield conn
+        except sqlite3.DatabaseError:
+            # Do not hand a connection in an unknown state to the next borrower
+            if conn is not None:
+                conn.close()
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put(conn)
+            self._slots.release()
+
+    def close(self):
+        """Closes every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def read_pool(db_file=DB_FILE):
+    """Returns the process-wide read pool of a DB file."""
+    with _pools_lock:
+        if db_file not in _pools:
+            _pools[db_file] = ReadPool(db_file)
+        return _pools[db_file]
+
+
+# --- Symbol Versions ---
+# Every table of the market data DB has a version: a random token replaced in
+# the same transaction as every write to the table. Caches key on the versions
+# of exactly the symbols they read, so a write to one symbol only invalidates
+# what depends on it. Random tokens (rather than counters) never repeat, even
+# when the DB is rebuilt from scratch while on-disk caches survive.
+VERSIONS_TABLE = 'symbol_versions'
+
+
+def _new_version():
+    return secrets.token_hex(8)
+
+
+def _ensure_versions_table(conn):
+    """Creates the versions table and gives a first version to any table that has none."""
+    with conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} "
+            "(symbol TEXT PRIMARY KEY, version TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        unversioned = conn.execute(
+            f"SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' "
+            f"AND name != '{VERSIONS_TABLE}' AND name NOT IN (SELECT symbol FROM {VERSIONS_TABLE})"
+        ).fetchall()
+        now = _utc_now()
+        conn.executemany(
+            f"INSERT INTO {VERSIONS_TABLE} (symbol, version, updated_at) VALUES (?, ?, ?)",
+            [(name, _new_version(), now) for (name,) in unversioned]
+        )
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def bump_version(conn, table_name):
+    """Gives a table a new version. Call inside the transaction that writes the table."""
+    conn.execute(
+        f"INSERT INTO {VERSIONS_TABLE} (symbol, version, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(symbol) DO UPDATE SET version = excluded.version, updated_at = excluded.updated_at",
+        (table_name, _new_version(), _utc_now())
+    )
+
+
+def read_versions(conn):
+    """Returns {table name: version} (empty for a DB no writer has opened since versions were added)."""
+    try:
+        return dict(conn.execute(f"SELECT symbol, version FROM {VERSIONS_TABLE}").fetchall())
+    except sqlite3.OperationalError:
+        return {}
+
+
+def _sql_type(dtype):
+    if np.issubdtype(dtype, np.integer) or np.issubdtype(dtype, np.bool_):
+        return 'INTEGER'
+    return 'REAL' if np.issubdtype(dtype, np.floating) else 'TEXT'
+
+
+def write_bars(conn, table_name, df, replace=False):
+    """
+    Appends bars to a table (or replaces its contents) and bumps its version,
+    atomically. The table layout matches what DataFrame.to_sql writes: a
+    'datetime' TIMESTAMP column plus one column per DataFrame column, with an
+    index on datetime.
+
+    Args:
+        conn (sqlite3.Connection): A connection from connect_writer.
+        table_name (str): The table to write.
+        df (pd.DataFrame): Bars indexed by datetime.
+        replace (bool): Whether to drop the table's existing rows first.
+    """
+    columns = list(df.columns)
+    stamps = df.index.strftime('%Y-%m-%d %H:%M:%S').tolist()
+    rows = zip(stamps, *(df[col].tolist() for col in columns))
+    column_list = ', '.join(f'"{col}"' for col in ['datetime'] + columns)
+    placeholders = ', '.join('?' * (len(columns) + 1))
+
+    with conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")  # DDL does not open a transaction implicitly
+        if replace:
+            conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        column_defs = ', '.join(['"datetime" TIMESTAMP'] + [f'"{col}" {_sql_type(df[col].dtype)}' for col in columns])
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({column_defs})')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_datetime" ON "{table_name}" ("datetime")')
+        conn.executemany(f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})', rows)
+        bump_version(conn, table_name)
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+from panel import align_on_calendar, to_day_numbers, day_numbers_to_datetime
+from indicators import (
+    BENCHMARK_KEY, calculate_breadth_wave_bands, normalize_official_asi_components
+)
+
+# --- Parameter Sweeps ---
+# Research variants of the indicators.py functions that take a list of window
+# lengths and return every result stacked along a leading 'window' index level.
+# The basket is flattened once, and every window reuses the same prefix sums /
+# padded prices instead of redoing the whole computation per call. Windows are
+# taken over each asset's own rows, as the per-asset intermediates take them,
+# so assets with missing days match the single-length indicators.
+
+
+def align_panel(data_dict, column='close'):
+    """Aligns one column of every asset on the shared day calendar (dates x symbols)."""
+    return align_on_calendar({symbol: df[column] for symbol, df in data_dict.items()})
+
+
+class _AssetRows:
+    """
+    One column of every asset flattened into a single array of the assets' own
+    rows, asset after asset. Rolling windows and changes are computed for all
+    assets in one pass over the flat array, without crossing from one asset into
+    the next, and placed on the shared day calendar only at the end.
+    """
+
+    def __init__(self, data_dict, column='close'):
+        series = {symbol: df[column] for symbol, df in data_dict.items() if len(df)}
+        self.columns = list(series)
+        self.lengths = np.array([len(s) for s in series.values()], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)])
+        self.values = np.concatenate([s.to_numpy(dtype=np.float64) for s in series.values()]) if series else np.empty(0)
+        self.asset = np.repeat(np.arange(len(series)), self.lengths)
+        self.row_start = self.offsets[:-1][self.asset]  # Flat position of each row's first asset row
+        self.last_rows = self.offsets[1:] - 1
+
+        self.is_datetime = all(isinstance(s.index, pd.DatetimeIndex) for s in series.values())
+        days = [
+            to_day_numbers(s.index) if isinstance(s.index, pd.DatetimeIndex) else s.index.to_numpy(dtype=np.int64)
+            for s in series.values()
+        ]
+        self.days = np.concatenate(days) if days else np.empty(0, dtype=np.int64)
+        self.first_day = int(self.days.min()) if len(self.days) else 0
+        self.n_days = int(self.days.max()) - self.first_day + 1 if len(self.days) else 0
+
+        valid = np.isfinite(self.values)
+        self._value_sums = np.concatenate([[0.0], np.cumsum(np.where(valid, self.values, 0.0))])
+        self._valid_counts = np.concatenate([[0], np.cumsum(valid)])
+        # pct_change pads NaN values with the asset's previous value (leading NaNs stay NaN)
+        positions = np.arange(len(self.values))
+        self._padded = self.values[np.maximum.accumulate(np.where(valid | (positions == self.row_start), positions, 0))] \
+            if len(self.values) else self.values
+
+    @property
+    def index(self):
+        """The shared day calendar, from the earliest to the latest row of any asset."""
+        calendar = np.arange(self.first_day, self.first_day + self.n_days)
+        if self.is_datetime:
+            return pd.Index(day_numbers_to_datetime(calendar), name='datetime')
+        return pd.Index(calendar, name='day')
+
+    def _window_start(self, length):
+        """Flat position of the first row of each row's trailing window, and whether it stays in the asset."""
+        start = np.arange(len(self.values)) - (length - 1)
+        return start, start >= self.row_start
+
+    def rolling_mean(self, length):
+        """rolling(window=length).mean() of every asset: NaN unless its last `length` rows are all valid."""
+        start, inside = self._window_start(length)
+        start = np.maximum(start, 0)
+        end = np.arange(1, len(self.values) + 1)
+        window_counts = self._valid_counts[end] - self._valid_counts[start]
+        window_sums = self._value_sums[end] - self._value_sums[start]
+        return np.where(inside & (window_counts == length), window_sums / length, np.nan)
+
+    def pct_change(self, periods):
+        """pct_change(periods=periods) of every asset, NaN for its first `periods` rows."""
+        earlier, inside = self._window_start(periods + 1)
+        previous = np.where(inside, self._padded[np.maximum(earlier, 0)], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._padded / previous - 1
+
+    def to_panel(self, flat):
+        """Places per-row values on the shared day calendar (dates x symbols)."""
+        out = np.full((self.n_days, len(self.columns)), np.nan)
+        out[self.days - self.first_day, self.asset] = flat
+        return pd.DataFrame(out, index=self.index, columns=self.columns)
+
+    def per_day_sum(self, flat):
+        """Sums per-row values over the assets on each calendar day."""
+        return np.bincount(self.days - self.first_day, weights=flat, minlength=self.n_days)
+
+
+def _stack(frames_by_window, index_name='datetime'):
+    """Stacks per-window DataFrames into one DataFrame indexed by (window, date)."""
+    return pd.concat(frames_by_window, names=['window', index_name])
+
+
+def sweep_sma(data_dict, lengths):
+    """
+    Computes the SMA of every asset for several lengths using one set of prefix sums.
+
+    Returns:
+        pd.DataFrame: Indexed by (window, date), one column per symbol.
+    """
+    rows = _AssetRows(data_dict)
+    return _stack({length: rows.to_panel(rows.rolling_mean(length)) for length in lengths}, rows.index.name)
+
+
+def sweep_roc(data_dict, lengths):
+    """
+    Computes the Rate of Change (%) of every asset for several lengths from one
+    flattened, padded price array.
+
+    Returns:
+        pd.DataFrame: Indexed by (window, date), one column per symbol.
+    """
+    rows = _AssetRows(data_dict)
+    return _stack({length: rows.to_panel(rows.pct_change(length) * 100) for length in lengths}, rows.index.name)
+
+
+def sweep_assets_above_ma(data_dict, ma_lengths):
+    """
+    Sweep variant of calculate_assets_above_ma: the percentage of assets trading
+    above their SMA for several SMA lengths.
+
+    Returns:
+        pd.DataFrame: Indexed by (window, date) with a 'percentage_above' column.
+    """
+    rows = _AssetRows(data_dict)
+    index = rows.index
+    results = {}
+    for length in ma_lengths:
+        # Like the indicator, only assets with more than `length` rows take part
+        eligible = (rows.lengths > length)[rows.asset]
+        if not eligible.any():
+            continue
+        sma = rows.rolling_mean(length)
+        has_sma = eligible & np.isfinite(sma) & np.isfinite(rows.values)
+        with np.errstate(invalid='ignore'):
+            above = has_sma & (rows.values > sma)
+        # Each day's share is taken over the assets with an SMA on that day
+        active, above_count = rows.per_day_sum(has_sma), rows.per_day_sum(above)
+        days = active > 0
+        results[length] = pd.DataFrame({'percentage_above': above_count[days] / active[days] * 100}, index=index[days])
+    return _stack(results, index.name)
+
+
+def sweep_eth_breadth_wave(data_dict, benchmark_df, lookback_periods):
+    """
+    Sweep variant of calculate_eth_breadth_wave over several lookback periods.
+
+    Returns:
+        pd.DataFrame: Indexed by (window, date), one column per performance band.
+    """
+    rocs = sweep_roc({**data_dict, BENCHMARK_KEY: benchmark_df}, lookback_periods)
+    results = {}
+    for lookback in lookback_periods:
+        roc = rocs.loc[lookback]
+        benchmark_roc = roc.pop(BENCHMARK_KEY)
+        results[lookback] = calculate_breadth_wave_bands(roc.subtract(benchmark_roc, axis=0))
+    return _stack(results, rocs.index.names[1])
+
+
+def sweep_market_character(data_dict, lookback_periods):
+    """
+    Sweep variant of calculate_market_character: latest momentum (ROC %) and
+    annualized realized volatility of every asset for several lookback periods,
+    vectorized across assets.
+
+    Returns:
+        pd.DataFrame: Indexed by (window, symbol) with 'momentum' and 'volatility' columns.
+    """
+    rows = _AssetRows(data_dict)
+    returns = rows.pct_change(1)
+    last = rows.last_rows
+    results = {}
+    for lookback in lookback_periods:
+        momentum = rows.pct_change(lookback)[last] * 100
+        # The last `lookback` returns of every asset, one row per asset
+        windows = returns[np.maximum(last[:, None] - np.arange(lookback)[::-1], 0)]
+        volatility = np.full(len(last), np.nan)
+        if lookback > 1:
+            volatility = np.std(windows, axis=1, ddof=1) * np.sqrt(365)
+        keep = (rows.lengths > lookback) & np.isfinite(momentum) & np.isfinite(volatility)
+        results[lookback] = pd.DataFrame(
+            {'momentum': momentum[keep], 'volatility': volatility[keep]},
+            index=pd.Index(np.array(rows.columns, dtype=object)[keep], name='symbol')
+        )
+    return _stack(results, 'symbol')
+
+
+def sweep_official_altcoin_season_index(majors_data, benchmark_df, btcd_df, lookback_periods=(90,),
+                                        normalization_windows=(365,), vol_ma_period=20, smoothing_period=14,
+                                        normalization='zscore'):
+    """
+    Sweep variant of calculate_official_altcoin_season_index over lookback
+    periods and normalization windows. The basket is aligned once; the raw
+    components are computed once per lookback and reused for every
+    normalization window.
+
+    Returns:
+        pd.DataFrame: Indexed by (lookback_period, normalization_window, date)
+            with an 'altcoin_season_index' column.
+    """
+    altcoins = {symbol: df for symbol, df in majors_data.items() if 'BTC' not in symbol}
+    rows = _AssetRows({**altcoins, BENCHMARK_KEY: benchmark_df})
+    closes_index = rows.index
+    benchmark_position = rows.columns.index(BENCHMARK_KEY)
+    asset_positions = [i for i in range(len(rows.columns)) if i != benchmark_position]
+
+    volume_rows = _AssetRows(altcoins, 'volume')
+    asset_vol_ma = volume_rows.to_panel(volume_rows.rolling_mean(vol_ma_period)).reindex(
+        index=closes_index, columns=[rows.columns[i] for i in asset_positions]
+    ).to_numpy()
+
+    results = {}
+    for lookback in lookback_periods:
+        roc = rows.to_panel(rows.pct_change(lookback)).to_numpy()
+        with np.errstate(invalid='ignore'):
+            is_outperforming = roc[:, asset_positions] > roc[:, [benchmark_position]]
+        # Days without any asset and benchmark ROC have no breadth (NaN), as in the dashboard version
+        active = (np.isfinite(roc[:, asset_positions]) & np.isfinite(roc[:, [benchmark_position]])).sum(axis=1)
+        no_breadth = np.where(active > 0, 1.0, np.nan)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            price_breadth = pd.Series(is_outperforming.sum(axis=1) / active * 100 * no_breadth, index=closes_index)
+        volume_breadth = pd.Series(
+            np.nansum(np.where(is_outperforming, asset_vol_ma, 0.0), axis=1) * no_breadth, index=closes_index
+        )
+        btcd_momentum = btcd_df['close'].pct_change(periods=lookback) * 100
+        combined_df = align_on_calendar({
+            'price_breadth': price_breadth,
+            'volume_breadth': volume_breadth,
+            'btcd_momentum': btcd_momentum
+        }).dropna()
+
+        for normalization_window in normalization_windows:
+            results[(lookback, normalization_window)] = normalize_official_asi_components(
+                combined_df, normalization_window, smoothing_period, normalization
+            )
+
+    return pd.concat(results, names=['lookback_period', 'normalization_window', closes_index.name])
@@ -1,6 +1,8 @@
-import sqlite3
 import time
 from tvDatafeed import TvDatafeed, Interval
+from config import FORWARD_FILL_SYMBOLS
+from panel import normalize_daily_bars
+from store import connect_writer, write_bars
 
 # --- Configuration ---
 DB_FILE = "market_data.db"
@@ -52,7 +54,7 @@ def add_missing_assets():
     tv = TvDatafeed()
     print(f"Connecting to database: {DB_FILE}")
     
-    with sqlite3.connect(DB_FILE) as conn:
+    with connect_writer(DB_FILE) as conn:
         for symbol_exchange, table_name in ASSETS_TO_ADD.items():
             try:
                 # Check if table already exists to avoid re-downloading
@@ -75,7 +77,8 @@ def add_missing_assets():
                 if df is not None and not df.empty:
                     df = df[['open', 'high', 'low', 'close', 'volume']]
                     df.index.name = 'datetime'
-                    df.to_sql(table_name, conn, if_exists='replace', index=True)
+                    df = normalize_daily_bars(df, forward_fill=table_name in FORWARD_FILL_SYMBOLS)
+                    write_bars(conn, table_name, df, replace=True)
                     print(f"✅ Successfully created table for {table_name} with {len(df)} records.")
                 else:
                     print(f"⚠️ No data found for {symbol_exchange}.")
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+import alerts
+import memo
+from derived_store import connect_derived, load_frame
+from indicators import calculate_assets_above_ma
+from store import connect_writer, write_bars
+
+BASKET = {'AAA': 'AAAUSDT', 'BBB': 'BBBUSDT', 'CCC': 'CCCUSDT'}
+RULES = [
+    {"name": "Breadth Above 50%", "series": "assets_above_ma", "length": 5, "baskets": "*", "condition": "cross_above", "threshold": 50},
+    {"name": "Breadth Below 50%", "series": "assets_above_ma", "length": 5, "baskets": "*", "condition": "cross_below", "threshold": 50},
+]
+DAYS = pd.date_range('2024-01-01', periods=80, freq='D')
+
+
+@pytest.fixture
+def alert_env(monkeypatch, tmp_path):
+    """Alert rules on one small basket, with the market and derived DBs in tmp_path."""
+    monkeypatch.setattr(alerts, 'ALERT_RULES', RULES)
+    monkeypatch.setattr(alerts, 'ALERT_BASKETS', {'Test': BASKET})
+    monkeypatch.setattr(alerts, 'ALERT_FILE_SINK', None)
+    monkeypatch.setattr(alerts, 'ALERT_WEBHOOK_URL', None)
+    return tmp_path
+
+
+def _bars(seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.05, len(DAYS))))
+    return pd.DataFrame({'close': close, 'volume': rng.uniform(1, 10, len(DAYS))}, index=DAYS)
+
+
+def _write(conn, bars, through, since=None):
+    """Writes each symbol's bars after since[symbol] and through through[symbol]."""
+    for table in BASKET.values():
+        if table in through:
+            df = bars[table]
+            rows = (df.index <= through[table]) & (df.index > (since or {}).get(table, pd.Timestamp.min))
+            if rows.any():
+                write_bars(conn, table, df[rows])
+
+
+def _run(monkeypatch, derived_file, conn):
+    """Runs evaluate_alerts against a derived DB file and returns the stored state."""
+    monkeypatch.setattr(alerts, 'connect_derived', lambda: connect_derived(str(derived_file)))
+    alerts.evaluate_alerts(conn)
+    derived = connect_derived(str(derived_file))
+    try:
+        return load_frame(derived, alerts.ALERT_STATE_FRAME)
+    finally:
+        derived.close()
+
+
+def _full_state(monkeypatch, tmp_path, bars, through):
+    """The state a single run over the final data builds from scratch."""
+    with connect_writer(str(tmp_path / 'full.db')) as conn:
+        _write(conn, bars, through)
+        return _run(monkeypatch, tmp_path / 'full_derived.db', conn)
+
+
+def test_day_is_held_until_every_input_reported(alert_env, monkeypatch):
+    bars = {table: _bars(i) for i, table in enumerate(BASKET.values())}
+    through = {'AAAUSDT': DAYS[60], 'BBBUSDT': DAYS[60], 'CCCUSDT': DAYS[59]}
+    with connect_writer(str(alert_env / 'market.db')) as conn:
+        _write(conn, bars, through)
+        state = _run(monkeypatch, alert_env / 'derived.db', conn)
+        assert state.last_date == DAYS[59]
+
+        # The late group reports: the held day is stepped, matching a full rebuild
+        _write(conn, bars, {'CCCUSDT': DAYS[60]}, since={'CCCUSDT': DAYS[59]})
+        state = _run(monkeypatch, alert_env / 'derived.db', conn)
+    assert state.last_date == DAYS[60]
+    assert state.last_values == _full_state(monkeypatch, alert_env, bars, {table: DAYS[60] for table in BASKET.values()}).last_values
+
+
+def test_late_bar_beyond_the_hold_rebuilds_the_state(alert_env, monkeypatch):
+    bars = {table: _bars(i + 10) for i, table in enumerate(BASKET.values())}
+    stale_through = {'AAAUSDT': DAYS[70], 'BBBUSDT': DAYS[70], 'CCCUSDT': DAYS[60]}
+    final_through = {table: DAYS[72] for table in BASKET.values()}
+    with connect_writer(str(alert_env / 'market.db')) as conn:
+        _write(conn, bars, stale_through)
+        state = _run(monkeypatch, alert_env / 'derived.db', conn)
+        # CCC is more than MAX_HOLD_DAYS behind, so the other symbols are not held for it
+        assert state.last_date == DAYS[70]
+        assert state.last_bars['CCCUSDT'] == DAYS[60]
+
+        _write(conn, bars, final_through, since=stale_through)
+        state = _run(monkeypatch, alert_env / 'derived.db', conn)
+    full = _full_state(monkeypatch, alert_env, bars, final_through)
+    assert state.last_date == full.last_date == DAYS[72]
+    assert state.last_values == full.last_values
+    assert state.last_bars == full.last_bars
+
+
+def test_incremental_runs_match_a_full_rebuild(alert_env, monkeypatch):
+    bars = {table: _bars(i + 20) for i, table in enumerate(BASKET.values())}
+    with connect_writer(str(alert_env / 'market.db')) as conn:
+        previous = None
+        for end in (40, 41, 45, 60, 79):
+            through = {table: DAYS[end] for table in BASKET.values()}
+            _write(conn, bars, through, since=previous)
+            state = _run(monkeypatch, alert_env / 'derived.db', conn)
+            previous = through
+    full = _full_state(monkeypatch, alert_env, bars, previous)
+    assert state.last_date == full.last_date == DAYS[79]
+    assert state.last_values == full.last_values
+
+
+def test_alert_series_follow_the_indicator_on_bars_with_gaps(alert_env, monkeypatch):
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', False)
+    bars = {table: _bars(i + 30) for i, table in enumerate(BASKET.values())}
+    bars['AAAUSDT'] = bars['AAAUSDT'].drop(DAYS[20:30])
+    bars['BBBUSDT'] = bars['BBBUSDT'].drop(DAYS[[35, 41, 42, 57]])
+    with connect_writer(str(alert_env / 'market.db')) as conn:
+        previous = None
+        for end in (40, 60, 79):
+            through = {table: DAYS[end] for table in BASKET.values()}
+            _write(conn, bars, through, since=previous)
+            state = _run(monkeypatch, alert_env / 'derived.db', conn)
+            expected = calculate_assets_above_ma({table: df[df.index <= DAYS[end]] for table, df in bars.items()}, 5)
+            assert state.last_values['assets_above_ma_5:Test'] == pytest.approx(expected.iloc[-1])
+            previous = through
+        fired = alerts.load_alert_events()
+
+    # Every crossing of the dashboard series after the warm-up fires, and nothing else
+    series = calculate_assets_above_ma(bars, 5)
+    previous_value = series.shift(1)
+    crossings = series[
+        (series.index > DAYS[40])
+        & (((previous_value <= 50) & (series > 50)) | ((previous_value >= 50) & (series < 50)))
+    ]
+    assert len(crossings)
+    assert sorted(fired['date']) == sorted(crossings.index.strftime('%Y-%m-%d'))
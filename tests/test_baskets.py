@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+import indicators
+import memo
+from baskets import BasketRegistry
+from datafeed import SyntheticFeed
+
+END = pd.Timestamp('2024-06-30')
+
+BASKETS = {
+    'majors': {'BINANCE:ETHUSDT': 'ETHUSDT', 'BINANCE:SOLUSDT': 'SOLUSDT', 'BINANCE:ADAUSDT': 'ADAUSDT'},
+    'layer1': {'BINANCE:SOLUSDT': 'SOLUSDT', 'BINANCE:ADAUSDT': 'ADAUSDT', 'BINANCE:AVAXUSDT': 'AVAXUSDT'},
+    'memes': {'BINANCE:DOGEUSDT': 'DOGEUSDT', 'BINANCE:AVAXUSDT': 'AVAXUSDT'},
+}
+
+
+@pytest.fixture(autouse=True)
+def no_disk_memo(monkeypatch):
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', False)
+
+
+@pytest.fixture
+def registry():
+    return BasketRegistry(BASKETS)
+
+
+def _bars(symbol, days=700):
+    df = SyntheticFeed(history_days=days, end=END).get_daily_bars(symbol, 'BINANCE', days)[['close', 'volume']]
+    keep = np.random.default_rng(len(symbol)).random(len(df)) >= 0.1  # Missing bars
+    return df[keep]
+
+
+def test_partitions_group_symbols_with_the_same_baskets(registry):
+    assert registry.universe == ['ETHUSDT', 'SOLUSDT', 'ADAUSDT', 'AVAXUSDT', 'DOGEUSDT']
+    partitions = sorted(sorted(p) for p in registry.partitions)
+    assert partitions == [['ADAUSDT', 'SOLUSDT'], ['AVAXUSDT'], ['DOGEUSDT'], ['ETHUSDT']]
+
+    for names in (('majors',), ('layer1',), ('memes',), ('majors', 'memes'), ('majors', 'layer1', 'memes')):
+        covered = [symbol for p in registry.partitions_of(*names) for symbol in registry.partitions[p]]
+        assert sorted(covered) == sorted(registry.symbols(*names))
+
+    assert registry.symbols('memes', 'majors') == ['DOGEUSDT', 'AVAXUSDT', 'ETHUSDT', 'SOLUSDT', 'ADAUSDT']
+    with pytest.raises(KeyError):
+        registry.symbols('unknown')
+
+
+def test_split_follows_the_partitions(registry):
+    data = {symbol: symbol.lower() for symbol in ['DOGEUSDT', 'SOLUSDT', 'XRPUSDT', 'ETHUSDT', 'ADAUSDT']}
+    groups = registry.split(data)
+    assert groups[-1] == {'XRPUSDT': 'xrpusdt'}  # Unregistered symbols come last
+    assert sorted(map(sorted, groups[:-1])) == [['ADAUSDT', 'SOLUSDT'], ['DOGEUSDT'], ['ETHUSDT']]
+    assert {symbol: value for group in groups for symbol, value in group.items()} == data
+    assert registry.split({}) == [{}]
+
+
+def test_partitioned_breadth_matches_a_single_pass(registry, monkeypatch):
+    basket = {symbol: _bars(symbol).iloc[i * 50:] for i, symbol in enumerate(registry.universe + ['XRPUSDT'])}
+    benchmark, btcd = _bars('ETH'), _bars('BTC.D')
+
+    def compute():
+        return (
+            indicators.calculate_official_altcoin_season_index(basket, benchmark, btcd, normalization_window=120),
+            indicators.calculate_ad_line(basket),
+            indicators.calculate_assets_above_ma(basket, 50),
+            indicators.calculate_eth_breadth_wave(basket, benchmark),
+        )
+
+    monkeypatch.setattr(indicators, 'split_by_partition', registry.split)
+    partitioned = compute()
+    monkeypatch.setattr(indicators, 'split_by_partition', lambda data_dict: [data_dict])
+    single_pass = compute()
+
+    assert not partitioned[0].empty
+    for result, expected in zip(partitioned, single_pass):
+        if isinstance(result, pd.DataFrame):
+            pd.testing.assert_frame_equal(result, expected, check_freq=False, rtol=1e-9)
+        else:
+            pd.testing.assert_series_equal(result, expected, check_freq=False, rtol=1e-9)
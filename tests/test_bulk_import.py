@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+import post_ingest
+from bulk_import import _to_utc_datetimes, bulk_import
+from derived_store import connect_derived, load_frame, save_frame
+from panel import normalize_daily_bars
+from store import connect_writer
+
+
+def _hourly_bars(start, days, seed=0):
+    """Hourly OHLCV bars with distinct opens, so every hour is a separate bar of its day."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=days * 24, freq='H')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    return pd.DataFrame({
+        'open': open_, 'high': np.maximum(open_, close) * 1.001, 'low': np.minimum(open_, close) * 0.999,
+        'close': close, 'volume': rng.uniform(1, 10, len(index)),
+    }, index=index)
+
+
+def _write_csv(path, bars):
+    """Writes bars as an exchange export with epoch-millisecond open times."""
+    export = bars.copy()
+    export.insert(0, 'open_time', export.index.view(np.int64) // 10**6)
+    export.to_csv(path, index=False)
+    return str(path)
+
+
+def _stored(db_file, table):
+    with connect_writer(db_file) as conn:
+        df = pd.read_sql(f'SELECT * FROM "{table}" ORDER BY datetime', conn, index_col='datetime', parse_dates=['datetime'])
+    df.index.name = 'datetime'
+    return df
+
+
+def test_epoch_units_are_detected():
+    stamps = pd.DatetimeIndex(['2017-08-17 00:00:00', '2024-06-30 12:30:00'])
+    seconds = pd.Series(stamps.view(np.int64) // 10**9)
+    for scale in (1, 10**3, 10**6):
+        pd.testing.assert_index_equal(_to_utc_datetimes(seconds * scale), stamps, check_names=False)
+    local = pd.Series(['2024-06-30T14:30:00+02:00'])
+    assert _to_utc_datetimes(local)[0] == pd.Timestamp('2024-06-30 12:30:00')
+
+
+@pytest.mark.parametrize('chunk_size', [7, 24, 50])
+def test_chunks_split_mid_day_become_one_bar_per_day(tmp_path, chunk_size):
+    bars = _hourly_bars('2024-01-01 00:00', days=6)
+    path = _write_csv(tmp_path / 'ETHUSDT-1h.csv', bars)
+    db_file = str(tmp_path / 'market_data.db')
+
+    changed = bulk_import(path, db_file=db_file, table='ETHUSDT', chunk_size=chunk_size, post_ingest=False)
+
+    assert changed == {'ETHUSDT': 6}
+    pd.testing.assert_frame_equal(_stored(db_file, 'ETHUSDT'), normalize_daily_bars(bars), check_freq=False)
+
+
+def test_days_already_stored_are_not_imported_again(tmp_path):
+    bars = _hourly_bars('2024-01-01 00:00', days=10)
+    db_file = str(tmp_path / 'market_data.db')
+    first = _write_csv(tmp_path / 'first.csv', bars[:'2024-01-06'])
+    bulk_import(first, db_file=db_file, table='ETHUSDT', chunk_size=30, post_ingest=False)
+    stored = _stored(db_file, 'ETHUSDT')
+
+    assert bulk_import(first, db_file=db_file, table='ETHUSDT', post_ingest=False) == {}
+    # An overlapping export, whose overlapping days differ from the stored bars
+    overlap = bars['2024-01-04':].copy()
+    overlap['close'] *= 2
+    changed = bulk_import(_write_csv(tmp_path / 'overlap.csv', overlap), db_file=db_file, table='ETHUSDT', chunk_size=30, post_ingest=False)
+
+    assert changed == {'ETHUSDT': 4}
+    after = _stored(db_file, 'ETHUSDT')
+    pd.testing.assert_frame_equal(after.loc[:'2024-01-06'], stored)
+    pd.testing.assert_frame_equal(after.loc['2024-01-07':], normalize_daily_bars(overlap).loc['2024-01-07':], check_freq=False)
+
+
+def test_backfilled_history_rebuilds_the_incremental_tasks(tmp_path, monkeypatch):
+    derived_file = str(tmp_path / 'derived.db')
+    monkeypatch.setattr(post_ingest, 'connect_derived', lambda: connect_derived(derived_file))
+    calls = []
+    monkeypatch.setattr(post_ingest, 'POST_INGEST_TASKS', [lambda conn, changed_tables: calls.append(changed_tables)])
+    conn = connect_derived(derived_file)
+    for name in post_ingest.INCREMENTAL_STATE_FRAMES + ('volume_breadth:Top 10',):
+        save_frame(conn, name, pd.DataFrame({'a': [1]}))
+
+    bars = _hourly_bars('2024-01-01 00:00', days=10)
+    db_file = str(tmp_path / 'market_data.db')
+    bulk_import(_write_csv(tmp_path / 'recent.csv', bars['2024-01-06':]), db_file=db_file, table='ETHUSDT')
+    assert calls == [{'ETHUSDT'}]
+    assert all(load_frame(conn, name) is not None for name in post_ingest.INCREMENTAL_STATE_FRAMES)
+
+    bulk_import(_write_csv(tmp_path / 'older.csv', bars[:'2024-01-05']), db_file=db_file, table='ETHUSDT')
+    assert calls == [{'ETHUSDT'}, None]
+    assert all(load_frame(conn, name) is None for name in post_ingest.INCREMENTAL_STATE_FRAMES)
+    assert load_frame(conn, 'volume_breadth:Top 10') is not None  # Results are replaced by the rebuild, not deleted
+    conn.close()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+import correlation
+from correlation import calculate_correlation_matrix, calculate_rolling_correlation, cluster_correlation_matrix
+
+WINDOW = 30
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(correlation, '_cache', type(correlation._cache)())
+
+
+def _assets(n_days=200):
+    """Two groups of assets driven by two market factors, listed on different days and with missing bars."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2024-01-01', periods=n_days, freq='D')
+    factors = rng.normal(0, 0.03, (2, n_days))
+    data = {}
+    for i in range(6):
+        returns = factors[i % 2] + rng.normal(0, 0.01, n_days)
+        df = pd.DataFrame({'close': 100 * np.exp(np.cumsum(returns))}, index=dates).iloc[i * 15:]
+        data[f'G{i % 2}_{i}'] = df.drop(df.index[[40, 41]]) if i == 3 else df
+    benchmarks = {'BTC': pd.DataFrame({'close': 100 * np.exp(np.cumsum(factors[0]))}, index=dates)}
+    return data, benchmarks
+
+
+def _returns(data):
+    return pd.DataFrame({symbol: df['close'].pct_change() for symbol, df in data.items()})
+
+
+def test_rolling_correlation_matches_pairwise_pandas_correlations():
+    data, benchmarks = _assets()
+    result = calculate_rolling_correlation(data, benchmarks, WINDOW)
+    returns = _returns(data).asfreq('D')
+    benchmark_returns = benchmarks['BTC']['close'].pct_change()
+
+    for date in result.index[::17]:
+        window = returns.loc[:date].iloc[-WINDOW:].dropna(axis=1)  # Assets with a full window
+        matrix = window.corr().to_numpy()
+        pairs = matrix[~np.eye(len(matrix), dtype=bool)]
+        to_btc = window.corrwith(benchmark_returns.loc[window.index])
+        assert result.loc[date, 'active_assets'] == window.shape[1]
+        assert result.loc[date, 'average_correlation'] == pytest.approx(pairs.mean(), rel=1e-9)
+        assert result.loc[date, 'corr_to_BTC'] == pytest.approx(to_btc.mean(), rel=1e-9)
+
+
+def test_correlation_matrix_and_clusters():
+    data, _ = _assets()
+    as_of = pd.Timestamp('2024-05-01')
+    matrix = calculate_correlation_matrix(data, WINDOW, as_of=as_of)
+    expected = _returns(data).asfreq('D').loc[:as_of].iloc[-WINDOW:].dropna(axis=1).corr()
+    pd.testing.assert_frame_equal(matrix, expected, check_exact=False, rtol=1e-9, check_names=False)
+
+    labels, order = cluster_correlation_matrix(matrix, max_distance=0.5)
+    assert sorted(order) == sorted(matrix.index)
+    groups = {symbol.split('_')[0] for symbol in matrix.index}
+    assert labels.nunique() == len(groups) == 2
+    for group in groups:
+        members = [symbol for symbol in matrix.index if symbol.startswith(group)]
+        assert labels[members].nunique() == 1
+        # Leaf order keeps each cluster contiguous
+        positions = sorted(order.index(symbol) for symbol in members)
+        assert positions == list(range(positions[0], positions[0] + len(members)))
+
+    # Cut above every merge: one cluster
+    assert cluster_correlation_matrix(matrix, max_distance=2.0)[0].nunique() == 1
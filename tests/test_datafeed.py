@@ -0,0 +1,64 @@
+import pandas as pd
+from datafeed import RecordingFeed, ReplayFeed, SyntheticFeed
+
+
+def test_replay_serves_what_was_recorded(tmp_path):
+    recorder = RecordingFeed(SyntheticFeed(history_days=200, end='2024-06-30'), directory=str(tmp_path))
+    short = recorder.get_daily_bars('ETHUSDT', 'BINANCE', 50)
+    longest = recorder.get_daily_bars('ETHUSDT', 'BINANCE', 150)
+    recorder.get_daily_bars('ETHUSDT', 'BINANCE', 10)  # A later, shorter response keeps the longer recording
+
+    replay = ReplayFeed(directory=str(tmp_path))
+    pd.testing.assert_frame_equal(replay.get_daily_bars('ETHUSDT', 'BINANCE', 150), longest)
+    pd.testing.assert_frame_equal(replay.get_daily_bars('ETHUSDT', 'BINANCE', 50), short)
+    assert replay.get_daily_bars('BTCUSDT', 'BINANCE', 50) is None
+    assert replay.stats['empty'] == 1
+
+
+def test_synthetic_feed_is_deterministic_and_follows_the_schedule():
+    first = SyntheticFeed(history_days=60, end='2024-06-30').get_daily_bars('NDX', 'NASDAQ', 60)
+    second = SyntheticFeed(history_days=60, end='2024-06-30').get_daily_bars('NDX', 'NASDAQ', 60)
+    pd.testing.assert_frame_equal(first, second)
+    assert first.index.weekday.max() <= 4  # The equity group has no weekend bars
+    assert first.index[-1] == pd.Timestamp('2024-06-28')
+
+
+def test_fault_injection_is_counted_and_seeded():
+    def outcomes(seed):
+        feed = SyntheticFeed(history_days=30, end='2024-06-30', error_rate=0.3, seed=seed)
+        failed = []
+        for _ in range(200):
+            try:
+                feed.get_daily_bars('ETHUSDT', 'BINANCE', 10)
+                failed.append(False)
+            except ConnectionError:
+                failed.append(True)
+        return feed, failed
+
+    feed, failed = outcomes(seed=1)
+    assert feed.stats['requests'] == 200
+    assert feed.stats['errors'] == sum(failed)
+    assert 30 < feed.stats['errors'] < 90
+    assert feed.stats['bars'] == 10 * (200 - sum(failed))
+    assert outcomes(seed=1)[1] == failed
+
+
+def test_rate_limit_throttles_requests_over_the_limit():
+    feed = SyntheticFeed(history_days=30, end='2024-06-30', rate_limit=5)
+    responses = [feed.get_daily_bars('ETHUSDT', 'BINANCE', 10) for _ in range(8)]
+    assert all(df is not None for df in responses[:5])
+    assert all(df is None for df in responses[5:])
+    assert feed.stats['throttled'] == 3
+    assert feed.stats['requests'] == 8
+
+
+def test_benchmark_ingest_reports_both_phases(tmp_path):
+    from benchmark_ingest import benchmark_ingest
+    symbols = {'BINANCE:ETHUSDT': 'ETHUSDT', 'BINANCE:SOLUSDT': 'SOLUSDT'}
+    feed = SyntheticFeed(history_days=130, end='2024-06-30')
+    report = benchmark_ingest(feed, symbols, str(tmp_path / 'bench.db'), n_bars=100, update_days=3)
+
+    assert list(report.index) == ['full load', 'daily update']
+    assert report.loc['full load', 'bars_fetched'] == 200
+    assert (report['failed_symbols'] == 0).all()
+    assert report.attrs['stored_bars'] == 200
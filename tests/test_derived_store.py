@@ -0,0 +1,36 @@
+import sqlite3
+import pandas as pd
+from derived_store import connect_derived, save_frame, load_frame, frame_version, read_frame_versions
+
+
+def test_every_write_gets_a_new_version(tmp_path):
+    conn = connect_derived(str(tmp_path / 'derived.db'))
+    try:
+        save_frame(conn, 'result', pd.DataFrame({'a': [1]}))
+        first = frame_version(conn, 'result')
+        # A second write within the same second must still be told apart
+        save_frame(conn, 'result', pd.DataFrame({'a': [2]}))
+        second = frame_version(conn, 'result')
+        assert first != second
+        assert read_frame_versions(conn) == {'result': second}
+        assert load_frame(conn, 'result')['a'].tolist() == [2]
+        assert frame_version(conn, 'missing') is None
+    finally:
+        conn.close()
+
+
+def test_results_stored_before_versions_get_one(tmp_path):
+    db_file = str(tmp_path / 'derived.db')
+    legacy = sqlite3.connect(db_file)
+    legacy.execute("CREATE TABLE derived_frames (name TEXT PRIMARY KEY, updated_at TEXT NOT NULL, payload BLOB NOT NULL)")
+    legacy.execute("INSERT INTO derived_frames VALUES ('old', '2024-01-01 00:00:00', x'00')")
+    legacy.commit()
+    legacy.close()
+
+    conn = connect_derived(db_file)
+    try:
+        assert len(frame_version(conn, 'old')) == 16
+        save_frame(conn, 'new', {'x': 1})
+        assert set(read_frame_versions(conn)) == {'old', 'new'}
+    finally:
+        conn.close()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+import index_builder
+from baskets import all_basket_symbols
+from datafeed import SyntheticFeed
+from derived_store import connect_derived
+from index_builder import build_index, update_synthetic_index
+from store import connect_writer, write_bars
+
+END = pd.Timestamp('2024-06-30')
+SYMBOLS = all_basket_symbols()[:8]
+SPEC = {'basket': {symbol: symbol for symbol in SYMBOLS}, 'weighting': 'volume', 'rebalance': 'W'}
+FULL = dict.fromkeys(SYMBOLS, END)
+
+
+@pytest.fixture(scope='module')
+def bars():
+    """Synthetic daily bars for a few basket symbols, some listed later than others."""
+    feed = SyntheticFeed(history_days=420, end=END)
+    frames = {}
+    for i, symbol in enumerate(SYMBOLS):
+        df = feed.get_daily_bars(symbol, 'BINANCE', 420)[['open', 'high', 'low', 'close', 'volume']]
+        frames[symbol] = df.iloc[i * 15:]
+    return frames
+
+
+@pytest.fixture(autouse=True)
+def derived_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(index_builder, 'connect_derived', lambda: connect_derived(str(tmp_path / 'derived.db')))
+
+
+def _write(conn, bars, through, after=None):
+    """Writes each symbol's bars in (after[symbol], through[symbol]]."""
+    for symbol, df in bars.items():
+        rows = (df.index <= through.get(symbol, pd.Timestamp.min)) & (df.index > (after or {}).get(symbol, pd.Timestamp.min))
+        if rows.any():
+            write_bars(conn, symbol, df[rows])
+
+
+def _read_index(conn):
+    return pd.read_sql('SELECT datetime, close FROM "TEST_INDEX"', conn, index_col='datetime')
+
+
+def _full_build(conn):
+    conn.execute('DROP TABLE "TEST_INDEX"')
+    update_synthetic_index(conn, 'TEST_INDEX', SPEC)
+    return _read_index(conn)
+
+
+def test_equal_daily_index_follows_the_average_daily_return(bars):
+    index_df = build_index(bars, weighting='equal', rebalance='D')
+    closes = pd.DataFrame({symbol: df['close'] for symbol, df in bars.items()})
+    expected = 100 * (1 + closes.pct_change().mean(axis=1).fillna(0)).cumprod()
+    np.testing.assert_allclose(index_df['close'], expected, rtol=1e-9)
+
+
+def test_synthetic_index_appends_match_full_build(bars, tmp_path, capsys):
+    partial = dict.fromkeys(SYMBOLS, END - pd.Timedelta(days=20))
+    with connect_writer(str(tmp_path / 'market.db')) as conn:
+        _write(conn, bars, partial)
+        update_synthetic_index(conn, 'TEST_INDEX', SPEC)
+        _write(conn, bars, FULL, after=partial)
+        update_synthetic_index(conn, 'TEST_INDEX', SPEC)
+        assert 'Appended' in capsys.readouterr().out
+        incremental = _read_index(conn)
+        full = _full_build(conn)
+
+    assert incremental.index.equals(full.index)
+    np.testing.assert_allclose(incremental['close'], full['close'], rtol=1e-9)
+
+
+def test_replaced_constituent_history_rebuilds_the_index(bars, tmp_path, capsys):
+    partial = dict.fromkeys(SYMBOLS, END - pd.Timedelta(days=20))
+    with connect_writer(str(tmp_path / 'market.db')) as conn:
+        _write(conn, bars, partial)
+        update_synthetic_index(conn, 'TEST_INDEX', SPEC)
+
+        # A full refresh that returns the same history plus new bars only appends
+        symbol = SYMBOLS[0]
+        write_bars(conn, symbol, bars[symbol], replace=True)
+        update_synthetic_index(conn, 'TEST_INDEX', SPEC)
+        assert 'Appended' in capsys.readouterr().out
+
+        # A full refresh that corrects a bar deep in the history rebuilds it
+        corrected = bars[symbol].copy()
+        corrected.iloc[100, corrected.columns.get_loc('close')] *= 1.5
+        write_bars(conn, symbol, corrected, replace=True)
+        _write(conn, {s: df for s, df in bars.items() if s != symbol}, FULL, after=partial)
+        update_synthetic_index(conn, 'TEST_INDEX', SPEC)
+        assert 'rebuilding' in capsys.readouterr().out
+        updated = _read_index(conn)
+        full = _full_build(conn)
+
+    assert updated.index.equals(full.index)
+    np.testing.assert_allclose(updated['close'], full['close'], rtol=1e-12)
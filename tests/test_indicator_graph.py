@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+import memo
+from config import MEME_INDEX_SYMBOL
+from datafeed import SyntheticFeed
+from indicator_graph import evaluate_indicators
+from indicators import calculate_regime_scatter_data
+
+END = pd.Timestamp('2024-06-30')
+
+
+@pytest.fixture(autouse=True)
+def no_disk_memo(monkeypatch):
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', False)
+
+
+def _bars(symbol):
+    return SyntheticFeed(history_days=300, end=END).get_daily_bars(symbol, 'CRYPTOCAP', 300)[['close', 'volume']]
+
+
+@pytest.mark.parametrize('in_basket', [False, True])
+def test_meme_strength_reads_the_synthetic_index(in_basket):
+    meme_index, total = _bars(MEME_INDEX_SYMBOL), _bars('TOTAL')
+    data, basket = {'TOTAL': total}, {'DOGE': _bars('DOGE')}
+    (basket if in_basket else data)[MEME_INDEX_SYMBOL] = meme_index
+
+    result = evaluate_indicators(data, basket, names=['meme_strength'])['meme_strength']
+    expected = calculate_regime_scatter_data({MEME_INDEX_SYMBOL: meme_index}, total, lookback_period=30)
+    assert not expected.empty
+    pd.testing.assert_frame_equal(result, expected)
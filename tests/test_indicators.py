@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+import memo
+from datafeed import SyntheticFeed
+from indicators import calculate_rolling_beta
+
+END = pd.Timestamp('2024-06-30')
+
+
+@pytest.fixture(autouse=True)
+def no_disk_memo(monkeypatch):
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', False)
+
+
+def _bars(symbol, days=400, gaps=0.0):
+    df = SyntheticFeed(history_days=days, end=END).get_daily_bars(symbol, 'BINANCE', days)[['close', 'volume']]
+    if gaps:
+        df = df[np.random.default_rng(len(symbol)).random(len(df)) >= gaps]
+    return df
+
+
+@pytest.mark.parametrize('window', [3, 30])
+def test_rolling_beta_matches_pandas_rolling_cov_and_var(window):
+    basket = {f'ALT{i}': _bars(f'ALT{i}', gaps=0.05).iloc[i * 40:] for i in range(4)}
+    benchmark = _bars('BTC', gaps=0.02)
+    result = calculate_rolling_beta(basket, benchmark, window)
+
+    benchmark_returns = benchmark['close'].pct_change()
+    for symbol, df in basket.items():
+        pair = pd.DataFrame({'x': df['close'].pct_change(), 'y': benchmark_returns}).asfreq('D')
+        # A window needs `window` days on which both returns exist
+        pair = pair.where(pair.notna().all(axis=1))
+        covariance = pair['x'].rolling(window).cov(pair['y'])
+        beta = covariance / pair['y'].rolling(window).var()
+        correlation = pair['x'].rolling(window).corr(pair['y'])
+        residual = np.sqrt((pair['x'].rolling(window).var() - beta * covariance).clip(lower=0) * 365)
+
+        for name, expected in (('beta', beta), ('correlation', correlation), ('residual_volatility', residual)):
+            actual = result[name][symbol].reindex(expected.index)
+            pd.testing.assert_series_equal(actual, expected, check_exact=False, rtol=1e-7, atol=1e-10, check_names=False)
@@ -0,0 +1,18 @@
+import pandas as pd
+from intermediates import data_version, get_intermediate
+
+
+def _asset(closes):
+    df = pd.DataFrame({'close': closes}, index=pd.date_range('2024-01-01', periods=len(closes), freq='D'))
+    df.attrs['symbol'] = 'TESTUSDT'
+    return df
+
+
+def test_unversioned_frames_are_versioned_by_content():
+    original = _asset([1.0, 2.0, 4.0, 8.0])
+    corrected = _asset([1.0, 3.0, 4.0, 8.0])  # Same shape, endpoints and last close
+    assert data_version(original) == data_version(original.copy())
+    assert data_version(original) != data_version(corrected)
+
+    pd.testing.assert_series_equal(get_intermediate(original, 'roc', 1), original['close'].pct_change() * 100)
+    pd.testing.assert_series_equal(get_intermediate(corrected, 'roc', 1), corrected['close'].pct_change() * 100)
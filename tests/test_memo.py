@@ -0,0 +1,87 @@
+import importlib
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import memo
+
+
+@pytest.fixture
+def memo_db(monkeypatch, tmp_path):
+    """Points the memo at an empty DB in tmp_path, with fresh source hashes and stats."""
+    monkeypatch.setattr(memo, 'MEMO_DB_FILE', str(tmp_path / 'memo.db'))
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', True)
+    monkeypatch.setattr(memo, '_source_hashes', {})
+    monkeypatch.setattr(memo, '_stats', dict.fromkeys(memo._stats, 0))
+    monkeypatch.setattr(memo._thread_state, 'conn', None, raising=False)
+    yield tmp_path
+    if memo._thread_state.conn is not None:
+        memo._thread_state.conn.close()
+
+
+def _asset(closes, version=None):
+    df = pd.DataFrame({'close': closes}, index=pd.date_range('2024-01-01', periods=len(closes), freq='D'))
+    df.attrs['symbol'] = 'TESTUSDT'
+    if version is not None:
+        df.attrs['version'] = version
+    return df
+
+
+@memo.disk_memo
+def _mean_close(df):
+    return float(df['close'].mean())
+
+
+def test_versioned_asset_is_reused_until_its_version_changes(memo_db):
+    df = _asset([1.0, 2.0, 3.0], version=1)
+    assert _mean_close(df) == 2.0
+    assert _mean_close(df) == 2.0
+    assert (memo._stats['misses'], memo._stats['hits']) == (1, 1)
+
+    corrected = _asset([1.0, 5.0, 3.0], version=2)
+    assert _mean_close(corrected) == 3.0
+    assert memo._stats['misses'] == 2
+
+
+def test_unversioned_asset_is_computed_directly(memo_db):
+    assert _mean_close(_asset([1.0, 2.0, 3.0])) == 2.0
+    # Same length, endpoints and last close: only the middle of the history was corrected
+    assert _mean_close(_asset([1.0, 5.0, 3.0])) == 3.0
+    assert memo._stats['unversioned'] == 2
+    assert memo._stats['hits'] == memo._stats['misses'] == 0
+
+
+def test_editing_a_helper_module_invalidates_entries(memo_db, monkeypatch):
+    helper = memo_db / 'memo_test_helper.py'
+    helper.write_text("def scale():\n    return 2.0\n")
+    monkeypatch.syspath_prepend(str(memo_db))
+    monkeypatch.setattr(memo, 'MEMO_SOURCE_MODULES', memo.MEMO_SOURCE_MODULES + ('memo_test_helper',))
+    import memo_test_helper
+
+    @memo.disk_memo
+    def scaled_mean(df):
+        return float(df['close'].mean()) * memo_test_helper.scale()
+
+    df = _asset([1.0, 2.0, 3.0], version=1)
+    assert scaled_mean(df) == 4.0
+
+    # A new deploy: the helper changed and a fresh process computes the source hashes again
+    helper.write_text("def scale():\n    return 1.5 * 2.0\n")  # Another size, so a stale .pyc is never reused
+    importlib.invalidate_caches()
+    importlib.reload(memo_test_helper)
+    monkeypatch.setattr(memo, '_source_hashes', {})
+    assert scaled_mean(df) == 6.0
+    assert memo._stats['hits'] == 0
+    sys.modules.pop('memo_test_helper', None)
+
+
+def test_non_asset_frames_are_keyed_by_content(memo_db):
+    @memo.disk_memo
+    def total(values):
+        return float(np.nansum(values.to_numpy()))
+
+    frame = pd.DataFrame({'a': [1.0, 2.0]})
+    assert total(frame) == 3.0
+    assert total(frame.copy()) == 3.0
+    assert total(pd.DataFrame({'a': [1.0, 4.0]})) == 5.0
+    assert (memo._stats['hits'], memo._stats['misses']) == (1, 2)
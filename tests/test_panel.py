@@ -0,0 +1,130 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from panel import (
+    RaggedPanel, align_on_calendar, compact_panel, day_numbers_to_datetime, legacy_stamps_to_utc, local_to_utc,
+    normalize_daily_bars, panel_memory_bytes, sum_on_calendar, to_day_numbers,
+)
+
+
+@pytest.fixture
+def new_york_time(monkeypatch):
+    """Runs the test as if this machine's local time zone were New York."""
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _bars(stamps, opens, volumes):
+    opens = np.asarray(opens, dtype=np.float64)
+    return pd.DataFrame({
+        'open': opens, 'high': opens + 2, 'low': opens - 2, 'close': opens + 1, 'volume': np.asarray(volumes, dtype=np.float64)
+    }, index=pd.DatetimeIndex(pd.to_datetime(stamps), name='datetime'))
+
+
+def test_local_stamps_are_converted_to_utc(new_york_time):
+    # tvDatafeed stamps a crypto bar of day D (00:00 UTC) at 19:00 or 20:00 of D-1 in New York
+    local = pd.DatetimeIndex(['2024-01-01 19:00', '2024-07-01 20:00'])
+    expected = pd.DatetimeIndex(['2024-01-02', '2024-07-02'])
+    pd.testing.assert_index_equal(local_to_utc(local), expected)
+    # Stored legacy rows are converted; normalized (midnight UTC) rows are kept
+    stored = pd.DatetimeIndex(['2024-01-01 19:00', '2024-01-03 00:00'])
+    pd.testing.assert_index_equal(legacy_stamps_to_utc(stored), pd.DatetimeIndex(['2024-01-02', '2024-01-03']))
+
+
+def test_restamped_bar_keeps_the_last_volume(new_york_time):
+    # The same bar of 2024-01-02: a legacy local-time row and its UTC re-fetch
+    df = _bars(['2024-01-01 00:00', '2024-01-01 19:00', '2024-01-02 00:00', '2024-01-03 00:00'], [10, 11, 11, 12], [5, 6, 7, 8])
+    df.index = legacy_stamps_to_utc(df.index)
+    normalized = normalize_daily_bars(df)
+    assert list(normalized.index.strftime('%Y-%m-%d')) == ['2024-01-01', '2024-01-02', '2024-01-03']
+    assert normalized['volume'].tolist() == [5, 7, 8]
+    assert normalized['open'].tolist() == [10, 11, 12]
+
+
+def test_distinct_bars_of_one_day_are_merged():
+    df = _bars(['2024-01-01 00:00', '2024-01-01 08:00', '2024-01-01 16:00', '2024-01-02 00:00'], [10, 11, 12, 13], [1, 2, 3, 4])
+    normalized = normalize_daily_bars(df)
+    assert normalized['volume'].tolist() == [6, 4]
+    assert normalized.iloc[0][['open', 'high', 'low', 'close']].tolist() == [10, 14, 8, 13]
+
+
+def _closes(symbol, start, periods, seed):
+    values = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.02, periods)))
+    df = pd.DataFrame({'close': values, 'volume': values * 10}, index=pd.date_range(start, periods=periods, freq='D', name='datetime'))
+    df.attrs.update({'symbol': symbol, 'version': seed})
+    return df
+
+
+def test_compact_panel_shares_one_calendar():
+    data = {
+        'EARLY': _closes('EARLY', '2024-01-01', 60, 1),
+        'LATE': _closes('LATE', '2024-02-10', 30, 2).drop(pd.Timestamp('2024-02-20')),  # A missing bar
+    }
+    compact = compact_panel(data, columns=('close', 'volume'))
+
+    assert compact['EARLY'].index is compact['LATE'].index
+    calendar = day_numbers_to_datetime(compact['EARLY'].index)
+    assert calendar[0] == pd.Timestamp('2024-01-01') and calendar[-1] == pd.Timestamp('2024-03-10')
+    for symbol, df in data.items():
+        panel = compact[symbol].set_axis(calendar)
+        assert panel.dtypes.tolist() == [np.float32, np.float32]
+        np.testing.assert_allclose(panel.loc[df.index].to_numpy(), df[['close', 'volume']].to_numpy(), rtol=1e-6)
+        assert panel.drop(df.index).isna().all().all()  # Days before listing or without a bar
+        assert compact[symbol].attrs == df.attrs
+    assert panel_memory_bytes(compact) < panel_memory_bytes(data)
+
+
+def test_compact_panel_keeps_the_last_bar_of_a_day():
+    df = _closes('DUP', '2024-01-01', 3, 3)
+    df = pd.concat([df, df.iloc[[1]] * 2]).sort_index(kind='stable')
+    compact = compact_panel({'DUP': df})['DUP']
+    np.testing.assert_allclose(compact['close'].to_numpy(), df['close'].to_numpy()[[0, 2, 3]], rtol=1e-6)
+
+
+def _ragged_series():
+    """Series listed on different days, with missing values inside and one empty series."""
+    rng = np.random.default_rng(4)
+    series = {}
+    for i, (start, periods) in enumerate((('2024-01-05', 40), ('2024-01-01', 20), ('2024-01-20', 35))):
+        s = pd.Series(rng.normal(0, 1, periods), index=pd.date_range(start, periods=periods, freq='D', name='datetime'))
+        series[f'S{i}'] = s.drop(s.index[[3, 7]]) if i == 0 else s
+    series['S1'].iloc[:2] = np.nan  # Leading NaNs are outside the active range
+    series['EMPTY'] = pd.Series(dtype=np.float64)
+    return series
+
+
+def test_ragged_panel_matches_the_dense_panel():
+    series = _ragged_series()
+    dense = align_on_calendar(series)
+    panel = RaggedPanel(series)
+
+    pd.testing.assert_frame_equal(panel.to_frame(), dense, check_names=False)
+    pd.testing.assert_series_equal(panel.sum(), dense.sum(axis=1), check_names=False)
+    pd.testing.assert_series_equal(panel.count(), dense.count(axis=1), check_names=False)
+    assert panel.nbytes < dense.to_numpy().nbytes
+
+    # A second panel on the same active ranges combines cell by cell
+    doubled = RaggedPanel({name: s * 2 for name, s in series.items()}, like=panel)
+    difference = panel.map(lambda values, other, days: other - values, doubled)
+    pd.testing.assert_frame_equal(difference.to_frame(), dense, check_names=False)
+    benchmark = panel.align(series['S2'])
+    assert np.isnan(benchmark[:19]).all() and np.array_equal(benchmark[19:], series['S2'].to_numpy())
+
+
+def test_sum_on_calendar_adds_partials_on_the_union_calendar():
+    series = _ragged_series()
+    partials = [series['S0'].dropna(), series['S1'].dropna(), series['S2']]
+    expected = pd.concat(partials, axis=1).fillna(0).sum(axis=1).asfreq('D', fill_value=0)
+    pd.testing.assert_series_equal(sum_on_calendar(partials), expected, check_names=False, check_freq=False)
+
+    # Day-number partials and DataFrames with integer counts
+    frames = [pd.DataFrame({'count': np.ones(len(p), dtype=np.int64), 'value': p.to_numpy()}, index=to_day_numbers(p.index)) for p in partials]
+    summed = sum_on_calendar(frames)
+    assert summed.dtypes.tolist() == [np.int64, np.float64]
+    assert summed.index[0] == to_day_numbers(expected.index[:1])[0]
+    np.testing.assert_allclose(summed['value'].to_numpy(), expected.to_numpy())
+    assert summed['count'].tolist() == pd.concat(partials, axis=1).notna().sum(axis=1).asfreq('D', fill_value=0).tolist()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+import memo
+import regime_breadth
+from baskets import all_basket_symbols
+from datafeed import SyntheticFeed
+from derived_store import connect_derived, load_frame
+from indicators import calculate_traffic_light
+from store import connect_writer, write_bars
+
+END = pd.Timestamp('2024-06-30')
+HISTORY_DAYS = 1100  # Longer than the warm-up, so incremental updates only re-read a tail
+SYMBOLS = all_basket_symbols()[:8]
+# Most symbols are 3 days behind the end, two lag 10 days (a failed ingest) and catch up afterwards
+PARTIAL = {symbol: END - pd.Timedelta(days=10 if i % 4 == 1 else 3) for i, symbol in enumerate(SYMBOLS)}
+FULL = dict.fromkeys(SYMBOLS, END)
+
+
+@pytest.fixture(autouse=True)
+def no_disk_memo(monkeypatch):
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', False)
+
+
+def _bars(gap):
+    """Synthetic daily bars for a few basket symbols, some listed later than others."""
+    feed = SyntheticFeed(history_days=HISTORY_DAYS, end=END)
+    frames = {}
+    for i, symbol in enumerate(SYMBOLS):
+        df = feed.get_daily_bars(symbol, 'BINANCE', HISTORY_DAYS)[['open', 'high', 'low', 'close', 'volume']]
+        frames[symbol] = df.iloc[i * 15:]
+    if gap:
+        # 450 missing days inside the warm-up: counted in calendar days, the slow SMA would lack bars
+        symbol = SYMBOLS[3]
+        frames[symbol] = frames[symbol].drop(pd.date_range(END - pd.Timedelta(days=560), END - pd.Timedelta(days=111)))
+    return frames
+
+
+def _write(conn, bars, through, after=None):
+    """Writes each symbol's bars in (after[symbol], through[symbol]]."""
+    for symbol, df in bars.items():
+        rows = (df.index <= through.get(symbol, pd.Timestamp.min)) & (df.index > (after or {}).get(symbol, pd.Timestamp.min))
+        if rows.any():
+            write_bars(conn, symbol, df[rows])
+
+
+def _stored(derived_file):
+    conn = connect_derived(str(derived_file))
+    try:
+        return load_frame(conn, regime_breadth.REGIMES_FRAME)
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('gap', [False, True])
+def test_incremental_update_matches_full_rebuild(tmp_path, monkeypatch, gap):
+    bars = _bars(gap)
+    incremental_file, full_file = tmp_path / 'incremental.db', tmp_path / 'full.db'
+
+    monkeypatch.setattr(regime_breadth, 'connect_derived', lambda: connect_derived(str(incremental_file)))
+    with connect_writer(str(tmp_path / 'market.db')) as conn:
+        _write(conn, bars, PARTIAL)
+        regime_breadth.update_regime_breadth(conn)
+        _write(conn, bars, FULL, after=PARTIAL)
+        regime_breadth.update_regime_breadth(conn, set(SYMBOLS))
+
+    monkeypatch.setattr(regime_breadth, 'connect_derived', lambda: connect_derived(str(full_file)))
+    with connect_writer(str(tmp_path / 'market_full.db')) as conn:
+        _write(conn, bars, FULL)
+        regime_breadth.update_regime_breadth(conn)
+
+    incremental, full = _stored(incremental_file), _stored(full_file)
+    assert incremental is not None
+    pd.testing.assert_frame_equal(incremental, full)
+
+
+def test_asset_regimes_match_the_traffic_light():
+    bars = _bars(gap=True)
+    regimes = regime_breadth.calculate_asset_regimes(bars, *regime_breadth.REGIME_LENGTHS)
+    for symbol, df in bars.items():
+        traffic_light = calculate_traffic_light(df)
+        codes = np.select(
+            [traffic_light['regime_color'].str.startswith('rgba(87'), traffic_light['regime_color'].str.startswith('rgba(255, 82')],
+            [1.0, -1.0], default=0.0
+        )
+        pd.testing.assert_series_equal(
+            regimes[symbol].dropna(), pd.Series(codes, index=traffic_light.index), check_names=False, check_freq=False
+        )
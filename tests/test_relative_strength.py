@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+import relative_strength
+from baskets import all_basket_symbols
+from config import RS_BENCHMARKS
+from datafeed import SyntheticFeed
+from derived_store import connect_derived, load_frame
+from relative_strength import RS_FRAME_NAMES, _row_percentiles, _row_ranks
+from store import connect_writer, write_bars
+
+END = pd.Timestamp('2024-06-30')
+SYMBOLS = [*RS_BENCHMARKS, *all_basket_symbols()[:8]]
+# Most symbols are 3 days behind the end, two lag 12 days (a failed ingest) and catch up afterwards
+PARTIAL = {symbol: END - pd.Timedelta(days=12 if i % 4 == 1 else 3) for i, symbol in enumerate(SYMBOLS)}
+FULL = dict.fromkeys(SYMBOLS, END)
+
+
+def _panel(seed=0):
+    """Returns with many ties and missing values, one row with a single valid value."""
+    values = np.round(np.random.default_rng(seed).normal(0, 1, (300, 12)), 1)
+    values[np.random.default_rng(seed + 1).random(values.shape) < 0.2] = np.nan
+    values[0, 1:] = np.nan
+    return pd.DataFrame(values)
+
+
+def test_percentiles_and_ranks_match_pandas_average_ranks():
+    panel = _panel()
+    count = panel.count(axis=1)
+    # rank(pct=True) is rank / count; the percentiles map the lowest to 0 and the highest to 1
+    expected = (panel.rank(axis=1, pct=True).mul(count, axis=0) - 1).div(count - 1, axis=0)
+    expected[count == 1] = expected[count == 1].where(panel[count == 1].isna(), 0.5)
+    np.testing.assert_allclose(_row_percentiles(panel.to_numpy()), expected.to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(_row_ranks(panel.to_numpy()), panel.rank(axis=1, ascending=False).to_numpy(), rtol=1e-12)
+
+
+def _bars():
+    feed = SyntheticFeed(history_days=400, end=END)
+    frames = {}
+    for i, symbol in enumerate(SYMBOLS):
+        df = feed.get_daily_bars(symbol, 'BINANCE', 400)[['open', 'high', 'low', 'close', 'volume']]
+        frames[symbol] = df.iloc[i * 20:]
+    # No bars around the start of the longest horizon before the first re-ranked day
+    symbol = SYMBOLS[3]
+    frames[symbol] = frames[symbol].drop(pd.date_range(END - pd.Timedelta(days=130), END - pd.Timedelta(days=20)))
+    return frames
+
+
+def _write(conn, bars, through, after=None):
+    for symbol, df in bars.items():
+        rows = (df.index <= through[symbol]) & (df.index > (after or {}).get(symbol, pd.Timestamp.min))
+        if rows.any():
+            write_bars(conn, symbol, df[rows])
+
+
+def _stored(derived_file):
+    conn = connect_derived(str(derived_file))
+    try:
+        return {name: load_frame(conn, f'relative_strength:{name}') for name in RS_FRAME_NAMES}
+    finally:
+        conn.close()
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path, monkeypatch):
+    bars = _bars()
+    incremental_file, full_file = tmp_path / 'incremental.db', tmp_path / 'full.db'
+
+    monkeypatch.setattr(relative_strength, 'connect_derived', lambda: connect_derived(str(incremental_file)))
+    reads = []
+    read_basket = relative_strength.read_basket
+    monkeypatch.setattr(relative_strength, 'read_basket', lambda conn, names, since=None: reads.append(since) or read_basket(conn, names, since))
+    with connect_writer(str(tmp_path / 'market.db')) as conn:
+        _write(conn, bars, PARTIAL)
+        relative_strength.update_relative_strength(conn)
+        _write(conn, bars, FULL, after=PARTIAL)
+        relative_strength.update_relative_strength(conn, set(SYMBOLS))
+    assert reads[0] is None and reads[1] is not None  # The second run only re-read a tail
+
+    monkeypatch.setattr(relative_strength, 'connect_derived', lambda: connect_derived(str(full_file)))
+    with connect_writer(str(tmp_path / 'market_full.db')) as conn:
+        _write(conn, bars, FULL)
+        relative_strength.update_relative_strength(conn)
+
+    incremental, full = _stored(incremental_file), _stored(full_file)
+    assert incremental['ranks'].index[-1] == END
+    for name in RS_FRAME_NAMES:
+        pd.testing.assert_frame_equal(incremental[name], full[name], check_exact=False, rtol=1e-9, check_freq=False)
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+import memo
+from datafeed import SyntheticFeed
+from indicators import (
+    calculate_assets_above_ma, calculate_stablecoin_vs_total_roc, calculate_traffic_light,
+    calculate_market_character, calculate_official_altcoin_season_index,
+)
+from replay import AssetsAboveMAReplay, MarketFlowReplay, MoVolReplay, TrafficLightReplay, replay_signals
+
+END = pd.Timestamp('2024-06-30')
+
+
+@pytest.fixture(autouse=True)
+def no_disk_memo(monkeypatch):
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', False)
+
+
+def _bars(symbol, days=900):
+    df = SyntheticFeed(history_days=days, end=END).get_daily_bars(symbol, 'CRYPTOCAP', days)
+    return df[['close', 'volume']]
+
+
+def test_traffic_light_replay_matches_indicator():
+    total = _bars('TOTAL')
+    tracker = TrafficLightReplay()
+    replayed = pd.Series([tracker.step(close) for close in total['close']], index=total.index).dropna()
+
+    expected = calculate_traffic_light(total)
+    codes = np.select(
+        [expected['regime_color'].str.startswith('rgba(87'), expected['regime_color'].str.startswith('rgba(255, 82')],
+        [1, -1], default=0
+    )
+    pd.testing.assert_series_equal(replayed.astype(int), pd.Series(codes, index=expected.index), check_names=False)
+
+
+def test_market_flow_replay_matches_indicator():
+    total, usdt_d, usdc_d = _bars('TOTAL'), _bars('USDT.D'), _bars('USDC.D')
+    tracker = MarketFlowReplay()
+    rows = [tracker.step(*closes) for closes in zip(total['close'], usdt_d['close'], usdc_d['close'])]
+    replayed = pd.DataFrame(rows, index=total.index, columns=['roc_total', 'roc_stable_inv']).dropna()
+    pd.testing.assert_frame_equal(replayed, calculate_stablecoin_vs_total_roc(total, usdt_d, usdc_d), check_freq=False)
+
+
+def test_assets_above_ma_replay_matches_indicator():
+    basket = {f'ASSET{i}': _bars(f'ASSET{i}').iloc[i * 40:] for i in range(6)}  # Listed on different days
+    closes = pd.DataFrame({symbol: df['close'] for symbol, df in basket.items()})
+    tracker = AssetsAboveMAReplay(len(basket), ma_length=50)
+    replayed = pd.Series([tracker.step(row) for row in closes.to_numpy()], index=closes.index).dropna()
+    expected = calculate_assets_above_ma(basket, 50)
+    np.testing.assert_allclose(replayed.loc[expected.index], expected)
+    assert replayed.index.equals(expected.index)
+
+
+def test_official_asi_replay_matches_indicator():
+    basket = {f'ALT{i}': _bars(f'ALT{i}') for i in range(5)}
+    macro = {'TOTAL': _bars('TOTAL'), 'BTCUSD': _bars('BTCUSD'), 'BTC_D': _bars('BTC.D')}
+    series, _ = replay_signals(macro, {'Test': basket})
+    expected = calculate_official_altcoin_season_index(basket, macro['BTCUSD'], macro['BTC_D'])
+    replayed = series['asi:Test'].dropna()
+    common = replayed.index.intersection(expected.index)
+    assert len(common) > 300
+    np.testing.assert_allclose(replayed.loc[common], expected['altcoin_season_index'].loc[common], rtol=1e-6, atol=1e-6)
+
+
+def _with_gaps(df, seed, block=None):
+    """Drops a tenth of the rows at random, and optionally a block of consecutive rows (missing bars)."""
+    keep = np.random.default_rng(seed).random(len(df)) >= 0.1
+    if block is not None:
+        keep[block] = False
+    return df[keep]
+
+
+def test_official_asi_replay_matches_indicator_with_missing_bars():
+    basket = {f'ALT{i}': _bars(f'ALT{i}') for i in range(5)}
+    basket['ALT0'] = _with_gaps(basket['ALT0'], 0, block=slice(400, 430))
+    basket['ALT1'] = _with_gaps(basket['ALT1'], 1)
+    macro = {'TOTAL': _bars('TOTAL'), 'BTCUSD': _with_gaps(_bars('BTCUSD'), 2), 'BTC_D': _bars('BTC.D')}
+    series, _ = replay_signals(macro, {'Test': basket})
+    expected = calculate_official_altcoin_season_index(basket, macro['BTCUSD'], macro['BTC_D'])
+    replayed = series['asi:Test'].dropna()
+    assert replayed.index.equals(expected.index)
+    np.testing.assert_allclose(replayed, expected['altcoin_season_index'], rtol=1e-6, atol=1e-6)
+
+
+def test_movol_replay_matches_indicator_with_missing_bars():
+    basket = {f'ALT{i}': _with_gaps(_bars(f'ALT{i}', days=200), i) for i in range(5)}
+    basket['ALT4'] = basket['ALT4'].iloc[120:]  # Listed late: not on the map until it has 30 bars
+    closes = pd.DataFrame({symbol: df['close'] for symbol, df in basket.items()})
+    tracker = MoVolReplay(len(basket))
+    replayed = pd.DataFrame(
+        [tracker.step(row) for row in closes.to_numpy()], index=closes.index, columns=['momentum', 'volatility']
+    )
+    for date in closes.index[40::15]:
+        expected = calculate_market_character({symbol: df[df.index <= date] for symbol, df in basket.items()})
+        np.testing.assert_allclose(replayed.loc[date], expected.median(), rtol=1e-9)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from rolling import SortedWindow, _SortedList, rolling_percentile_rank, rolling_robust_zscore
+
+WINDOW = 150  # Larger than two blocks, so blocks split and empty while the window slides
+
+
+def _series(ties=False, seed=0):
+    values = np.random.default_rng(seed).normal(0, 1, 1500)
+    if ties:
+        values = np.round(values, 1)  # Many repeated values
+    values[[200, 201, 900]] = np.nan
+    return pd.Series(values, index=pd.date_range('2020-01-01', periods=len(values), freq='D'))
+
+
+def _rolling_mad(series, window):
+    return series.rolling(window).apply(lambda x: np.median(np.abs(x - np.median(x))), raw=True)
+
+
+def test_sorted_list_matches_a_sorted_python_list():
+    rng = np.random.default_rng(1)
+    sorted_list, reference = _SortedList(), []
+    for step in range(5000):
+        if reference and rng.random() < 0.45:
+            value = reference[rng.integers(len(reference))]
+            sorted_list.remove(value)
+            reference.remove(value)
+        else:
+            value = float(rng.integers(0, 300))
+            sorted_list.add(value)
+            reference.append(value)
+            reference.sort()
+        if step % 97 == 0:
+            assert len(sorted_list) == len(reference)
+            assert [sorted_list[k] for k in range(len(reference))] == reference
+            probe = float(rng.integers(-5, 305))
+            assert sorted_list.bisect_left(probe) == sum(v < probe for v in reference)
+            assert sorted_list.bisect_right(probe) == sum(v <= probe for v in reference)
+
+
+@pytest.mark.parametrize('ties', [False, True])
+def test_rolling_percentile_rank_matches_pandas_rank(ties):
+    series = _series(ties)
+    # pandas' average rank is 1-based; the mid-rank counts half of the equal values
+    expected = (series.rolling(WINDOW).rank(pct=True) - 0.5 / WINDOW) * 100
+    pd.testing.assert_series_equal(rolling_percentile_rank(series, WINDOW), expected, check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize('window', [WINDOW, WINDOW + 1])
+@pytest.mark.parametrize('ties', [False, True])
+def test_sorted_window_median_and_mad_match_pandas(window, ties):
+    series = _series(ties, seed=window)
+    sorted_window, medians, mads = SortedWindow(window), [], []
+    for value in series:
+        sorted_window.push(value)
+        medians.append(sorted_window.median())
+        mads.append(sorted_window.mad())
+    np.testing.assert_allclose(medians, series.rolling(window).median(), rtol=1e-12)
+    np.testing.assert_allclose(mads, _rolling_mad(series, window), rtol=1e-12)
+
+
+def test_rolling_robust_zscore_matches_pandas():
+    series = _series(seed=3)
+    median = series.rolling(WINDOW).median()
+    expected = (series - median) / (1.4826 * _rolling_mad(series, WINDOW))
+    pd.testing.assert_series_equal(rolling_robust_zscore(series, WINDOW), expected, check_exact=False, rtol=1e-9)
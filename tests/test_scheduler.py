@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import pytest
+import scheduler
+from config import SCHEDULE_GROUPS
+from derived_store import connect_derived
+
+
+class _StopLoop(Exception):
+    pass
+
+
+def _simulate(monkeypatch, tmp_path, start, days):
+    """Drives Scheduler.run_forever on a simulated clock and returns the (group, close) runs."""
+    clock = [start]
+    end = start + timedelta(days=days)
+
+    def sleep(seconds):
+        clock[0] += timedelta(seconds=seconds)
+        if clock[0] >= end:
+            raise _StopLoop
+
+    monkeypatch.setattr(scheduler, '_utc_now', lambda: clock[0])
+    monkeypatch.setattr(scheduler.time, 'sleep', sleep)
+    monkeypatch.setattr(scheduler, 'connect_derived', lambda: connect_derived(str(tmp_path / 'derived.db')))
+    sched = scheduler.Scheduler(db_file=str(tmp_path / 'market.db'))
+    runs = []
+    sched.run_group = lambda name, close: runs.append((name, close, clock[0]))
+    try:
+        with pytest.raises(_StopLoop):
+            sched.run_forever()
+    finally:
+        sched.close()
+    return runs
+
+
+def test_each_group_runs_once_per_close(monkeypatch, tmp_path):
+    start = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)  # A Monday
+    runs = _simulate(monkeypatch, tmp_path, start, days=3)
+
+    crypto = [close for name, close, _ in runs if name == 'crypto']
+    equities = [close for name, close, _ in runs if name == 'us_equities']
+    assert crypto == [datetime(2026, 10, day, tzinfo=timezone.utc) for day in (20, 21, 22)]
+    new_york = ZoneInfo('America/New_York')
+    assert equities == [datetime(2026, 10, day, 16, 0, tzinfo=new_york) for day in (19, 20, 21)]
+    for name, close, ran_at in runs:
+        wake = close + timedelta(minutes=SCHEDULE_GROUPS[name]['offset_minutes'])
+        assert wake <= ran_at < wake + timedelta(seconds=scheduler.MAX_SLEEP_SECONDS)
+
+
+def test_weekend_has_no_equity_runs(monkeypatch, tmp_path):
+    start = datetime(2026, 10, 23, 12, 0, tzinfo=timezone.utc)  # A Friday
+    runs = _simulate(monkeypatch, tmp_path, start, days=3)
+
+    assert [close.day for name, close, _ in runs if name == 'us_equities'] == [23]
+    assert [close.day for name, close, _ in runs if name == 'crypto'] == [24, 25, 26]
+
+
+def test_failed_run_advances_to_next_close(monkeypatch, tmp_path):
+    monkeypatch.setattr(scheduler, 'connect_derived', lambda: connect_derived(str(tmp_path / 'derived.db')))
+    sched = scheduler.Scheduler(db_file=str(tmp_path / 'market.db'))
+    calls = []
+
+    def failing_run(name, close):
+        calls.append(name)
+        raise RuntimeError("feed down")
+
+    sched.run_group = failing_run
+    try:
+        now = datetime(2026, 10, 19, 23, 0, tzinfo=timezone.utc)
+        sched.run_due(now)
+        assert calls == []
+        sched.run_due(now + timedelta(hours=2))
+        assert calls == ['crypto']
+        assert sched._wakes['crypto'] == datetime(2026, 10, 21, 0, 5, tzinfo=timezone.utc)
+    finally:
+        sched.close()
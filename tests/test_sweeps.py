@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+import memo
+from datafeed import SyntheticFeed
+from indicators import (
+    calculate_assets_above_ma, calculate_eth_breadth_wave, calculate_market_character,
+    calculate_official_altcoin_season_index,
+)
+from sweeps import (
+    sweep_assets_above_ma, sweep_eth_breadth_wave, sweep_market_character,
+    sweep_official_altcoin_season_index, sweep_roc, sweep_sma,
+)
+
+END = pd.Timestamp('2024-06-30')
+
+
+@pytest.fixture(autouse=True)
+def no_disk_memo(monkeypatch):
+    monkeypatch.setattr(memo, 'MEMO_ENABLED', False)
+
+
+def _bars(symbol, days=900, gaps=0.0):
+    """Synthetic daily bars with a fraction of the days dropped at random (missing bars)."""
+    df = SyntheticFeed(history_days=days, end=END).get_daily_bars(symbol, 'CRYPTOCAP', days)[['close', 'volume']]
+    if gaps:
+        keep = np.random.default_rng(len(symbol) + days).random(len(df)) >= gaps
+        df = df[keep]
+    return df
+
+
+@pytest.fixture
+def basket():
+    # Listed on different days, with missing bars and one asset too short for the longest windows
+    basket = {f'ALT{i}': _bars(f'ALT{i}', gaps=0.1).iloc[i * 60:] for i in range(5)}
+    basket['SHORT'] = _bars('SHORT', days=40, gaps=0.1)
+    return basket
+
+
+def test_sweep_sma_and_roc_match_each_asset(basket):
+    smas, rocs = sweep_sma(basket, [5, 30]), sweep_roc(basket, [5, 30])
+    for length in (5, 30):
+        for symbol, df in basket.items():
+            expected_sma = df['close'].rolling(length).mean()
+            expected_roc = df['close'].pct_change(length) * 100
+            pd.testing.assert_series_equal(smas.loc[length, symbol].loc[df.index], expected_sma, check_names=False)
+            pd.testing.assert_series_equal(rocs.loc[length, symbol].loc[df.index], expected_roc, check_names=False)
+
+
+def test_sweep_breadth_matches_indicators(basket):
+    above = sweep_assets_above_ma(basket, [20, 50])
+    for length in (20, 50):
+        pd.testing.assert_series_equal(
+            above.loc[length, 'percentage_above'], calculate_assets_above_ma(basket, length),
+            check_freq=False, check_names=False
+        )
+
+    benchmark = _bars('ETH', gaps=0.05)
+    waves = sweep_eth_breadth_wave(basket, benchmark, [7, 30])
+    for lookback in (7, 30):
+        expected = calculate_eth_breadth_wave(basket, benchmark, lookback)
+        pd.testing.assert_frame_equal(
+            waves.loc[lookback].loc[expected.index], expected, check_freq=False, check_names=False
+        )
+
+
+def test_sweep_market_character_matches_indicator(basket):
+    sweep = sweep_market_character(basket, [14, 60])
+    for lookback in (14, 60):
+        expected = calculate_market_character(basket, lookback)
+        pd.testing.assert_frame_equal(sweep.loc[lookback], expected, check_names=False)
+    assert 'SHORT' not in sweep.loc[60].index
+
+
+def test_sweep_official_asi_matches_indicator(basket):
+    benchmark, btcd = _bars('ETH', gaps=0.05), _bars('BTC.D')
+    sweep = sweep_official_altcoin_season_index(basket, benchmark, btcd, lookback_periods=(30,), normalization_windows=(90,))
+    expected = calculate_official_altcoin_season_index(basket, benchmark, btcd, lookback_period=30, normalization_window=90)
+    pd.testing.assert_frame_equal(sweep.loc[(30, 90)], expected, check_freq=False, check_names=False)
@@ -0,0 +1,105 @@
+from collections import Counter, OrderedDict
+import numpy as np
+import pandas as pd
+import pytest
+import utils
+from datafeed import SyntheticFeed
+from store import connect_writer, read_pool, write_bars
+
+END = pd.Timestamp('2024-06-30')
+SYMBOLS = ['ETHUSDT', 'SOLUSDT', 'DOGEUSDT']
+
+
+@pytest.fixture
+def market_db(monkeypatch, tmp_path):
+    """A market data DB with a few symbols, read through a pool of its own and an empty frame cache."""
+    db_file = str(tmp_path / 'market_data.db')
+    feed = SyntheticFeed(history_days=200, end=END)
+    with connect_writer(db_file) as conn:
+        for symbol in SYMBOLS:
+            write_bars(conn, symbol, feed.get_daily_bars(symbol, 'BINANCE', 200)[['open', 'high', 'low', 'close', 'volume']])
+    monkeypatch.setattr(utils, 'read_pool', lambda: read_pool(db_file))
+    monkeypatch.setattr(utils, '_frame_cache', OrderedDict())
+    yield db_file
+    read_pool(db_file).close()
+
+
+def test_load_requests_reads_shared_tables_once(market_db, monkeypatch):
+    reads = Counter()
+    read_table = utils._read_table
+
+    def counting_read_table(table_name, selected_columns, version):
+        reads[table_name] += 1
+        return read_table(table_name, selected_columns, version)
+
+    monkeypatch.setattr(utils, '_read_table', counting_read_table)
+    loaded = utils._load_requests(
+        {'assets': ['ETHUSDT', 'SOLUSDT'], 'macro': ['SOLUSDT', 'DOGEUSDT'], 'index': ['MEME_INDEX']},
+        optional=('index',)
+    )
+
+    assert reads == Counter(SYMBOLS)
+    assert list(loaded['assets']) == ['ETHUSDT', 'SOLUSDT']
+    assert list(loaded['macro']) == ['SOLUSDT', 'DOGEUSDT']
+    assert loaded['index'] is None
+    assert loaded['macro']['SOLUSDT'].attrs['symbol'] == 'SOLUSDT'
+    assert len(loaded['assets']['ETHUSDT']) == 200
+
+    compact = utils._load_requests({'assets': SYMBOLS}, compact=True, columns=('close',))['assets']
+    full = {**loaded['assets'], **loaded['macro']}
+    for symbol in SYMBOLS:
+        assert list(compact[symbol].columns) == ['close']
+        np.testing.assert_allclose(compact[symbol]['close'], full[symbol]['close'], rtol=1e-6)
+
+
+def test_callers_cannot_change_the_cached_frames(market_db):
+    first = utils._load_requests({'data': ['ETHUSDT']})['data']['ETHUSDT']
+    expected = first.copy()
+
+    with pytest.raises(ValueError):
+        first['open'].to_numpy()[0] = 0.0  # Shared values are read-only
+    first['close'] = 0.0
+    first.drop(columns='volume', inplace=True)
+    first.attrs['symbol'] = 'CHANGED'
+
+    second = utils._load_requests({'data': ['ETHUSDT']})['data']['ETHUSDT']
+    pd.testing.assert_frame_equal(second, expected)
+    assert second.attrs['symbol'] == 'ETHUSDT'
+    assert len(utils._frame_cache) == 1
+
+
+def test_data_versions_change_only_with_their_tables(market_db):
+    before = utils.data_versions(['ETHUSDT', 'MISSING'], ['SOLUSDT'])
+    assert [table for table, _ in before] == ['ETHUSDT', 'SOLUSDT']
+    assert utils.data_versions(['ETHUSDT'], ['SOLUSDT']) == before
+
+    with connect_writer(market_db) as conn:
+        write_bars(conn, 'SOLUSDT', SyntheticFeed(history_days=10, end=END + pd.Timedelta(days=10)).get_daily_bars('SOLUSDT', 'BINANCE', 5)[['close']])
+    after = dict(utils.data_versions(['ETHUSDT'], ['SOLUSDT']))
+    assert after['ETHUSDT'] == dict(before)['ETHUSDT']
+    assert after['SOLUSDT'] != dict(before)['SOLUSDT']
+
+
+def test_cached_figure_builds_once_per_key_and_evicts_the_oldest(monkeypatch):
+    import plotly.graph_objects as go
+    monkeypatch.setattr(utils, '_figure_cache', OrderedDict())
+    monkeypatch.setattr(utils, 'MAX_CACHED_FIGURES', 2)
+    builds = []
+
+    def build(key):
+        def make():
+            builds.append(key)
+            return go.Figure(go.Scatter(x=[1, 2, 3], y=[key, key * 2, key * 3]), layout={'title': {'text': f'figure {key}'}})
+        return make
+
+    first = utils.cached_figure(('page', 1), build(1))
+    again = utils.cached_figure(('page', 1), build(1))
+    assert builds == [1]
+    assert again is not first and again.to_dict() == first.to_dict()  # Each caller gets its own figure
+
+    utils.cached_figure(('page', 2), build(2))
+    utils.cached_figure(('page', 1), build(1))  # Now the most recently used
+    utils.cached_figure(('page', 3), build(3))  # Evicts ('page', 2)
+    assert list(utils._figure_cache) == [('page', 1), ('page', 3)]
+    utils.cached_figure(('page', 2), build(2))
+    assert builds == [1, 2, 3, 2]
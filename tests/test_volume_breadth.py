@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+import volume_breadth
+from baskets import all_basket_symbols
+from datafeed import SyntheticFeed
+from derived_store import connect_derived, load_frame
+from store import connect_writer, write_bars
+
+END = pd.Timestamp('2024-06-30')
+SYMBOLS = all_basket_symbols()[:8]
+# Most symbols are 3 days behind the end, two lag 10 days (a failed ingest) and catch up afterwards
+PARTIAL = {symbol: END - pd.Timedelta(days=10 if i % 4 == 1 else 3) for i, symbol in enumerate(SYMBOLS)}
+FULL = dict.fromkeys(SYMBOLS, END)
+
+
+def _bars(gap):
+    """Synthetic daily bars for a few basket symbols, some listed later than others."""
+    feed = SyntheticFeed(history_days=420, end=END)
+    frames = {}
+    for i, symbol in enumerate(SYMBOLS):
+        df = feed.get_daily_bars(symbol, 'BINANCE', 420)[['open', 'high', 'low', 'close', 'volume']]
+        frames[symbol] = df.iloc[i * 15:]
+    if gap:
+        # No bars for 25 days up to shortly before the first recomputed day
+        symbol = SYMBOLS[2]
+        frames[symbol] = frames[symbol].drop(pd.date_range(END - pd.Timedelta(days=30), END - pd.Timedelta(days=6)))
+    return frames
+
+
+def _write(conn, bars, through, after=None):
+    """Writes each symbol's bars in (after[symbol], through[symbol]]."""
+    for symbol, df in bars.items():
+        rows = (df.index <= through.get(symbol, pd.Timestamp.min)) & (df.index > (after or {}).get(symbol, pd.Timestamp.min))
+        if rows.any():
+            write_bars(conn, symbol, df[rows])
+
+
+def _stored(derived_file, names):
+    conn = connect_derived(str(derived_file))
+    try:
+        return {name: load_frame(conn, name) for name in names}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('gap', [False, True])
+def test_incremental_update_matches_full_rebuild(tmp_path, monkeypatch, gap):
+    bars = _bars(gap)
+    names = [f'{volume_breadth.VOLUME_BREADTH_FRAME}:{name}' for name in volume_breadth.BASKETS]
+    incremental_file, full_file = tmp_path / 'incremental.db', tmp_path / 'full.db'
+
+    monkeypatch.setattr(volume_breadth, 'connect_derived', lambda: connect_derived(str(incremental_file)))
+    with connect_writer(str(tmp_path / 'market.db')) as conn:
+        _write(conn, bars, PARTIAL)
+        volume_breadth.update_volume_breadth(conn)
+        _write(conn, bars, FULL, after=PARTIAL)
+        volume_breadth.update_volume_breadth(conn, set(SYMBOLS))
+
+    monkeypatch.setattr(volume_breadth, 'connect_derived', lambda: connect_derived(str(full_file)))
+    with connect_writer(str(tmp_path / 'market_full.db')) as conn:
+        _write(conn, bars, FULL)
+        volume_breadth.update_volume_breadth(conn)
+
+    incremental, full = _stored(incremental_file, names), _stored(full_file, names)
+    for name in names:
+        assert incremental[name] is not None, name
+        pd.testing.assert_frame_equal(incremental[name], full[name], check_exact=False, rtol=1e-9)
@@ -0,0 +1,48 @@
+import pytest
+import warmup
+from config import BASKETS
+
+BASKET_STEPS = ('_warm_altcoin_season', '_warm_ad_line', '_warm_eth_wave', '_warm_basket_maps', '_warm_correlation', '_warm_basket_regimes')
+GLOBAL_STEPS = ('_warm_macro_pages', '_warm_relative_strength', '_warm_meme_strength')
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replaces every warm-up step with one that records (step, basket)."""
+    calls = []
+    for name in BASKET_STEPS:
+        monkeypatch.setattr(warmup, name, lambda basket_name, name=name: calls.append((name, basket_name)))
+    for name in GLOBAL_STEPS:
+        monkeypatch.setattr(warmup, name, lambda name=name: calls.append((name, None)))
+    monkeypatch.setattr(warmup, 'load_data', lambda: calls.append(('load_data', None)))
+    return calls
+
+
+def test_default_views_come_first_and_every_basket_view_is_warmed_once(calls):
+    defaults = warmup.warmup_steps(all_baskets=False)
+    steps = warmup.warmup_steps(all_baskets=True)
+    assert [label for label, _ in steps[:len(defaults)]] == [label for label, _ in defaults]
+    assert [label for label, _ in defaults][:2] == ["Home", "Macro pages"]
+
+    for _, warm in steps:
+        warm()
+    assert len(calls) == len(set(calls)) == len(steps)
+    assert {(name, basket) for name in BASKET_STEPS for basket in BASKETS} <= set(calls)
+    assert ('_warm_correlation', warmup.CORRELATION_DEFAULT_BASKET) in calls[:len(defaults)]
+    assert ('_warm_ad_line', warmup.DEFAULT_BASKET) in calls[:len(defaults)]
+
+
+def test_run_warmup_records_failures_and_keeps_going(monkeypatch):
+    ran = []
+
+    def failing():
+        raise RuntimeError("no data")
+
+    monkeypatch.setattr(warmup, 'WARMUP_STEP_PAUSE_SECONDS', 0)
+    monkeypatch.setattr(warmup, 'warmup_steps', lambda: [("One", lambda: ran.append(1)), ("Two", failing), ("Three", lambda: ran.append(3))])
+    monkeypatch.setattr(warmup, '_status', dict(warmup._status, runs=0))
+
+    assert warmup.run_warmup("test") == ["Two: no data"]
+    assert ran == [1, 3]
+    status = warmup._status
+    assert (status['state'], status['completed'], status['total'], status['runs'], status['reason']) == ('done', 3, 3, 1, 'test')
@@ -1,57 +1,289 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import numpy as np
 import pandas as pd
-import sqlite3
-from config import DB_FILE
+import plotly.io as pio
+from config import FORWARD_FILL_SYMBOLS
+from store import read_pool, read_versions, VERSIONS_TABLE
+from derived_store import connect_derived, load_frame, frame_version
+from panel import compact_panel, legacy_stamps_to_utc, normalize_daily_bars, COMPACT_DEFAULT_COLUMNS
 
-@st.cache_data(ttl=3600)
-def load_data(asset_list=None):
+# --- Parallel Table Loading ---
+# Tables are read and parsed on a shared thread pool, each with a read-only
+# connection borrowed from the store's pool; SQLite releases the GIL while it
+# steps through rows, so reading one table overlaps with parsing another.
+LOAD_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+_load_pool = ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix='load_data')
+
+# --- Versioned Caching ---
+# Every table has a version in the store that changes with each write to it.
+# load_data's cache is keyed on the versions of the requested tables, and each
+# parsed table is kept per (table, columns, version), so after an update that
+# touched a few symbols only requests containing them reload, and they only
+# re-read the changed tables.
+# Cached frames are shared by every caller: their arrays are made read-only and
+# each caller gets its own shallow copy, so adding, replacing or dropping
+# columns stays local and writing into the shared values raises.
+MAX_CACHED_FRAMES = 1024
+CACHE_TTL_SECONDS = 3600
+_frame_cache = OrderedDict()
+_frame_cache_lock = threading.Lock()
+
+
+def _read_catalog():
+    """Returns the market data DB's tables and {table: version}."""
+    with read_pool().connection() as conn:
+        tables = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'") if name != VERSIONS_TABLE]
+        return tables, read_versions(conn)
+
+
+def _requested_versions(asset_lists):
+    """
+    The (table, version) pairs of every existing table in the given requests,
+    used as the cache key of a load. None when the catalog cannot be read.
+    """
+    try:
+        tables, versions = _read_catalog()
+    except Exception:
+        return None
+    if any(not asset_list for asset_list in asset_lists):
+        requested = tables
+    else:
+        existing = set(tables)
+        requested = {table for asset_list in asset_lists for table in asset_list if table in existing}
+    return tuple(sorted((table, versions.get(table)) for table in requested))
+
+
+def _protect(df):
+    """Makes the arrays of a frame that will be shared read-only, in place."""
+    for values in df._mgr.arrays:
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return df
+
+
+def _read_table(table_name, selected_columns, version):
+    """
+    Reads and normalizes one table (runs on a pool thread), or returns the
+    frame already parsed for this version of the table, as a shallow copy
+    over read-only arrays.
+
+    Returns:
+        tuple: (DataFrame or None if it is empty, error or None).
+    """
+    key = (table_name, selected_columns, version)
+    if version is not None:
+        with _frame_cache_lock:
+            if key in _frame_cache:
+                _frame_cache.move_to_end(key)
+                df = _frame_cache[key]
+                return (df.copy(deep=False) if not df.empty else None), None
+    try:
+        query = f'SELECT {selected_columns} FROM "{table_name}"'
+        with read_pool().connection() as conn:
+            df = pd.read_sql(query, conn, index_col='datetime')
+        df.index = legacy_stamps_to_utc(pd.to_datetime(df.index))
+        # Rows written before ingestion normalized bars onto the UTC day calendar are normalized here
+        df = normalize_daily_bars(df, forward_fill=table_name in FORWARD_FILL_SYMBOLS)
+        df = df[df.index >= '2019-12-31']
+        # Lets shared intermediates (intermediates.py) and memoized indicators be cached per symbol version
+        df.attrs['symbol'] = table_name
+        if version is not None:
+            df.attrs['version'] = version
+            with _frame_cache_lock:
+                _frame_cache[key] = _protect(df)
+                while len(_frame_cache) > MAX_CACHED_FRAMES:
+                    _frame_cache.popitem(last=False)
+            df = df.copy(deep=False)
+        return (df if not df.empty else None), None
+    except Exception as e:
+        return None, e
+
+
+def _load_requests(requests, compact=False, columns=None, warn_missing=True, optional=()):
+    """
+    Loads several lists of tables at once. The union of all requested tables is
+    read concurrently (each table once, however many requests include it) and
+    then split back into one data dict per request.
+
+    Args:
+        requests (dict): Request name -> list of table names (None or empty = every table).
+        compact, columns, warn_missing: As in load_data.
+        optional (tuple): Request names whose missing tables are not warned about.
+
+    Returns:
+        dict: Request name -> data dict, or None for requests with no matching tables.
+    """
+    try:
+        existing_tables, versions = _read_catalog()
+    except Exception as e:
+        st.error(f"Error connecting to or reading the database: {e}")
+        return {name: None for name in requests}
+    existing = set(existing_tables)
+
+    tables_per_request = {}
+    for name, asset_list in requests.items():
+        if not asset_list:
+            # If no specific list is provided, load all existing tables
+            tables_per_request[name] = existing_tables
+            continue
+        # Load only the assets that are in both the requested list AND the database
+        tables_per_request[name] = [asset for asset in asset_list if asset in existing]
+        missing_assets = [asset for asset in asset_list if asset not in existing]
+        if missing_assets and warn_missing and name not in optional:
+            st.warning(f"Could not find data for the following assets: {', '.join(missing_assets)}. They may have failed to download.")
+
+    columns = tuple(columns or COMPACT_DEFAULT_COLUMNS)
+    selected_columns = ', '.join(['datetime'] + [f'"{col}"' for col in columns]) if compact else '*'
+    all_tables = list(dict.fromkeys(table for tables in tables_per_request.values() for table in tables))
+    frames = {}
+    loaded = _load_pool.map(lambda table: _read_table(table, selected_columns, versions.get(table)), all_tables)
+    for table_name, (df, error) in zip(all_tables, loaded):
+        if error is not None:
+            st.warning(f"Could not load table '{table_name}': {error}")
+        elif df is not None:
+            frames[table_name] = df
+
+    results = {}
+    for name, tables in tables_per_request.items():
+        if not tables:
+            if warn_missing and name not in optional:
+                st.error("No matching data found in the database.")
+            results[name] = None
+            continue
+        data = {table: frames[table] for table in tables if table in frames}
+        results[name] = compact_panel(data, columns=columns) if compact else data
+    return results
+
+
+def load_data(asset_list=None, compact=False, columns=None, warn_missing=True):
     """
     Loads tables from the SQLite DB. If asset_list is provided, attempts to
-    load only those tables. Skips any tables that are not found.
+    load only those tables. Skips any tables that are not found. Tables are
+    read and parsed concurrently, and the result stays cached until one of
+    the requested tables is written.
 
     Args:
         asset_list (list, optional): A list of table names to load. Defaults to None.
+        compact (bool, optional): If True, returns the compact layout (float32 values,
+            only the requested columns, shared int32 day-number index). Defaults to False.
+        columns (tuple, optional): Columns to keep in compact mode. Defaults to ('close',).
+        warn_missing (bool, optional): Whether to show a warning for requested tables that
+            do not exist, e.g. False when probing for a synthetic index. Defaults to True.
 
     Returns:
         dict: A dictionary of DataFrames for the tables that were successfully found and loaded.
     """
-    try:
-        with sqlite3.connect(DB_FILE, check_same_thread=False) as conn:
-            # First, get a list of all tables that actually exist in the database
-            existing_tables = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table';", conn)['name'].tolist()
-
-            if not asset_list:
-                # If no specific list is provided, load all existing tables
-                tables_to_load = existing_tables
-            else:
-                # If a list is provided, load only the assets that are in both the requested list AND the database
-                tables_to_load = [asset for asset in asset_list if asset in existing_tables]
-                
-                # --- NEW: Warn the user if some requested assets are missing ---
-                missing_assets = [asset for asset in asset_list if asset not in existing_tables]
-                if missing_assets:
-                    st.warning(f"Could not find data for the following assets: {', '.join(missing_assets)}. They may have failed to download.")
-
-
-            if not tables_to_load:
-                st.error("No matching data found in the database.")
-                return None
-
-            data = {}
-            for table_name in tables_to_load:
-                try:
-                    query = f'SELECT * FROM "{table_name}"'
-                    df = pd.read_sql(query, conn, index_col='datetime')
-                    df.index = pd.to_datetime(df.index)
-                    df = df[df.index >= '2019-12-31']
-                    if not df.empty:
-                        data[table_name] = df
-                except Exception as e:
-                    st.warning(f"Could not load table '{table_name}': {e}")
-                    continue # Skip to the next table if an error occurs
-
-            return data
+    versions = _requested_versions([asset_list])
+    return _load_data_cached(asset_list, compact, columns, warn_missing, versions)
 
+
+def load_data_many(requests, compact=False, columns=None, warn_missing=True, optional=()):
+    """
+    Loads all of a page's inputs in one concurrent pass, e.g.
+    load_data_many({'assets': basket_symbols, 'macro': macro_symbols}).
+    Tables shared by several requests are read once.
+
+    Args:
+        requests (dict): Request name -> list of table names (None = every table).
+        compact, columns, warn_missing: As in load_data.
+        optional (tuple, optional): Request names that may legitimately be missing
+            (e.g. a synthetic index that has not been built); they are not warned about.
+
+    Returns:
+        dict: Request name -> dictionary of DataFrames, or None if none of its tables were found.
+    """
+    versions = _requested_versions(list(requests.values()))
+    return _load_data_many_cached(requests, compact, columns, warn_missing, optional, versions)
+
+
+def data_versions(*asset_lists):
+    """
+    The (table, version) pairs of the given tables. Pages pass it to their own
+    cached compute stages, so a stage reruns only when one of its inputs is written.
+    """
+    return _requested_versions(list(asset_lists))
+
+
+# `versions` only keys the caches below: the (table, version) pairs of the request
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=64)
+def _load_data_cached(asset_list, compact, columns, warn_missing, versions):
+    return _load_requests({'data': asset_list}, compact, columns, warn_missing)['data']
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=64)
+def _load_data_many_cached(requests, compact, columns, warn_missing, optional, versions):
+    return _load_requests(requests, compact, columns, warn_missing, optional)
+
+
+# --- Figure Cache ---
+# Some figures take far longer to build than their data takes to compute (one
+# add_vrect per regime change, per-bar color lists, hundreds of text markers).
+# Pages build those through cached_figure, which keeps each finished figure as
+# its JSON spec, shared by every session, under a key of everything the figure
+# depends on; a hit only parses the spec back.
+MAX_CACHED_FIGURES = 128
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def cached_figure(key, build):
+    """
+    Returns the figure build() makes for a key, building it only once per key.
+
+    Args:
+        key (tuple): The page, its parameters and the data versions (see data_versions)
+            the figure depends on, e.g. ('ad_line', basket_name, versions).
+        build (callable): Builds and returns the plotly figure.
+
+    Returns:
+        go.Figure: The figure.
+    """
+    with _figure_cache_lock:
+        spec = _figure_cache.get(key)
+        if spec is not None:
+            _figure_cache.move_to_end(key)
+    if spec is not None:
+        return pio.from_json(spec)
+
+    fig = build()
+    with _figure_cache_lock:
+        _figure_cache[key] = fig.to_json()
+        while len(_figure_cache) > MAX_CACHED_FIGURES:
+            _figure_cache.popitem(last=False)
+    return fig
+
+
+def load_derived(name):
+    """
+    Loads a result precomputed after ingestion (see post_ingest.py) from the
+    derived results DB. The cached copy is keyed on the version token of the
+    result's last write, so a recompute by the updaters or the scheduler is
+    picked up on the next rerun instead of after the cache expires.
+
+    Returns:
+        The stored object (usually a DataFrame), or None if it has not been computed yet.
+    """
+    try:
+        conn = connect_derived()
+        try:
+            version = frame_version(conn, name)
+        finally:
+            conn.close()
+        return _load_derived_version(name, version) if version is not None else None
     except Exception as e:
-        st.error(f"Error connecting to or reading the database: {e}")
-        return None
\ No newline at end of file
+        st.warning(f"Could not read derived result '{name}': {e}")
+        return None
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=64)
+def _load_derived_version(name, version):
+    """Reads one written version of a derived result (version only keys the cache)."""
+    conn = connect_derived()
+    try:
+        return load_frame(conn, name)
+    finally:
+        conn.close()
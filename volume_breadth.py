@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from config import BASKETS
+from baskets import REGISTRY, all_basket_symbols, split_by_partition
+from panel import RaggedPanel, sum_on_calendar
+from index_builder import read_basket, tail_start
+from derived_store import connect_derived, save_frame, load_frame
+from memo import disk_memo
+
+# --- Configuration ---
+MCCLELLAN_FAST = 19  # EMA lengths of net advances (the classic 10% and 5% trends)
+MCCLELLAN_SLOW = 39
+COUNTS_FRAME = 'volume_breadth:partition_counts'  # Per partition: {'counts': DataFrame, 'last_bars': {symbol: date}}
+VOLUME_BREADTH_FRAME = 'volume_breadth'  # One frame per basket: 'volume_breadth:<basket name>'
+COUNT_COLUMNS = ('advances', 'declines', 'unchanged', 'up_volume', 'down_volume')
+
+
+# --- Daily Counts ---
+# Every series of the suite derives from five per-day sums over the assets,
+# which are kept per basket partition (see baskets.py) and added up per basket.
+def _flat_changes(closes):
+    """
+    Daily change of every stored close of a flattened ragged panel, computed on
+    the whole flat array at once. NaN closes are padded with the previous close
+    (as pct_change does); the first day of each asset has no change.
+    """
+    _, close = closes.flatten()
+    lengths = np.array([len(values) for values in closes.values], dtype=np.int64)
+    # Every stored range starts on a valid close, so padding never crosses into the previous asset
+    padded = close[np.maximum.accumulate(np.where(np.isnan(close), 0, np.arange(len(close))))]
+    change = np.full(len(close), np.nan, dtype=close.dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change[1:] = padded[1:] / padded[:-1] - 1
+    change[np.cumsum(lengths) - lengths] = np.nan
+    return change
+
+
+def breadth_counts(data_dict):
+    """
+    Per-day advancing, declining and unchanged assets and their USD volume (close
+    x volume), in one vectorized pass over the close and volume cells of the
+    listed days of every asset.
+
+    Args:
+        data_dict (dict): A dictionary of asset DataFrames with 'close' and 'volume'.
+
+    Returns:
+        pd.DataFrame: One row per calendar day with the COUNT_COLUMNS.
+    """
+    closes = RaggedPanel({symbol: df['close'] for symbol, df in data_dict.items()})
+    volumes = RaggedPanel({symbol: df['volume'] for symbol, df in data_dict.items()}, like=closes)
+    days, close = closes.flatten()
+    _, volume = volumes.flatten()
+    change = _flat_changes(closes)
+    usd_volume = np.nan_to_num(close.astype(np.float64) * volume)
+    advancing, declining = change > 0, change < 0
+
+    def per_day(weights):
+        return np.bincount(days, weights=weights, minlength=closes.n_days)
+
+    return pd.DataFrame({
+        'advances': per_day(advancing).astype(np.int64),
+        'declines': per_day(declining).astype(np.int64),
+        'unchanged': per_day(change == 0).astype(np.int64),
+        'up_volume': per_day(np.where(advancing, usd_volume, 0.0)),
+        'down_volume': per_day(np.where(declining, usd_volume, 0.0)),
+    }, index=closes.index)
+
+
+@disk_memo
+def _partition_counts(data_dict):
+    """breadth_counts of the assets of one basket partition."""
+    return breadth_counts(data_dict)
+
+
+# --- Breadth Suite ---
+def volume_breadth_from_counts(counts):
+    """
+    Derives the volume breadth suite from the daily counts of a basket.
+
+    - up_down_volume_ratio: USD volume of advancing over declining assets.
+    - net_advances: advances minus declines (the daily A/D score).
+    - mcclellan_oscillator: EMA-19 minus EMA-39 of net advances;
+      mcclellan_summation: its running total.
+    - trin: the Arms index, (advances / declines) / (up volume / down volume).
+      Below 1, volume is concentrated in the advancing assets.
+
+    Returns:
+        pd.DataFrame: The counts plus one column per derived series. Ratios are NaN
+            on days where their denominator is 0.
+    """
+    suite = counts.copy()
+    advances, declines = counts['advances'].astype(np.float64), counts['declines'].astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        suite['up_down_volume_ratio'] = (counts['up_volume'] / counts['down_volume']).replace([np.inf, -np.inf], np.nan)
+        advance_decline_ratio = (advances / declines).replace([np.inf, -np.inf], np.nan)
+        suite['trin'] = (advance_decline_ratio / suite['up_down_volume_ratio']).replace([np.inf, -np.inf], np.nan)
+    suite['net_advances'] = counts['advances'] - counts['declines']
+    net_advances = suite['net_advances'].astype(np.float64)
+    suite['mcclellan_oscillator'] = (
+        net_advances.ewm(span=MCCLELLAN_FAST, adjust=False).mean() - net_advances.ewm(span=MCCLELLAN_SLOW, adjust=False).mean()
+    )
+    suite['mcclellan_summation'] = suite['mcclellan_oscillator'].cumsum()
+    return suite
+
+
+@disk_memo
+def calculate_volume_breadth(data_dict):
+    """
+    Calculates the volume breadth suite (up/down volume, McClellan oscillator and
+    summation index, Arms index) of a basket, from per-partition counts that
+    are shared with every other basket containing the same partitions.
+    """
+    counts = sum_on_calendar([_partition_counts(part) for part in split_by_partition(data_dict)])
+    return volume_breadth_from_counts(counts)
+
+
+# --- Post-Ingest Update ---
+def _update_partition(conn, partition, entry, changed_tables):
+    """
+    Brings the stored counts of one partition up to date. entry holds its
+    'counts' and the 'last_bars' (last stored bar per symbol), or is None.
+    """
+    data = None
+    if entry is not None and not entry['counts'].empty:
+        # Days after the earliest last bar of a changed symbol may have gained bars
+        changed = [symbol for symbol in entry['last_bars'] if changed_tables is None or symbol in changed_tables]
+        since = min((entry['last_bars'][symbol] for symbol in changed), default=entry['counts'].index[-1])
+        data = read_basket(conn, partition, since=tail_start(conn, partition, since))
+        if set(data) - set(entry['last_bars']):
+            data = None  # New symbols need their full history
+    if data is None:
+        data = read_basket(conn, partition)
+        counts, last_bars = breadth_counts(data), {}
+    else:
+        tail = breadth_counts(data)
+        counts = pd.concat([entry['counts'][entry['counts'].index < since], tail[tail.index >= since]])
+        last_bars = dict(entry['last_bars'])
+    last_bars.update({symbol: df.index[-1] for symbol, df in data.items()})
+    return {'counts': counts, 'last_bars': last_bars}
+
+
+def update_volume_breadth(conn, changed_tables=None):
+    """
+    Post-ingest task: brings the stored per-partition counts up to date and
+    stores the volume breadth suite of every basket in config.BASKETS.
+
+    Only partitions with changed symbols are updated: their counts are
+    recomputed from the earliest last stored bar of a changed symbol onwards
+    (re-reading from each symbol's previous bar, see index_builder.tail_start). A partition is built in full
+    when nothing is stored for its symbols (e.g. after the baskets changed) or
+    a new symbol appears. Skipped when none of the basket symbols changed.
+    """
+    if changed_tables is not None and not changed_tables & set(all_basket_symbols()):
+        print("No basket symbols changed; skipping volume breadth.")
+        return
+    derived_conn = connect_derived()
+    try:
+        stored = load_frame(derived_conn, COUNTS_FRAME) or {}
+        partitions, updated = {}, 0
+        for partition in REGISTRY.partitions:
+            key = tuple(partition)
+            entry = stored.get(key)
+            if entry is None or changed_tables is None or changed_tables & set(partition):
+                entry = _update_partition(conn, partition, entry, changed_tables)
+                updated += 1
+            partitions[key] = entry
+
+        save_frame(derived_conn, COUNTS_FRAME, partitions)
+        for name in BASKETS:
+            basket_counts = sum_on_calendar([
+                partitions[tuple(REGISTRY.partitions[p])]['counts'] for p in REGISTRY.partitions_of(name)
+            ])
+            save_frame(derived_conn, f'{VOLUME_BREADTH_FRAME}:{name}', volume_breadth_from_counts(basket_counts))
+    finally:
+        derived_conn.close()
+    print(f"Updated volume breadth counts of {updated} partition(s); stored {len(BASKETS)} basket(s).")
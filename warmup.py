@@ -0,0 +1,251 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+import streamlit as st
+from config import (
+    MACRO_SYMBOLS, BASKETS, EVERYTHING_BASKET_NAME, MEME_COIN_BASKET, MEME_INDEX_SYMBOL,
+    WARMUP_ENABLED, WARMUP_ALL_BASKETS,
+    WARMUP_POLL_SECONDS, WARMUP_STEP_PAUSE_SECONDS
+)
+from utils import load_data, load_data_many, load_derived, CACHE_TTL_SECONDS
+from store import read_pool, read_versions
+from derived_store import connect_derived, read_frame_versions
+from indicators import (
+    calculate_stablecoin_vs_total_roc, calculate_altcoin_season_index_v1, calculate_traffic_light,
+    calculate_official_altcoin_season_index, calculate_ad_line, calculate_eth_breadth_wave,
+    calculate_distance_from_ma, calculate_market_character, calculate_regime_scatter_data,
+    ASI_NORMALIZATIONS
+)
+from correlation import calculate_rolling_correlation, calculate_correlation_matrix
+from regime_breadth import calculate_asset_regimes, REGIMES_FRAME
+from relative_strength import RS_FRAME_NAMES
+
+# --- Cache Warm-up ---
+# A background thread of the dashboard server makes the same cached calls as
+# every page's default view (load_data / load_data_many with the same
+# arguments, the memoized indicators with the default parameters), so the
+# first visitor after a restart, an ingest or a cache expiry finds them warm.
+# Steps run one at a time, most visited pages first, with a short pause in
+# between so page requests are served in the meantime. A failing step is
+# recorded and skipped.
+MACRO_LIST = list(MACRO_SYMBOLS.values())
+DEFAULT_BASKET = EVERYTHING_BASKET_NAME
+CORRELATION_DEFAULT_BASKET = "Large Caps (>$1B)"  # The Correlation Matrix page opens on Large Caps
+
+_status = {
+    'state': 'idle', 'step': None, 'completed': 0, 'total': 0, 'failed': [],
+    'runs': 0, 'reason': None, 'started_at': None, 'finished_at': None,
+}
+_status_lock = threading.Lock()
+_thread = None
+
+
+# --- Steps ---
+def _warm_macro_pages():
+    macro = load_data(asset_list=MACRO_LIST)
+    calculate_stablecoin_vs_total_roc(macro['TOTAL'], macro['USDT_D'], macro['USDC_D'], roc_len=30)
+    calculate_altcoin_season_index_v1(macro['TOTAL3'], macro['BTC_D'], ma_length=30)
+    calculate_traffic_light(macro['TOTAL'])
+
+
+def _load_basket_with_macro(basket_name):
+    loaded = load_data_many({'assets': list(BASKETS[basket_name].values()), 'macro': MACRO_LIST})
+    return loaded['assets'], loaded['macro']
+
+
+def _warm_altcoin_season(basket_name):
+    assets, macro = _load_basket_with_macro(basket_name)
+    calculate_official_altcoin_season_index(assets, macro['BTCUSD'], macro['BTC_D'], normalization=ASI_NORMALIZATIONS[0])
+
+
+def _warm_ad_line(basket_name):
+    assets, _ = _load_basket_with_macro(basket_name)
+    calculate_ad_line(assets)
+
+
+def _warm_eth_wave(basket_name):
+    assets, macro = _load_basket_with_macro(basket_name)
+    calculate_eth_breadth_wave(assets, macro['ETHUSD'], lookback_period=30)
+
+
+def _warm_correlation(basket_name):
+    assets, macro = _load_basket_with_macro(basket_name)
+    calculate_rolling_correlation(assets, {'BTCUSD': macro['BTCUSD'], 'ETHUSD': macro['ETHUSD']}, window=30)
+    calculate_correlation_matrix(assets, window=30)
+
+
+def _warm_basket_maps(basket_name):
+    # Moving Average Scatter Map (200-day MA) and Momentum/Volume Map (volatility axis)
+    assets = load_data(asset_list=list(BASKETS[basket_name].values()))
+    calculate_distance_from_ma(assets, ma_length=200)
+    calculate_market_character(assets, benchmark_df=None)
+
+
+def _warm_basket_regimes(basket_name):
+    # The Traffic Lights page only computes regimes itself when they have not been precomputed
+    if load_derived(REGIMES_FRAME) is None:
+        calculate_asset_regimes(load_data(asset_list=list(BASKETS[basket_name].values())))
+
+
+def _warm_meme_strength():
+    loaded = load_data_many({'meme_index': [MEME_INDEX_SYMBOL], 'macro': MACRO_LIST}, optional=('meme_index',))
+    meme_assets = loaded['meme_index']
+    if meme_assets is None:
+        meme_assets = load_data(asset_list=list(MEME_COIN_BASKET.values()))
+    calculate_regime_scatter_data(meme_assets, loaded['macro']['TOTAL'])
+
+
+def _warm_relative_strength():
+    for name in RS_FRAME_NAMES:
+        load_derived(f'relative_strength:{name}')
+
+
+def warmup_steps(all_baskets=WARMUP_ALL_BASKETS):
+    """
+    The warm-up steps in priority order, as (label, callable) pairs: the home
+    page and every page's default view, then the basket pages for the other baskets.
+    """
+    steps = [
+        ("Home", lambda: load_data()),
+        ("Macro pages", _warm_macro_pages),
+        ("Altcoin Season Index", lambda: _warm_altcoin_season(DEFAULT_BASKET)),
+        ("A/D Line", lambda: _warm_ad_line(DEFAULT_BASKET)),
+        ("Relative Strength", _warm_relative_strength),
+        ("Traffic Lights", lambda: _warm_basket_regimes(DEFAULT_BASKET)),
+        ("ETH Performance Wave", lambda: _warm_eth_wave(DEFAULT_BASKET)),
+        ("Scatter and Momentum Maps", lambda: _warm_basket_maps(DEFAULT_BASKET)),
+        ("Correlation Matrix", lambda: _warm_correlation(CORRELATION_DEFAULT_BASKET)),
+        ("Meme Strength", _warm_meme_strength),
+    ]
+    if all_baskets:
+        for basket_name in BASKETS:
+            for label, warm in (
+                ("Altcoin Season Index", _warm_altcoin_season),
+                ("A/D Line", _warm_ad_line),
+                ("ETH Performance Wave", _warm_eth_wave),
+                ("Scatter and Momentum Maps", _warm_basket_maps),
+                ("Correlation Matrix", _warm_correlation),
+                ("Traffic Lights", _warm_basket_regimes),
+            ):
+                if (basket_name == DEFAULT_BASKET and warm is not _warm_correlation) or \
+                        (basket_name == CORRELATION_DEFAULT_BASKET and warm is _warm_correlation):
+                    continue  # Already warmed as a default view
+                steps.append((f"{label}: {basket_name}", lambda warm=warm, basket_name=basket_name: warm(basket_name)))
+    return steps
+
+
+# --- Background Thread ---
+def _data_fingerprint():
+    """Changes whenever a table of the market data DB or a derived result is written."""
+    with read_pool().connection() as conn:
+        versions = sorted(read_versions(conn).items())
+    conn = connect_derived()
+    try:
+        derived = sorted(read_frame_versions(conn).items())
+    finally:
+        conn.close()
+    return hashlib.blake2b(repr((versions, derived)).encode(), digest_size=16).hexdigest()
+
+
+def _set_status(**changes):
+    with _status_lock:
+        _status.update(changes)
+
+
+def run_warmup(reason="manual"):
+    """
+    Runs every warm-up step once, in the calling thread, updating the status
+    shown by show_warmup_status.
+
+    Returns:
+        list: Labels of the steps that failed.
+    """
+    steps = warmup_steps()
+    started = datetime.now(timezone.utc)
+    _set_status(state='running', step=None, completed=0, total=len(steps), failed=[], reason=reason, started_at=started)
+    failed = []
+    for i, (label, warm) in enumerate(steps):
+        _set_status(step=label)
+        try:
+            warm()
+        except Exception as e:
+            failed.append(f"{label}: {e}")
+        _set_status(completed=i + 1, failed=list(failed))
+        time.sleep(WARMUP_STEP_PAUSE_SECONDS)
+    with _status_lock:
+        _status.update(state='done', step=None, finished_at=datetime.now(timezone.utc))
+        _status['runs'] += 1
+    return failed
+
+
+def _warmup_loop():
+    """
+    Warms the caches now, then again when the data has changed and stayed
+    unchanged for one poll (so a running ingest is not chased symbol by
+    symbol), or when the load cache entries of the last run have expired.
+    """
+    warmed, previous, next_expiry = None, None, 0.0
+    while True:
+        try:
+            fingerprint = _data_fingerprint()
+        except Exception:
+            fingerprint = None  # The DB may not exist yet; retry on the next poll
+        if fingerprint is not None:
+            if warmed is None:
+                reason = "server start"
+            elif fingerprint != warmed and fingerprint == previous:
+                reason = "new data"
+            elif time.monotonic() >= next_expiry:
+                reason = "cache expiry"
+            else:
+                reason = None
+            if reason:
+                run_warmup(reason)
+                # Entries made during the run have all expired one TTL after it ends
+                warmed, next_expiry = fingerprint, time.monotonic() + CACHE_TTL_SECONDS
+        previous = fingerprint
+        time.sleep(WARMUP_POLL_SECONDS)
+
+
+def start_warmup():
+    """Starts the warm-up thread, once per server process (a no-op if disabled or already running)."""
+    global _thread
+    if not WARMUP_ENABLED:
+        return
+    with _status_lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_warmup_loop, name='cache_warmup', daemon=True)
+        _thread.start()
+
+
+def warmup_status():
+    """Returns a copy of the warm-up status."""
+    with _status_lock:
+        return {**_status, 'failed': list(_status['failed'])}
+
+
+# --- UI ---
+@st.fragment(run_every=2)
+def _warmup_progress():
+    status = warmup_status()
+    if status['state'] == 'running':
+        st.progress(
+            status['completed'] / max(status['total'], 1),
+            text=f"Warming caches ({status['reason']}): {status['step']} ({status['completed']}/{status['total']})"
+        )
+    elif status['state'] == 'done':
+        seconds = (status['finished_at'] - status['started_at']).total_seconds()
+        st.caption(f"Caches warmed at {status['finished_at']:%H:%M} UTC in {seconds:.0f}s.")
+    if status['failed']:
+        with st.expander(f"{len(status['failed'])} warm-up steps failed"):
+            st.write(status['failed'])
+
+
+def show_warmup_status():
+    """Starts the warm-up thread if needed and shows its progress in the sidebar."""
+    start_warmup()
+    if WARMUP_ENABLED:
+        with st.sidebar:
+            _warmup_progress()